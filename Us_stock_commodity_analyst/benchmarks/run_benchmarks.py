@@ -0,0 +1,160 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import SCALES, generate_scale
+from utils.asset_categories import ASSET_CATEGORIES
+from utils.batch_report import compute_year_report
+from utils.correlation_engine import blocked_correlation, top_correlated_pairs
+from utils.fungction_correlation_page import price_line_metrics
+from utils.incremental import IncrementalState
+from utils.normalization import normalize_prices
+from utils.portfolio_stats import compute_asset_stats
+from utils.seasonal_cube import build_seasonal_cube, build_yearly_stats
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_PATH = os.path.join(BASE_DIR, 'benchmarks', 'benchmark_results.json')
+
+# Each case takes (df, norm_df, corr_df) and runs one compute path of the dashboard
+
+def bench_normalization(df, norm_df, corr_df):
+    normalize_prices(df, window=14, smoothing='sma')
+
+def bench_correlation(df, norm_df, corr_df):
+    # what the date-range and return correlations run
+    blocked_correlation(norm_df)
+
+def bench_incremental_build(df, norm_df, corr_df):
+    # the full-range price correlation and stats are read from the incremental state built on first load
+    state = IncrementalState.from_prices(df)
+    state.correlation()
+    state.asset_stats()
+
+def bench_seasonal_cube(df, norm_df, corr_df):
+    build_seasonal_cube(norm_df)
+    build_yearly_stats(norm_df)
+
+_CUBES = {}
+
+def bench_seasonal_year_lookup(df, norm_df, corr_df):
+    # the numbers tap_year_seasonal renders per (asset, year), the cube itself is only built on the first call
+    cubes = _CUBES.get(id(norm_df))
+    if cubes is None:
+        cubes = _CUBES[id(norm_df)] = build_seasonal_cube(norm_df), build_yearly_stats(norm_df)
+    seasonal_cube, yearly_stats = cubes
+    data = norm_df[norm_df.columns[0]]
+    for year in norm_df.index.year.unique():
+        compute_year_report(data, year, seasonal_cube.loc[(data.name, year)], yearly_stats.loc[(data.name, year)])
+
+def bench_category_pairs(df, norm_df, corr_df):
+    # top/bottom pair search of categori_correlation, within the largest category
+    assets = [asset for asset in ASSET_CATEGORIES['Tech Stocks'] if asset in corr_df.columns]
+    category_corr = corr_df.loc[assets, assets]
+    top_correlated_pairs(category_corr, k=6, largest=True)
+    top_correlated_pairs(category_corr, k=6, largest=False)
+
+def bench_universe_pairs(df, norm_df, corr_df):
+    top_correlated_pairs(corr_df, k=6, largest=True)
+    top_correlated_pairs(corr_df, k=6, largest=False)
+
+def bench_price_line_metrics(df, norm_df, corr_df):
+    # metrics table of price_line_plot for every asset
+    price_line_metrics(norm_df, list(norm_df.columns))
+
+def bench_portfolio_stats(df, norm_df, corr_df):
+    compute_asset_stats(df, benchmark='S&P_500_Price')
+
+_STATES = {}
+# trading days held back from the history state, each call appends the next one
+APPEND_TAIL = 256
+
+def bench_incremental_append(df, norm_df, corr_df):
+    # one new trading day on top of the latest state, like a store that gains a day per version;
+    # the history state is only built on the first call
+    state = _STATES.get(id(df))
+    if state is None or state.n_rows == len(df):
+        state = IncrementalState.from_prices(df.iloc[:-APPEND_TAIL])
+    appended = _STATES[id(df)] = state.copy().append(df.iloc[state.n_rows:state.n_rows + 1])
+    appended.correlation()
+    appended.asset_stats()
+
+CASES = {
+    'normalization': bench_normalization,
+    'correlation': bench_correlation,
+    'incremental_build': bench_incremental_build,
+    'seasonal_cube': bench_seasonal_cube,
+    'seasonal_year_lookup': bench_seasonal_year_lookup,
+    'category_pairs': bench_category_pairs,
+    'universe_pairs': bench_universe_pairs,
+    'price_line_metrics': bench_price_line_metrics,
+    'portfolio_stats': bench_portfolio_stats,
+    'incremental_append': bench_incremental_append
+}
+
+def time_case(func, args, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(scales, cases, repeat=3):
+    results = []
+    for scale in scales:
+        df = generate_scale(scale)
+        norm_df = normalize_prices(df)
+        corr_df = blocked_correlation(norm_df)
+        for name in cases:
+            timings = time_case(CASES[name], (df, norm_df, corr_df), repeat)
+            results.append({
+                'case': name,
+                'scale': scale,
+                'assets': df.shape[1],
+                'rows': df.shape[0],
+                'repeat': repeat,
+                'best_s': min(timings),
+                'mean_s': float(np.mean(timings))
+            })
+            print(f"{scale:>8} {name:<22} {df.shape[1]:>5} x {df.shape[0]:<6} best {min(timings) * 1000:10.2f} ms")
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard compute paths on synthetic data.")
+    parser.add_argument('--scales', nargs='+', default=['current', 'small', 'medium'], choices=list(SCALES))
+    parser.add_argument('--cases', nargs='+', default=list(CASES), choices=list(CASES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', default=RESULTS_PATH, help="JSON file the results are written to")
+    args = parser.parse_args(argv)
+
+    results = run(args.scales, args.cases, args.repeat)
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'results': results
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from utils.asset_categories import ASSET_CATEGORIES
+
+# (assets, years) presets, "current" matches the size of the cleaned dataset
+SCALES = {
+    'current': (20, 4),
+    'small': (100, 5),
+    'medium': (500, 10),
+    'large': (2000, 20),
+    'xlarge': (5000, 20)
+}
+
+TRADING_DAYS = 252
+
+def asset_names(n_assets):
+    # start with the real tickers so category based code paths still find their columns
+    real = [asset for assets in ASSET_CATEGORIES.values() for asset in assets]
+    names = real[:n_assets]
+    names += [f"Synthetic_{i:04d}_Price" for i in range(len(names), n_assets)]
+    return names
+
+def generate_prices(n_assets=20, n_years=4, start='2020-01-01', n_factors=4, seed=0):
+    """Correlated geometric random walks shaped like the cleaned store: Date index, one float64 *_Price column per asset."""
+    rng = np.random.default_rng(seed)
+    n_days = n_years * TRADING_DAYS
+    index = pd.bdate_range(start=start, periods=n_days, name='Date')
+
+    # a few common factors give the correlation matrix some structure
+    loadings = rng.normal(0, 1, size=(n_factors, n_assets))
+    factors = rng.normal(0, 0.01, size=(n_days, n_factors))
+    idio = rng.normal(0, 1, size=(n_days, n_assets)) * rng.uniform(0.005, 0.03, size=n_assets)
+    drift = rng.normal(0.0003, 0.0005, size=n_assets)
+
+    log_returns = factors @ loadings * 0.5 + idio + drift
+    start_prices = rng.uniform(1, 1000, size=n_assets)
+    prices = start_prices * np.exp(np.cumsum(log_returns, axis=0))
+
+    return pd.DataFrame(prices, index=index, columns=asset_names(n_assets))
+
+def generate_scale(scale, seed=0):
+    n_assets, n_years = SCALES[scale]
+    return generate_prices(n_assets, n_years, seed=seed)
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+# every test fills the caches it needs itself, no background warmup thread
+os.environ.setdefault('US_STOCK_WARMUP', '0')
+
+from benchmarks.synthetic_data import generate_prices
+
+@pytest.fixture(scope="session")
+def prices():
+    # small synthetic store, the engines are checked against plain pandas/numpy on it
+    return generate_prices(n_assets=12, n_years=2, seed=1)
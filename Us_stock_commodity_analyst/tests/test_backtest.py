@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.backtest import backtest, rebalance_positions
+from utils.portfolio_stats import TRADING_DAYS
+
+def loop_backtest(prices, weights, rebalance_dates, cost_bps=0.0, initial=1.0):
+    # one portfolio, one day at a time: hold shares, trade back to the targets on rebalance dates
+    weights = weights / weights.sum()
+    prices = prices[weights.index]
+    shares = pd.Series(0.0, index=weights.index)
+    value, costs, curve = float(initial), 0.0, []
+    for date, row in prices.iterrows():
+        if date in rebalance_dates:
+            if shares.any():
+                value = (shares * row).sum()
+            cost = (weights * value - shares * row).abs().sum() * cost_bps / 10_000
+            costs += cost
+            value -= cost
+            shares = weights * value / row
+        curve.append((shares * row).sum())
+    return pd.Series(curve, index=prices.index), costs
+
+@pytest.fixture(scope="module")
+def portfolios(prices):
+    rng = np.random.default_rng(3)
+    assets = list(prices.columns[:5])
+    return pd.DataFrame(rng.random((4, len(assets))), columns=assets, index=[f"P{i}" for i in range(4)])
+
+@pytest.mark.parametrize("rebalance, cost_bps", [('none', 0.0), ('monthly', 10.0), ('quarterly', 25.0)])
+def test_matches_per_portfolio_loop(prices, portfolios, rebalance, cost_bps):
+    equity, drawdown, stats = backtest(prices, portfolios, rebalance=rebalance, cost_bps=cost_bps, initial=100.0)
+    rebalance_dates = set(prices.index[rebalance_positions(prices.index, rebalance)])
+    for name, weights in portfolios.iterrows():
+        curve, costs = loop_backtest(prices, weights, rebalance_dates, cost_bps, initial=100.0)
+        np.testing.assert_allclose(equity[name], curve, rtol=1e-10)
+        np.testing.assert_allclose(drawdown[name], curve / curve.cummax() - 1, atol=1e-12)
+        assert stats.loc[name, 'Costs'] == pytest.approx(costs, rel=1e-9, abs=1e-12)
+    assert (stats['Rebalances'] == len(rebalance_dates) - 1).all()
+
+def test_buy_and_hold_stats(prices, portfolios):
+    weights = portfolios.iloc[0]
+    equity, _, stats = backtest(prices, weights, start=prices.index[100])
+    held = prices.loc[prices.index[100]:, weights.index]
+    # without rebalancing the curve is just the initial shares times the prices
+    expected = held @ (weights / weights.sum() / held.iloc[0])
+    np.testing.assert_allclose(equity.iloc[:, 0], expected, rtol=1e-12)
+
+    daily = expected.pct_change().dropna()
+    row = stats.iloc[0]
+    assert row['Total Return'] == pytest.approx((expected.iloc[-1] - 1) * 100)
+    assert row['Volatility'] == pytest.approx(daily.std() * np.sqrt(TRADING_DAYS) * 100)
+    assert row['Sharpe'] == pytest.approx(daily.mean() / daily.std() * np.sqrt(TRADING_DAYS))
+    assert row['Max Drawdown'] == pytest.approx((expected / expected.cummax() - 1).min() * 100)
+    assert row['Costs'] == 0 and row['Rebalances'] == 0
+
+def test_monthly_rebalance_dates(prices):
+    positions = rebalance_positions(prices.index, 'monthly')
+    months = prices.index.to_period('M')
+    assert positions[0] == 0
+    assert len(positions) == months.nunique()
+    assert (months[positions[1:]] != months[positions[1:] - 1]).all()
+
+def test_unknown_rebalance(prices, portfolios):
+    with pytest.raises(ValueError, match="rebalance"):
+        backtest(prices, portfolios, rebalance='weekly')
+
+def test_nothing_to_simulate_is_rejected(prices, portfolios):
+    with pytest.raises(ValueError, match="no prices on or after"):
+        backtest(prices, portfolios, start=prices.index[-1] + pd.Timedelta(days=1))
+    with pytest.raises(ValueError, match="select no assets"):
+        backtest(prices, portfolios[[]])
+    with pytest.raises(ValueError, match="without prices"):
+        backtest(prices, portfolios.rename(columns={portfolios.columns[0]: 'Not_A_Column'}))
@@ -0,0 +1,45 @@
+import os
+
+import pandas as pd
+import pytest
+
+from utils.batch_report import generate_reports, report_file_name
+from utils.normalization import normalize_prices
+from utils.seasonal_cube import build_seasonal_cube, build_yearly_stats
+
+@pytest.fixture(scope="module")
+def inputs(prices):
+    # one asset whose name needs escaping in both the URL and the HTML
+    norm = normalize_prices(prices.iloc[:, :2]).rename(columns={prices.columns[1]: 'S&P_500_Price'})
+    return norm, build_seasonal_cube(norm), build_yearly_stats(norm)
+
+def test_reports_are_written(inputs, tmp_path):
+    norm, cube, yearly = inputs
+    numbers = generate_reports(norm, cube, yearly, str(tmp_path), max_workers=1)
+
+    pairs = [(asset, year) for asset in norm.columns for year in (2020, 2021)]
+    assert sorted(os.listdir(tmp_path)) == sorted([report_file_name(*pair) for pair in pairs]
+                                                  + ['index.html', 'seasonal_report.parquet'])
+
+    # the Parquet holds one row per (asset, year, month) with the cube's numbers
+    stored = pd.read_parquet(tmp_path / 'seasonal_report.parquet')
+    pd.testing.assert_frame_equal(stored, numbers)
+    assert len(stored) == len(cube)
+    expected = cube['change'].to_numpy()
+    assert stored.set_index(['asset', 'year', 'month'])['change'].loc[cube.index].to_numpy() == pytest.approx(expected)
+    assert stored.loc[stored['asset'] == 'S&P_500_Price', 'year_best_month'].notna().all()
+
+    page = (tmp_path / report_file_name('S&P_500_Price', 2021)).read_text(encoding='utf-8')
+    assert "<h1>Seasonal Analysis of S&amp;P 500 Price 2021</h1>" in page
+    assert "Best Month:" in page and "December" in page
+
+    index = (tmp_path / 'index.html').read_text(encoding='utf-8')
+    assert '<a href="S%26P_500_Price_2020.html">S&amp;P 500 Price 2020</a>' in index
+    assert index.count('<li><a href=') == len(pairs)
+    assert 'href="S&P' not in index
+
+def test_numbers_only(inputs, tmp_path):
+    norm, cube, yearly = inputs
+    numbers = generate_reports(norm, cube, yearly, str(tmp_path), assets=['S&P_500_Price'], max_workers=1, render=False)
+    assert os.listdir(tmp_path) == ['seasonal_report.parquet']
+    assert set(numbers['asset']) == {'S&P_500_Price'}
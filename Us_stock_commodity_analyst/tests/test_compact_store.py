@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pytest
+
+from utils.compact_store import VERSION_KEY, ensure_feather_store, is_zero_copy, open_feather_store, write_feather_store
+
+@pytest.fixture
+def long_prices():
+    # more rows than pyarrow's default Feather chunk size of 64Ki rows
+    index = pd.date_range('1800-01-01', periods=70_000, freq='D', name='Date')
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.uniform(1, 100, size=(len(index), 3)), index=index, columns=['A_Price', 'B_Price', 'C_Price'])
+
+def test_round_trip_keeps_every_row(tmp_path, long_prices):
+    path = str(tmp_path / 'prices.f32.feather')
+    write_feather_store(long_prices, path, 'v1')
+    mapped = open_feather_store(path)
+    assert is_zero_copy(mapped)
+    expected = long_prices.astype(np.float32)
+    expected.index = expected.index.as_unit('ns')
+    pd.testing.assert_frame_equal(mapped, expected, check_freq=False)
+
+def write_chunked(df, path, version):
+    table = pa.table({'Date': pa.array(df.index.to_numpy())} | {col: pa.array(df[col].to_numpy(dtype=np.float32)) for col in df.columns})
+    feather.write_feather(table.replace_schema_metadata({VERSION_KEY: version.encode()}), path,
+                          compression='uncompressed', chunksize=1000)
+
+def test_multi_chunk_file_is_refused_then_rebuilt(tmp_path, long_prices):
+    path = str(tmp_path / 'prices.f32.feather')
+    write_chunked(long_prices, path, 'v1')
+    with pytest.raises(ValueError, match="record batches"):
+        open_feather_store(path)
+
+    ensure_feather_store(str(tmp_path / 'prices.parquet'), 'v1', lambda: long_prices)
+    assert len(open_feather_store(path)) == len(long_prices)
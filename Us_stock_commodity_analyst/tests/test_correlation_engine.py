@@ -0,0 +1,96 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic_data import generate_prices
+from utils.correlation_engine import blocked_correlation, cluster_tiles, reorder_correlation, top_correlated_pairs
+
+@pytest.mark.parametrize("block_size", [5, 512])
+def test_blocked_correlation_matches_pandas(prices, block_size):
+    returns = prices.pct_change().iloc[1:]
+    corr = blocked_correlation(returns, block_size=block_size)
+    assert corr.dtypes.eq(np.float32).all()
+    pd.testing.assert_frame_equal(corr.astype(np.float64), returns.corr(), atol=1e-5)
+
+def test_constant_column_has_zero_correlation(prices):
+    data = prices.copy()
+    data[data.columns[0]] = 1.0
+    corr = blocked_correlation(data, block_size=4).to_numpy()
+    assert corr[0, 0] == 1
+    np.testing.assert_array_equal(corr[0, 1:], 0)
+
+def test_reorder_keeps_the_matrix_and_groups_clusters(prices):
+    corr = prices.pct_change().iloc[1:].corr()
+    ordered, clusters = reorder_correlation(corr, n_clusters=3)
+    pd.testing.assert_frame_equal(ordered, corr.loc[ordered.index, ordered.columns])
+    assert list(ordered.index) == list(ordered.columns) == list(clusters.index)
+    assert sorted(ordered.index) == sorted(corr.index)
+    # numbered 1..k in order of appearance, each cluster one contiguous run along the axis
+    runs = [label for label, _ in itertools.groupby(clusters)]
+    assert runs == list(range(1, len(runs) + 1))
+
+def test_cluster_tiles_are_block_means(prices):
+    corr = prices.pct_change().iloc[1:].corr()
+    ordered, clusters = reorder_correlation(corr, n_clusters=3)
+    tiles = cluster_tiles(ordered, clusters)
+    for i, a in enumerate(sorted(clusters.unique())):
+        for j, b in enumerate(sorted(clusters.unique())):
+            block = ordered.loc[clusters.index[clusters == a], clusters.index[clusters == b]]
+            assert tiles.iloc[i, j] == pytest.approx(block.to_numpy().mean())
+
+def brute_force_pairs(corr):
+    # every distinct pair once, the double loop the page used before
+    rows = [(a, b, corr.loc[a, b]) for i, a in enumerate(corr.index) for b in corr.columns[i + 1:]]
+    return pd.DataFrame(rows, columns=['Asset1', 'Asset2', 'Correlation']).sort_values('Correlation', ascending=False)
+
+@pytest.mark.parametrize("k", [1, 6, 40, 10_000])
+@pytest.mark.parametrize("block_size", [3, 512])
+def test_top_pairs_match_brute_force(k, block_size):
+    corr = generate_prices(n_assets=25, n_years=1, seed=3).pct_change().iloc[1:].corr()
+    everything = brute_force_pairs(corr)
+
+    largest = top_correlated_pairs(corr, k=k, largest=True, block_size=block_size)
+    np.testing.assert_allclose(largest['Correlation'], everything['Correlation'].head(k))
+    smallest = top_correlated_pairs(corr, k=k, largest=False, block_size=block_size)
+    np.testing.assert_allclose(smallest['Correlation'], everything['Correlation'].tail(k))
+
+    # returned pairs really are upper-triangle entries of corr
+    for pair in largest.itertuples():
+        assert corr.index.get_loc(pair.Asset1) < corr.index.get_loc(pair.Asset2)
+        assert corr.loc[pair.Asset1, pair.Asset2] == pair.Correlation
+
+@pytest.mark.parametrize("block_size", [5, 512])
+def test_missing_values_are_pairwise_like_pandas(prices, block_size):
+    returns = prices.pct_change().iloc[1:].copy()
+    # a late listing, a halt and scattered gaps
+    returns.iloc[:120, 2] = np.nan
+    returns.iloc[300:340, 7] = np.nan
+    rng = np.random.default_rng(4)
+    returns = returns.mask(rng.random(returns.shape) < 0.02)
+    corr = blocked_correlation(returns, block_size=block_size)
+    pd.testing.assert_frame_equal(corr.astype(np.float64), returns.corr(), atol=1e-5)
+
+def test_pairs_without_shared_rows_are_nan():
+    data = pd.DataFrame({'a': [1.0, 2.0, 3.0, np.nan, np.nan], 'b': [np.nan, np.nan, np.nan, 1.0, 3.0],
+                         'c': [2.0, 1.0, 5.0, 4.0, 3.0], 'flat': [7.0, 7.0, np.nan, 7.0, 7.0]})
+    corr = blocked_correlation(data)
+    assert np.isnan(corr.loc['a', 'b']) and np.isnan(corr.loc['b', 'a'])
+    assert corr.loc['a', 'c'] == pytest.approx(data[['a', 'c']].dropna().corr().iloc[0, 1])
+    # a constant column correlates 0, the same with or without gaps
+    assert (corr.loc['flat'].drop('flat') == 0).all()
+
+@pytest.mark.parametrize("largest", [True, False])
+def test_top_pairs_skip_nan_scores(prices, largest):
+    data = prices.pct_change().iloc[1:].copy()
+    # pandas leaves a constant column's correlations NaN
+    data[data.columns[0]] = 0.0
+    data[data.columns[5]] = 0.0
+    corr = data.corr()
+    everything = brute_force_pairs(corr).dropna()
+    expected = everything.head(6) if largest else everything.tail(6)
+
+    pairs = top_correlated_pairs(corr, k=6, largest=largest, block_size=4)
+    assert len(pairs) == 6
+    np.testing.assert_allclose(pairs['Correlation'], expected['Correlation'])
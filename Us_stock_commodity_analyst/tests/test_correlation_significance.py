@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.correlation_significance import (_bootstrap_chunk, block_indices, block_length,
+                                            bootstrap_correlations, correlation_significance)
+
+@pytest.fixture(scope="module")
+def returns():
+    # two strongly related pairs and two independent noise series
+    rng = np.random.default_rng(5)
+    base = rng.normal(size=(500, 2))
+    noise = rng.normal(size=(500, 4))
+    data = np.column_stack([base[:, 0], base[:, 0] + 0.3 * noise[:, 0],
+                            base[:, 1], -base[:, 1] + 0.3 * noise[:, 1],
+                            noise[:, 2], noise[:, 3]])
+    return pd.DataFrame(data, columns=['A', 'A2', 'B', 'B_inv', 'N1', 'N2'])
+
+def test_block_indices():
+    idx = block_indices(np.random.default_rng(0), 100, 14, 30)
+    assert idx.shape == (30, 100)
+    assert idx.min() >= 0 and idx.max() < 100
+    # each block is a run of consecutive rows
+    assert (np.diff(idx[:, :14], axis=1) == 1).all()
+    assert block_length(1000) == 14 and block_length(100_000) == 46
+
+def test_replicates_are_block_resampled_corr(returns):
+    values = returns.to_numpy()
+    seed = np.random.SeedSequence(0).spawn(1)[0]
+    replicates = _bootstrap_chunk(values, 3, 20, seed)
+    # redraw the same indices and correlate each replicate with numpy
+    idx = block_indices(np.random.default_rng(seed), len(values), 20, 3)
+    upper = np.triu_indices(values.shape[1], k=1)
+    for b in range(3):
+        expected = np.corrcoef(values[idx[b]], rowvar=False)[upper]
+        np.testing.assert_allclose(replicates[b], expected, atol=1e-6)
+
+def test_pool_matches_in_process_shape(returns, monkeypatch):
+    values = returns.to_numpy()
+    in_process = bootstrap_correlations(values, n_boot=40, seed=1)
+    monkeypatch.setattr('utils.correlation_significance.POOL_THRESHOLD', 0)
+    pooled = bootstrap_correlations(values, n_boot=40, seed=1, max_workers=2)
+    assert pooled.shape == in_process.shape == (40, 15)
+    # different streams per worker, but the same sampling distribution
+    np.testing.assert_allclose(pooled.mean(axis=0), in_process.mean(axis=0), atol=0.05)
+
+def test_significance(returns):
+    result = correlation_significance(returns, n_boot=200)
+    corr = returns.corr()
+    p_value, low, high = result['p_value'], result['ci_low'], result['ci_high']
+
+    assert ((p_value > 0) & (p_value <= 1)).to_numpy()[~np.eye(6, dtype=bool)].all()
+    assert (low <= high).all().all()
+    assert ((low <= corr + 1e-6) & (corr <= high + 1e-6)).all().all()
+    assert np.diag(result['significant']).all()
+    assert (p_value.to_numpy() == p_value.to_numpy().T).all()
+
+    assert result['significant'].loc['A', 'A2'] and result['significant'].loc['B', 'B_inv']
+    assert not result['significant'].loc['N1', 'N2']
+    assert p_value.loc['N1', 'N2'] > 0.05
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.date_range import cumulative_log_returns, range_positions, rebase, slice_range
+
+@pytest.fixture
+def frame():
+    index = pd.bdate_range('2022-01-03', periods=10, name='Date')
+    return pd.DataFrame({'A': np.arange(100.0, 110.0), 'B': np.linspace(50.0, 40.0, 10)}, index=index)
+
+def test_inclusive_bounds(frame):
+    sliced = slice_range(frame, '2022-01-04', '2022-01-07')
+    assert list(sliced.index.day) == [4, 5, 6, 7]
+    # dates between trading days snap inwards
+    assert slice_range(frame, '2022-01-08', '2022-01-09').empty
+    assert list(slice_range(frame, '2022-01-08', '2022-01-11').index.day) == [10, 11]
+
+def test_bounds_outside_the_data(frame):
+    assert range_positions(frame.index) == (0, 10)
+    assert range_positions(frame.index, '2021-01-01', '2030-01-01') == (0, 10)
+    assert slice_range(frame, '2030-01-01').empty
+    assert slice_range(frame, end='2021-01-01').empty
+    pd.testing.assert_frame_equal(slice_range(frame, '2021-01-01', '2030-01-01'), frame)
+
+def test_start_after_end_is_empty(frame):
+    i, j = range_positions(frame.index, '2022-01-10', '2022-01-05')
+    assert i >= j
+    sliced = slice_range(frame, '2022-01-10', '2022-01-05')
+    assert sliced.empty and list(sliced.columns) == ['A', 'B']
+    assert rebase(cumulative_log_returns(frame).iloc[i:j]).empty
+
+def test_single_day(frame):
+    day = slice_range(frame, '2022-01-06', '2022-01-06')
+    assert list(day.index) == [pd.Timestamp('2022-01-06')]
+    assert (rebase(cumulative_log_returns(frame).loc[day.index]) == 100).all().all()
+
+def test_rebase_matches_dividing_by_the_first_row(frame):
+    cum_log = cumulative_log_returns(frame)
+    assert (cum_log.iloc[0] == 0).all()
+    np.testing.assert_allclose(cum_log, np.log(frame / frame.iloc[0]), atol=1e-12)
+
+    sliced = frame.iloc[3:8]
+    rebased = rebase(slice_range(cum_log, sliced.index[0], sliced.index[-1]))
+    pd.testing.assert_frame_equal(rebased, sliced / sliced.iloc[0] * 100)
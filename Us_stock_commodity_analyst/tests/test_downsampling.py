@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+
+from utils.downsampling import decimated_line, downsample, lttb_indices
+
+def lttb_reference(x, y, n_out):
+    # textbook Largest-Triangle-Three-Buckets, one candidate at a time
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    keep = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start = int(np.floor(i * every)) + 1
+        end = int(np.floor((i + 1) * every)) + 1
+        next_end = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        keep.append(best)
+        a = best
+    keep.append(n - 1)
+    return np.array(keep)
+
+def test_lttb_matches_reference():
+    rng = np.random.default_rng(0)
+    x = np.arange(5000, dtype=np.float64)
+    y = np.cumsum(rng.normal(size=len(x)))
+    for n_out in [3, 10, 500, 1200]:
+        np.testing.assert_array_equal(lttb_indices(x, y, n_out), lttb_reference(x, y, n_out))
+
+def test_short_series_are_left_alone():
+    x = np.arange(10, dtype=np.float64)
+    np.testing.assert_array_equal(lttb_indices(x, x, 50), np.arange(10))
+    series = pd.Series(np.arange(10.0), index=pd.date_range('2020-01-01', periods=10))
+    pd.testing.assert_series_equal(downsample(series, 50), series)
+
+def test_downsample_keeps_ends_and_original_points(prices):
+    series = prices[prices.columns[0]]
+    reduced = downsample(series, 100)
+    assert len(reduced) == 100
+    assert reduced.index[0] == series.index[0] and reduced.index[-1] == series.index[-1]
+    assert set(reduced.index) <= set(series.index)
+    pd.testing.assert_series_equal(reduced, series.loc[reduced.index])
+
+def test_decimated_line_switches_to_webgl(prices):
+    fig = decimated_line(prices, n_out=50, webgl_threshold=10_000)
+    assert {trace.type for trace in fig.data} == {'scatter'}
+    assert all(len(trace.x) == 50 for trace in fig.data)
+    fig = decimated_line(prices, n_out=50, webgl_threshold=100)
+    assert {trace.type for trace in fig.data} == {'scattergl'}
@@ -0,0 +1,74 @@
+import plotly.graph_objects as go
+
+from utils import figure_cache
+from utils.figure_cache import FigureCache, frame_key
+
+def builder(n, built):
+    def build():
+        built.append(n)
+        return go.Figure(go.Scatter(x=list(range(n)), y=list(range(n)), name=f"trace {n}"))
+    return build
+
+def test_hit_returns_the_same_figure_without_rebuilding():
+    cache, built = FigureCache(), []
+    first = cache.get_or_build(('line', 1), builder(10, built))
+    assert cache.get_or_build(('line', 1), builder(10, built)) is first
+    assert built == [10]
+    assert cache.stats() == {'entries': 1, 'bytes': len(first.to_json()), 'hits': 1, 'misses': 1}
+
+def test_least_recently_used_entry_is_evicted():
+    cache, built = FigureCache(max_entries=2), []
+    cache.get_or_build('a', builder(1, built))
+    cache.get_or_build('b', builder(2, built))
+    cache.get_or_build('a', builder(1, built))      # 'a' is now the newest
+    cache.get_or_build('c', builder(3, built))      # so 'b' goes
+    assert cache.stats()['entries'] == 2
+    cache.get_or_build('a', builder(1, built))
+    cache.get_or_build('b', builder(2, built))
+    assert built == [1, 2, 3, 2]
+
+def test_byte_cap():
+    size = len(builder(50, [])().to_json())
+    cache, built = FigureCache(max_bytes=int(size * 2.5)), []
+    for key in 'abc':
+        cache.get_or_build(key, builder(50, built))
+    # only two figures fit, the oldest was dropped to make room
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['bytes'] == 2 * size <= cache.max_bytes
+    cache.get_or_build('a', builder(50, built))
+    assert len(built) == 4
+
+    # a figure larger than the whole cache is returned but never stored
+    small = FigureCache(max_bytes=size - 1)
+    fig = small.get_or_build('big', builder(50, built))
+    assert isinstance(fig, go.Figure)
+    assert small.stats()['entries'] == 0 and small.stats()['bytes'] == 0
+
+def test_clear():
+    cache = FigureCache()
+    cache.get_or_build('a', builder(5, []))
+    cache.clear()
+    assert cache.stats()['entries'] == 0 and cache.stats()['bytes'] == 0
+
+def test_frame_key_follows_the_data(prices):
+    frame = prices.iloc[:50, :3]
+    assert frame_key(frame) == frame_key(frame.copy())
+
+    changed = frame.copy()
+    changed.iloc[10, 1] *= 1.0001
+    shifted = frame.copy()
+    shifted.index = shifted.index + shifted.index.freq
+    renamed = frame.rename(columns={frame.columns[0]: 'Other_Price'})
+    keys = {frame_key(frame), frame_key(changed), frame_key(shifted), frame_key(renamed), frame_key(frame.iloc[:49])}
+    assert len(keys) == 5
+
+    series = frame.iloc[:, 0]
+    assert frame_key(series) != frame_key(series.rename('Other_Price'))
+    assert frame_key(series) == frame_key(series.copy())
+
+def test_cached_figure_keys_include_the_name(monkeypatch):
+    cache, built = FigureCache(), []
+    monkeypatch.setattr(figure_cache, 'get_figure_cache', lambda: cache)
+    figure_cache.cached_figure('seasonal', ('k',), builder(3, built))
+    figure_cache.cached_figure('other', ('k',), builder(3, built))
+    assert len(built) == 2 and ('seasonal', 'k') in cache._items
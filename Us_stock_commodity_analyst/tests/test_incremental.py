@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.incremental import IncrementalState, StateRegistry
+from utils.normalization import normalize_prices
+from utils.portfolio_stats import compute_asset_stats
+
+NUMERIC = ['Return', 'Risk', 'Sharpe', 'VaR', 'MaxDD', 'Skew', 'Kurt', 'Beta', 'Alpha', 'Corr']
+
+def assert_matches_full_history(state, prices, smoothing):
+    norm_df = normalize_prices(prices, window=14, smoothing=smoothing)
+    pd.testing.assert_frame_equal(state.normalized(), norm_df, check_freq=False)
+    pd.testing.assert_frame_equal(state.correlation(), norm_df.corr(), atol=1e-9)
+    benchmark = prices.columns[0]
+    pd.testing.assert_frame_equal(
+        state.asset_stats(benchmark)[NUMERIC], compute_asset_stats(prices, benchmark)[NUMERIC], atol=1e-9
+    )
+
+@pytest.mark.parametrize("smoothing", ['sma', 'ema', 'none'])
+def test_appended_chunks_match_full_history(prices, smoothing):
+    state = IncrementalState.from_prices(prices.iloc[:100], smoothing=smoothing)
+    for start in range(100, len(prices), 37):
+        state.append(prices.iloc[start:start + 37])
+    assert_matches_full_history(state, prices, smoothing)
+
+def test_var_with_missing_returns_is_nan_like_percentile(prices):
+    gappy = prices.copy()
+    gappy.iloc[50, 2] = np.nan
+    state = IncrementalState.from_prices(gappy.iloc[:80])
+    state.append(gappy.iloc[80:])
+    expected = np.percentile(gappy.pct_change().iloc[1:].to_numpy(), 5, axis=0) * 100
+    np.testing.assert_allclose(state.asset_stats()['VaR'].to_numpy(), expected)
+
+def test_registry_keeps_older_versions(prices):
+    registry = StateRegistry()
+    old = registry.get('store', 'v1', lambda: prices.iloc[:300])
+    new = registry.get('store', 'v2', lambda: prices)
+    assert new is not old
+    assert old.n_rows == 300 and new.n_rows == len(prices)
+
+    # a session still on v1 gets its state back untouched, nothing is rebuilt
+    assert registry.get('store', 'v1', lambda: pytest.fail("v1 was evicted")) is old
+    assert_matches_full_history(old, prices.iloc[:300], 'sma')
+    assert_matches_full_history(new, prices, 'sma')
+
+def test_copies_appending_different_rows_do_not_share_them(prices):
+    base = IncrementalState.from_prices(prices.iloc[:200])
+    first = base.copy().append(prices.iloc[:300])
+    second = base.copy().append(prices.iloc[:250])
+    assert_matches_full_history(base, prices.iloc[:200], 'sma')
+    assert_matches_full_history(first, prices.iloc[:300], 'sma')
+    assert_matches_full_history(second, prices.iloc[:250], 'sma')
+
+def test_store_append_matches_full_recompute(prices, tmp_path, monkeypatch):
+    from utils import data_store, ingestion, partitioned_store
+
+    path = str(tmp_path / 'store.parquet')
+    prices.iloc[:300].to_parquet(path)
+    partitioned_store.write_partitioned_dataset(prices.iloc[:300], ingestion.dataset_path(path))
+    before = data_store.get_asset_stats(path=path)
+    base_bytes = open(path, 'rb').read()
+
+    assert data_store.append_trading_days(prices.iloc[250:400], path=path) == 100
+    # only rows after the stored end count, appending them again adds nothing
+    assert ingestion.append_rows(prices.iloc[:400], path) == 0
+    assert ingestion.append_rows(prices.iloc[400:], path) == len(prices) - 400
+
+    # the cleaned file is never rewritten, new days are separate parts
+    assert open(path, 'rb').read() == base_bytes
+    assert len(ingestion.appended_parts(path)) == 2
+    pd.testing.assert_frame_equal(ingestion.read_store(path), prices, check_freq=False)
+    pd.testing.assert_frame_equal(
+        partitioned_store.read_prices(ingestion.dataset_path(path), list(prices.columns)), prices,
+        check_freq=False, check_index_type=False, check_names=False
+    )
+
+    # the state of the first 300 rows is extended, not rebuilt from the whole store
+    monkeypatch.setattr(IncrementalState, 'from_prices', classmethod(lambda *a, **k: pytest.fail("state was rebuilt")))
+    benchmark = prices.columns[0]
+    after = data_store.get_asset_stats(benchmark, path=path)
+    assert not after.equals(before)
+    pd.testing.assert_frame_equal(after[NUMERIC], compute_asset_stats(prices, benchmark)[NUMERIC], atol=1e-9)
+    pd.testing.assert_frame_equal(data_store.get_normalized_prices(path), normalize_prices(prices), check_freq=False)
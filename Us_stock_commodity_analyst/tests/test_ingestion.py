@@ -0,0 +1,96 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from utils import ingestion
+from utils.ingestion import clean_raw_data, file_checksum, ingest, manifest_path
+
+# the feed's layout: an unnamed index column, newest first, day-first dates in two formats,
+# thousands separators (also Indian 5,89,498 grouping), empty volume cells and a repeated day
+RAW_CSV = """\
+,Date,Bitcoin_Price,Bitcoin_Vol.,Gold_Price,Gold_Vol.,Nasdaq_100_Price
+0,2/2/2024,"43,194.70",42650,"2,053.70",,"17,642.73"
+1,01-02-2024,"43,081.40","5,89,498","2,071.10",260920,"17,344.71"
+2,31-01-2024,"42,580.50",56480,"2,067.40",,"17,137.24"
+3,12/1/2024,"42,853.20",61100,"2,051.60",180,"16,832.92"
+4,12/1/2024,"42,850.00",61000,"2,050.00",170,"16,830.00"
+"""
+
+@pytest.fixture
+def raw_path(tmp_path):
+    path = tmp_path / 'raw.csv'
+    path.write_text(RAW_CSV)
+    return str(path)
+
+def read_raw(path):
+    return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+def test_parser(raw_path):
+    clean = clean_raw_data(read_raw(raw_path), include_volume=True)
+    # day first in both formats: 2 February, 1 February, 31 January and 12 January (not 1 December)
+    assert clean.index.strftime('%Y-%m-%d').tolist() == ['2024-01-12', '2024-01-31', '2024-02-01', '2024-02-02']
+    assert clean.index.name == 'Date'
+    assert clean.loc['2024-02-02', 'Bitcoin_Price'] == 43194.70
+    assert clean.loc['2024-02-01', 'Gold_Price'] == 2071.10
+    assert clean.loc['2024-02-01', 'Bitcoin_Vol.'] == 589498
+    assert pd.isna(clean.loc['2024-02-02', 'Gold_Vol.'])
+    # the later row of a repeated day is the one kept, the file is newest first so that is the older export
+    assert clean.loc['2024-01-12', 'Bitcoin_Price'] == 42850.00
+    assert list(clean.columns) == ['Bitcoin_Price', 'Gold_Price', 'Nasdaq_100_Price', 'Bitcoin_Vol.', 'Gold_Vol.']
+    assert clean[['Bitcoin_Price', 'Gold_Price']].dtypes.eq('float64').all()
+    assert list(clean_raw_data(read_raw(raw_path)).columns) == ['Bitcoin_Price', 'Gold_Price', 'Nasdaq_100_Price']
+
+def test_manifest_and_skip_on_unchanged_input(raw_path, tmp_path):
+    output = str(tmp_path / 'store.parquet')
+    manifest, rebuilt = ingest(raw_path, output)
+    assert rebuilt
+    assert manifest['input_sha256'] == file_checksum(raw_path)
+    assert manifest['output_sha256'] == file_checksum(output)
+    assert manifest['output_rows'] == 4 and manifest['input_rows'] == 5
+    assert (manifest['start_date'], manifest['end_date']) == ('2024-01-12', '2024-02-02')
+    assert manifest['partitions'] == [2024]
+    with open(manifest_path(output)) as f:
+        assert json.load(f) == manifest
+    pd.testing.assert_frame_equal(pd.read_parquet(output), clean_raw_data(read_raw(raw_path)), check_freq=False)
+
+    mtime = os.stat(output).st_mtime_ns
+    assert ingest(raw_path, output) == (manifest, False)
+    assert os.stat(output).st_mtime_ns == mtime
+    # a changed input, a different volume setting or --force rebuild
+    assert ingest(raw_path, output, include_volume=True)[1]
+    assert ingest(raw_path, output, include_volume=True, force=True)[1]
+    with open(raw_path, 'a') as f:
+        f.write('5,11/1/2024,"46,000.00",1,"2,040.00",1,"16,800.00"\n')
+    manifest, rebuilt = ingest(raw_path, output, include_volume=True)
+    assert rebuilt and manifest['output_rows'] == 5
+
+def test_failed_write_keeps_the_previous_output(raw_path, tmp_path, monkeypatch):
+    output = str(tmp_path / 'store.parquet')
+    ingest(raw_path, output)
+    before = open(output, 'rb').read()
+
+    def crash_midway(self, path, *args, **kwargs):
+        with open(path, 'wb') as f:
+            f.write(b'PAR1 half a file')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, 'to_parquet', crash_midway)
+    with pytest.raises(OSError, match="disk full"):
+        ingest(raw_path, output, force=True)
+    # only the temp file was touched, readers still see the complete previous artifact
+    assert open(output, 'rb').read() == before
+    assert os.path.exists(output + '.tmp')
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(pd.read_parquet(output), clean_raw_data(read_raw(raw_path)), check_freq=False)
+    # the next successful run replaces the leftover temp file
+    ingest(raw_path, output, force=True)
+    assert not os.path.exists(output + '.tmp')
+
+def test_cli(raw_path, tmp_path, capsys):
+    output = str(tmp_path / 'store.parquet')
+    ingestion.main(['--input', raw_path, '--output', output])
+    assert capsys.readouterr().out.startswith("Rebuilt:")
+    ingestion.main(['--input', raw_path, '--output', output])
+    assert capsys.readouterr().out.startswith("Up to date, skipped:")
@@ -0,0 +1,28 @@
+import pandas as pd
+import pytest
+
+from utils.normalization import normalize_prices
+
+def column_loop(prices, window, smoothing):
+    # the per-column loop the dashboard used before normalize_prices
+    norm_df = prices.copy()
+    for col in norm_df.columns:
+        norm_df[col] = norm_df[col] / norm_df[col].iloc[0] * 100
+        if smoothing == 'sma':
+            norm_df[col] = norm_df[col].rolling(window=window, min_periods=1).mean()
+        elif smoothing == 'ema':
+            norm_df[col] = norm_df[col].ewm(span=window, adjust=False).mean()
+    return norm_df.drop(norm_df.index[0], axis=0)
+
+@pytest.mark.parametrize("smoothing", ['sma', 'ema', 'none'])
+@pytest.mark.parametrize("window", [1, 14, 30])
+def test_matches_column_loop(prices, window, smoothing):
+    pd.testing.assert_frame_equal(normalize_prices(prices, window, smoothing), column_loop(prices, window, smoothing), check_freq=False)
+
+def test_base_date_rebases_from_that_day(prices):
+    base = prices.index[100]
+    pd.testing.assert_frame_equal(normalize_prices(prices, base_date=base), column_loop(prices.loc[base:], 14, 'sma'), check_freq=False)
+
+def test_unknown_smoothing_is_rejected(prices):
+    with pytest.raises(ValueError, match="smoothing"):
+        normalize_prices(prices, smoothing='median')
@@ -0,0 +1,95 @@
+import datetime
+import os
+import types
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import APP_DIR
+
+PAGES = ["Overview", "Seasonal Analysis", "Correlation Analysis", "Portofolio"]
+
+def open_page(page, **state):
+    at = AppTest.from_file(os.path.join(APP_DIR, "Dashboard.py"), default_timeout=300)
+    at.session_state["page"] = page
+    for key, value in state.items():
+        at.session_state[key] = value
+    return at.run()
+
+def assert_no_exception(at):
+    assert not at.exception, [e.message for e in at.exception]
+
+@pytest.mark.parametrize("page", PAGES)
+def test_page_renders(page):
+    assert_no_exception(open_page(page))
+
+@pytest.mark.parametrize("basis", ["Normalized Price", "Daily Returns"])
+@pytest.mark.parametrize("clustered", [False, True])
+def test_correlation_views(basis, clustered):
+    assert_no_exception(open_page("Correlation Analysis", corr_basis=basis, corr_clustered=clustered))
+
+def test_portfolio_with_assets():
+    state = {f"portfolio_{asset}": True for asset in ["Apple_Price", "Gold_Price", "Netflix_Price"]}
+    assert_no_exception(open_page("Portofolio", **state))
+
+@pytest.mark.parametrize("picked", [
+    (datetime.date(2021, 1, 4), datetime.date(2022, 12, 30)),
+    # only the end moves, start stays at the edge of the data
+    (None, datetime.date(2022, 12, 30))
+])
+def test_significance_with_date_range(picked):
+    at = open_page("Correlation Analysis")
+    date_range = at.date_input(key="date_range")
+    start = picked[0] or date_range.value[0]
+    at.date_input(key="date_range").set_value((start, picked[1])).run()
+    at.checkbox(key="corr_significance").check().run()
+    assert_no_exception(at)
+    assert any("n.s." in caption.value for caption in at.caption)
+
+    active_start, active_end = at.session_state["active_date_range"]
+    assert active_end == datetime.datetime(2022, 12, 30)
+    assert (active_start is None) == (picked[0] is None)
+
+def test_large_universe_always_uses_tiles(monkeypatch):
+    import utils.correlation_page
+    import utils.fungction_correlation_page
+    # the real universe is small, lower the threshold instead of generating thousands of assets
+    monkeypatch.setattr(utils.correlation_page, "TILE_THRESHOLD", 10)
+    monkeypatch.setattr(utils.fungction_correlation_page, "TILE_THRESHOLD", 10)
+
+    at = open_page("Correlation Analysis", corr_clustered=False)
+    assert_no_exception(at)
+    assert at.checkbox(key="corr_clustered").disabled
+    assert at.selectbox(key="drill_row_cluster") is not None
+
+def test_seasonal_year_follows_date_range():
+    at = open_page("Seasonal Analysis", selected_asset="Gold_Price", selected_year=2021)
+    at.date_input(key="date_range").set_value((datetime.date(2021, 3, 15), datetime.date(2022, 6, 30))).run()
+    assert_no_exception(at)
+
+    metrics = {metric.label: metric.value for metric in at.metric}
+    # the year starts at the range start, rebased to 100 like the overview
+    assert metrics["Open Price"] == metrics["Starting Price"] == "100.00"
+    assert any(markdown.value.startswith("From 2021-03-15") for markdown in at.markdown)
+    assert any("Clipped to the date range" in caption.value for caption in at.caption)
+
+def test_unreachable_target_return_is_reported():
+    state = {f"portfolio_{asset}": True for asset in ["Apple_Price", "Gold_Price"]}
+    at = open_page("Portofolio", allocation_method="Target Return", **state)
+    at.number_input[1].set_value(5000.0).run()
+    assert_no_exception(at)
+    assert any("No long-only portfolio reaches 5000.0%" in warning.value for warning in at.warning)
+
+def test_optimizer_failure_falls_back_to_monte_carlo(monkeypatch):
+    from utils import portfolio_optimizer
+
+    def not_converged(objective, x0, **kwargs):
+        return types.SimpleNamespace(success=False, message="Iteration limit reached", x=x0)
+
+    monkeypatch.setattr(portfolio_optimizer, "minimize", not_converged)
+    # an asset set no other test uses, so the cached frontier stays out of their way
+    state = {f"portfolio_{asset}": True for asset in ["Copper_Price", "Platinum_Price", "Microsoft_Price"]}
+    at = open_page("Portofolio", allocation_method="Max Sharpe", **state)
+    assert_no_exception(at)
+    assert any("did not converge" in warning.value for warning in at.warning)
+    assert any(metric.label == "Sharpe Ratio" for metric in at.metric)
@@ -0,0 +1,55 @@
+import pandas as pd
+import pytest
+
+from utils import partitioned_store
+from utils.normalization import normalize_prices
+from utils.partitioned_store import (date_bounds, list_assets, list_years, read_normalized, read_prices,
+                                     write_partitioned_dataset)
+
+@pytest.fixture(scope="module")
+def store(prices, tmp_path_factory):
+    root = str(tmp_path_factory.mktemp('store') / 'prices')
+    write_partitioned_dataset(prices, root)
+    return root
+
+def test_layout(prices, store):
+    assert list_years(store) == [2020, 2021]
+    assert list_assets(store) == list(prices.columns)
+    # the base row is not a selectable date
+    assert date_bounds(store) == (prices.index[1], prices.index[-1])
+
+def test_read_prices_prunes_columns_and_dates(prices, store):
+    columns = list(prices.columns[[4, 1]])
+    frame = read_prices(store, columns, start='2020-12-15', end='2021-02-10')
+    expected = prices.loc['2020-12-15':'2021-02-10', columns]
+    pd.testing.assert_frame_equal(frame, expected, check_freq=False, check_index_type=False)
+    pd.testing.assert_frame_equal(read_prices(store), prices, check_freq=False, check_index_type=False)
+
+@pytest.mark.parametrize("start, end", [
+    ('2021-01-05', '2021-03-31'),   # the window padding reaches back into the 2020 partition
+    ('2021-01-01', None),
+    ('2020-01-08', '2020-02-14'),   # the padding would reach the base row, the full prefix is normalized
+    ('2021-06-30', '2021-07-01'),
+])
+@pytest.mark.parametrize("smoothing", ['sma', 'ema'])
+def test_read_normalized_matches_full_slice(prices, store, start, end, smoothing):
+    columns = list(prices.columns[:3])
+    frame = read_normalized(store, columns, start=start, end=end, window=14, smoothing=smoothing)
+    expected = normalize_prices(prices, window=14, smoothing=smoothing).loc[start:end, columns]
+    assert len(frame) == len(expected) > 0
+    pd.testing.assert_frame_equal(frame, expected, check_freq=False, check_index_type=False, rtol=1e-12)
+
+def test_read_normalized_reads_only_the_padding(prices, store, monkeypatch):
+    calls = []
+    original = partitioned_store.read_prices
+
+    def recording(root, columns=None, start=None, end=None):
+        calls.append((start, end))
+        return original(root, columns, start, end)
+
+    monkeypatch.setattr(partitioned_store, 'read_prices', recording)
+    read_normalized(store, list(prices.columns[:2]), start='2021-01-05', end='2021-03-31', window=14)
+    # the base row from the first year, then one range read starting a few weeks before the range
+    starts = [pd.Timestamp(start) for start, _ in calls]
+    assert starts[0] == pd.Timestamp('2020-01-01')
+    assert pd.Timestamp('2020-11-01') < starts[-1] < pd.Timestamp('2021-01-05')
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from utils import portfolio_optimizer
+from utils.portfolio_optimizer import (
+    OptimizerError,
+    annualized_moments,
+    efficient_frontier,
+    optimize_weights,
+    portfolio_performance,
+    random_portfolios
+)
+from utils.portfolio_stats import TRADING_DAYS
+
+MU = np.array([0.08, 0.12, 0.20])
+SIGMA = np.array([0.10, 0.20, 0.30])
+DIAGONAL = np.diag(SIGMA ** 2)
+
+def test_annualized_moments_match_pandas(prices):
+    returns = prices.pct_change().iloc[1:]
+    mu, cov = annualized_moments(returns)
+    np.testing.assert_allclose(mu, returns.mean() * TRADING_DAYS)
+    np.testing.assert_allclose(cov, returns.cov() * TRADING_DAYS)
+
+def test_performance_matches_one_portfolio_at_a_time(prices):
+    mu, cov = annualized_moments(prices.pct_change().iloc[1:])
+    weights = np.random.default_rng(0).dirichlet(np.ones(len(mu)), size=50)
+    ret, vol, sharpe = portfolio_performance(weights, mu, cov, risk_free=0.01)
+    for i, w in enumerate(weights):
+        assert ret[i] == pytest.approx(w @ mu)
+        assert vol[i] == pytest.approx(np.sqrt(w @ cov @ w))
+        assert sharpe[i] == pytest.approx((w @ mu - 0.01) / np.sqrt(w @ cov @ w))
+
+def test_closed_form_solutions_for_uncorrelated_assets():
+    # with a diagonal covariance both optimal portfolios are known and long-only
+    expected = 1 / SIGMA ** 2
+    np.testing.assert_allclose(optimize_weights(MU, DIAGONAL, 'min_variance'), expected / expected.sum(), atol=1e-4)
+    expected = MU / SIGMA ** 2
+    np.testing.assert_allclose(optimize_weights(MU, DIAGONAL, 'max_sharpe'), expected / expected.sum(), atol=1e-4)
+
+def test_target_return_is_reached_at_lowest_volatility():
+    w = optimize_weights(MU, DIAGONAL, 'target_return', target_return=0.15)
+    assert w.sum() == pytest.approx(1) and (w >= 0).all()
+    assert w @ MU == pytest.approx(0.15, abs=1e-6)
+
+    cloud, _ = random_portfolios(MU, DIAGONAL, n_portfolios=20_000, seed=1)
+    reaching = cloud[cloud['Return'] >= 0.15]
+    assert np.sqrt(w @ DIAGONAL @ w) <= reaching['Volatility'].min() + 1e-6
+
+def test_random_portfolios_keep_the_best_draws():
+    cloud, best = random_portfolios(MU, DIAGONAL, n_portfolios=5_000, chunk_size=700, seed=2)
+    assert len(cloud) == 5_000
+    _, vol, sharpe = portfolio_performance(np.vstack([best['max_sharpe'], best['min_variance']]), MU, DIAGONAL)
+    assert sharpe[0] == pytest.approx(cloud['Sharpe'].max())
+    assert vol[1] == pytest.approx(cloud['Volatility'].min())
+
+def test_efficient_frontier_bounds_the_cloud():
+    frontier = efficient_frontier(MU, DIAGONAL, n_points=15)
+    assert frontier['Volatility'].is_monotonic_increasing
+    assert frontier['Return'].iloc[-1] == pytest.approx(MU.max(), abs=1e-6)
+
+    cloud, _ = random_portfolios(MU, DIAGONAL, n_portfolios=20_000, seed=3)
+    # no random draw reaches a frontier return with less volatility
+    for point in frontier.itertuples():
+        reaching = cloud[cloud['Return'] >= point.Return]
+        if len(reaching):
+            assert point.Volatility <= reaching['Volatility'].min() + 1e-6
+
+def test_unknown_method_is_rejected():
+    with pytest.raises(ValueError, match="method"):
+        optimize_weights(MU, DIAGONAL, 'risk_parity')
+
+def test_unreachable_target_is_rejected():
+    with pytest.raises(ValueError, match="above the best asset"):
+        optimize_weights(MU, DIAGONAL, 'target_return', target_return=0.25)
+    # the best asset's own return is still reachable, by holding only that asset
+    np.testing.assert_allclose(optimize_weights(MU, DIAGONAL, 'target_return', target_return=0.20), [0, 0, 1], atol=1e-6)
+
+def test_solver_failure_is_raised(monkeypatch):
+    real_minimize = portfolio_optimizer.minimize
+
+    def stop_early(*args, **kwargs):
+        kwargs['options'] = {'maxiter': 1}
+        return real_minimize(*args, **kwargs)
+
+    monkeypatch.setattr(portfolio_optimizer, 'minimize', stop_early)
+    with pytest.raises(OptimizerError, match="did not converge"):
+        optimize_weights(MU, DIAGONAL, 'max_sharpe')
+    # a frontier without a single converged point is empty, not made of unconverged weights
+    assert efficient_frontier(MU, DIAGONAL, n_points=5).empty
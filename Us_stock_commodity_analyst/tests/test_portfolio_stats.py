@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.portfolio_stats import TRADING_DAYS, compute_asset_stats
+
+def per_asset_stats(prices, asset, benchmark):
+    # one asset at a time with plain pandas, like the original statistics loop
+    data = prices[asset]
+    returns = data.pct_change().dropna()
+    bench = prices[benchmark].pct_change().dropna()
+    beta = returns.cov(bench) / bench.var()
+    return {
+        'Return': (data.iloc[-1] / data.iloc[0] - 1) * 100,
+        'Risk': returns.std() * np.sqrt(TRADING_DAYS) * 100,
+        'Sharpe': returns.mean() * TRADING_DAYS / (returns.std() * np.sqrt(TRADING_DAYS)),
+        'VaR': np.percentile(returns, 5) * 100,
+        'MaxDD': (data / data.cummax() - 1).min() * 100,
+        'Skew': returns.skew(),
+        'Kurt': returns.kurtosis(),
+        'Beta': beta,
+        'Alpha': (returns.mean() - beta * bench.mean()) * TRADING_DAYS * 100,
+        'Corr': returns.corr(bench)
+    }
+
+def test_matches_per_asset_pandas(prices):
+    benchmark = prices.columns[3]
+    stats = compute_asset_stats(prices, benchmark)
+    for asset in prices.columns:
+        expected = per_asset_stats(prices, asset, benchmark)
+        for name, value in expected.items():
+            assert stats.loc[asset, name] == pytest.approx(value, rel=1e-9, abs=1e-12), (asset, name)
+    assert stats.loc[benchmark, 'Beta'] == pytest.approx(1)
+
+def test_missing_benchmark(prices):
+    stats = compute_asset_stats(prices, benchmark='Not_A_Column')
+    assert stats[['Beta', 'Alpha', 'Corr']].isna().all().all()
+    assert stats[['Return', 'Risk', 'Sharpe']].notna().all().all()
+
+def test_input_columns_are_not_renamed(prices):
+    frame = prices.copy()
+    stats = compute_asset_stats(frame)
+    assert stats.index.name == 'Asset'
+    assert frame.columns.name is None
+
+def test_rank_grade_and_category_on_known_returns():
+    # first and last prices fix the returns: +50%, 0%, +200%, -20%, +50% (a tie), -5%
+    prices = pd.DataFrame({
+        'Apple_Price': [100.0, 120.0, 150.0],
+        'Gold_Price': [100.0, 90.0, 100.0],
+        'Bitcoin_Price': [100.0, 250.0, 300.0],
+        'Tesla_Price': [100.0, 95.0, 80.0],
+        'S&P_500_Price': [100.0, 110.0, 150.0],
+        'Not_Categorized_Price': [100.0, 101.0, 95.0]
+    }, index=pd.bdate_range('2024-01-01', periods=3))
+    stats = compute_asset_stats(prices)
+
+    assert stats['Return'].round(6).tolist() == [50.0, 0.0, 200.0, -20.0, 50.0, -5.0]
+    # the tie keeps column order, Apple comes before the S&P 500
+    assert stats['Rank'].tolist() == [2, 4, 1, 6, 3, 5]
+    assert stats.sort_values('Rank').index.tolist() == [
+        'Bitcoin_Price', 'Apple_Price', 'S&P_500_Price', 'Gold_Price', 'Not_Categorized_Price', 'Tesla_Price'
+    ]
+    # grade bins are closed on the left: 0% is a B, -20% is below -10%
+    assert stats['Grade'].tolist() == ['A-', 'B', 'A+', 'D-', 'A-', 'C']
+    assert stats['Category'].tolist() == ['Tech Stock', 'Commodity', 'Crypto', 'Tech Stock', 'Index', 'Other']
@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import pytest
+import streamlit as st
+
+from utils import profiling
+from utils.profiling import figure_payload_bytes, plotly_chart, profile_section, profiled, rerun_profile
+
+@profiled
+def allocate(n):
+    return np.ones(n)
+
+def test_wall_time_only_by_default():
+    with rerun_profile(True, 'test') as profile:
+        with profile_section('outer'):
+            allocate(1000)
+    assert not profile.memory
+    frame = profile.frame()
+    assert list(frame.columns) == ['Section', 'Calls', 'Wall ms', 'Payload KB']
+    assert set(frame['Section']) == {'outer', 'test_profiling.allocate'}
+
+def test_only_one_run_traces_memory(monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_MEMORY', True)
+    other = {}
+    with rerun_profile(True, 'first') as first:
+        with profile_section('big'):
+            allocate(2_000_000)
+
+        # a second session rerunning meanwhile gets wall times but no memory columns
+        def second_session():
+            with rerun_profile(True, 'second') as profile:
+                allocate(10)
+            other['profile'] = profile
+        thread = threading.Thread(target=second_session)
+        thread.start()
+        thread.join()
+
+    assert first.memory and not other['profile'].memory
+    assert first.frame().set_index('Section').loc['big', 'Peak MB'] >= 16
+    assert 'Peak MB' not in other['profile'].frame().columns
+
+    # released again once the first run is done
+    with rerun_profile(True, 'third') as third:
+        pass
+    assert third.memory
+
+@pytest.mark.parametrize("figure", [
+    px.line(pd.DataFrame(np.random.default_rng(0).random((3000, 3)), index=pd.date_range('2020-01-01', periods=3000))),
+    px.imshow(np.random.default_rng(1).random((40, 40))),
+    px.pie(values=[1, 2, 3], names=['a', 'b', 'c'])
+], ids=['line', 'heatmap', 'pie'])
+def test_payload_estimate_is_close_to_the_json_size(figure):
+    actual = len(pio.to_json(figure, validate=False))
+    assert figure_payload_bytes(figure) == pytest.approx(actual, rel=0.25)
+
+def test_chart_helper_profiles_without_patching_streamlit():
+    original = st.plotly_chart
+    figure = px.line(x=[1, 2, 3], y=[3, 1, 2])
+    with rerun_profile(True, 'charts') as profile:
+        plotly_chart(figure)
+    assert st.plotly_chart is original
+    record, = [r for r in profile.records if r['Section'] == 'st.plotly_chart']
+    assert record['payload_kb'] == figure_payload_bytes(figure) / 1e3
@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from utils.rolling_correlation import rolling_correlation
+
+@pytest.mark.parametrize("window", [30, 90, None])
+@pytest.mark.parametrize("step", [1, 7])
+def test_matches_pandas_rolling_corr(prices, window, step):
+    data = prices.pct_change().iloc[1:]
+    positions, cube = rolling_correlation(data.to_numpy(), window=window, step=step)
+
+    reference = (data.rolling(window) if window else data.expanding(min_periods=2)).corr()
+    first_valid = (window or 2) - 1
+    for position, corr in zip(positions, cube):
+        expected = reference.loc[data.index[position]].to_numpy()
+        if position < first_valid:
+            assert np.isnan(corr).all()
+        else:
+            np.testing.assert_allclose(corr, expected, atol=1e-5)
+
+def test_positions_follow_the_step(prices):
+    positions, cube = rolling_correlation(prices.to_numpy(), window=20, step=5)
+    np.testing.assert_array_equal(positions, np.arange(4, len(prices), 5))
+    assert cube.shape == (len(positions), prices.shape[1], prices.shape[1]) and cube.dtype == np.float32
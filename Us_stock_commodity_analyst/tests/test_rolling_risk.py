@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.portfolio_stats import TRADING_DAYS
+from utils.rolling_risk import bootstrap_bands, rolling_risk, rolling_var
+
+WINDOW = 63
+
+@pytest.fixture(scope="module")
+def risk(prices):
+    return rolling_risk(prices, window=WINDOW, n_boot=50, step=20)
+
+def test_volatility_matches_pandas_rolling(prices, risk):
+    returns = prices.pct_change().iloc[1:]
+    expected = (returns.rolling(WINDOW).std() * np.sqrt(TRADING_DAYS) * 100).iloc[WINDOW - 1:]
+    pd.testing.assert_frame_equal(risk['volatility'], expected, rtol=1e-7)
+
+def test_var_cvar_match_percentile(prices, risk):
+    returns = prices.pct_change().iloc[1:]
+    var = returns.rolling(WINDOW).apply(lambda w: np.percentile(w, 5), raw=True).iloc[WINDOW - 1:] * 100
+    pd.testing.assert_frame_equal(risk['var'], var, rtol=1e-10)
+
+    # mean of the sorted window up to the VaR order statistic
+    lo = int(np.floor(0.05 * (WINDOW - 1)))
+    cvar = returns.rolling(WINDOW).apply(lambda w: np.sort(w)[:lo + 1].mean(), raw=True).iloc[WINDOW - 1:] * 100
+    pd.testing.assert_frame_equal(risk['cvar'], cvar, rtol=1e-10)
+    assert (risk['cvar'] <= risk['var'] + 1e-12).all().all()
+
+def test_chunked_var_matches_single_block(prices, monkeypatch):
+    r = prices.pct_change().iloc[1:].to_numpy()
+    whole = rolling_var(r, WINDOW)
+    monkeypatch.setattr('utils.rolling_risk.CHUNK_VALUES', 1000)
+    np.testing.assert_array_equal(rolling_var(r, WINDOW), whole)
+
+def test_drawdown_matches_cummax(prices, risk):
+    expected = (prices / prices.cummax() - 1) * 100
+    pd.testing.assert_frame_equal(risk['drawdown'], expected, rtol=1e-12)
+
+def test_bootstrap_bands_match_per_window_resampling(prices, risk):
+    r = prices.pct_change().iloc[1:].to_numpy()
+    positions, var_bands, vol_bands = bootstrap_bands(r, WINDOW, n_boot=50, step=20, seed=0)
+    assert var_bands.shape == vol_bands.shape == (2, len(positions), r.shape[1])
+    assert positions[0] == WINDOW - 1 and (np.diff(positions) == 20).all()
+
+    # the same resampling indices, drawn again and applied one window and asset at a time
+    idx = np.random.default_rng(0).integers(0, WINDOW, size=(50, WINDOW))
+    for k in (0, len(positions) - 1):
+        window = r[positions[k] - WINDOW + 1:positions[k] + 1]
+        for asset in (0, r.shape[1] - 1):
+            samples = window[idx, asset]
+            var = np.percentile(samples, 5, axis=1)
+            vol = samples.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS)
+            np.testing.assert_allclose(var_bands[:, k, asset], np.percentile(var, [5, 95]), rtol=1e-10)
+            np.testing.assert_allclose(vol_bands[:, k, asset], np.percentile(vol, [5, 95]), rtol=1e-10)
+
+    assert (risk['var_low'] <= risk['var_high']).all().all()
+    assert (risk['volatility_low'] <= risk['volatility_high']).all().all()
+    assert risk['var_low'].index.isin(risk['var'].index).all()
+
+def test_windows_with_gaps_are_nan_in_every_measure(prices):
+    gappy = prices.copy()
+    gappy.iloc[200:205, 1] = np.nan
+    risk = rolling_risk(gappy, window=WINDOW, n_boot=20, step=10)
+    returns = gappy.pct_change().iloc[1:]
+
+    # pandas rolling drops the same windows
+    expected = (returns.rolling(WINDOW).std() * np.sqrt(TRADING_DAYS) * 100).iloc[WINDOW - 1:]
+    pd.testing.assert_frame_equal(risk['volatility'], expected, rtol=1e-7)
+    var = returns.rolling(WINDOW).apply(lambda w: np.percentile(w, 5), raw=True).iloc[WINDOW - 1:] * 100
+    pd.testing.assert_frame_equal(risk['var'], var, rtol=1e-10)
+    for name in ['volatility', 'var', 'cvar', 'var_low', 'var_high', 'volatility_low', 'volatility_high']:
+        column = risk[name].iloc[:, 1]
+        assert column.isna().any() and column.notna().any(), name
+        # the other assets are untouched by the gap
+        assert risk[name].drop(columns=gappy.columns[1]).notna().all().all(), name
+    assert risk['volatility'].isna().equals(risk['var'].isna())
+
+@pytest.mark.parametrize("window", [1, 10_000])
+def test_window_outside_the_data_is_rejected(prices, window):
+    with pytest.raises(ValueError, match="window must be between 2 and"):
+        rolling_risk(prices, window=window)
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.normalization import normalize_prices
+from utils.seasonal_cube import build_seasonal_cube, build_yearly_stats, month_slice, year_slice, year_summary
+
+@pytest.fixture(scope="module")
+def norm(prices):
+    # March 2021 is missing entirely, like a gap in the feed
+    norm = normalize_prices(prices.iloc[:, :4])
+    return norm[~((norm.index.year == 2021) & (norm.index.month == 3))]
+
+def expected_stats(series):
+    return {'start': series.iloc[0], 'end': series.iloc[-1], 'high': series.max(), 'low': series.min(),
+            'mean': series.mean(), 'count': len(series), 'std': series.std(),
+            'high_date': series.idxmax(), 'low_date': series.idxmin(),
+            'change': (series.iloc[-1] - series.iloc[0]) / series.iloc[0] * 100,
+            'start_date': series.index[0], 'end_date': series.index[-1]}
+
+def check_against_groupby(cube, norm, keys):
+    groups = norm.groupby(keys)
+    assert len(cube) == groups.ngroups * norm.shape[1]
+    for group, frame in groups:
+        for asset in norm.columns:
+            row = cube.loc[(asset,) + group]
+            for name, value in expected_stats(frame[asset]).items():
+                if isinstance(value, float):
+                    assert row[name] == pytest.approx(value, rel=1e-12), name
+                else:
+                    assert row[name] == value, name
+
+def test_seasonal_cube_matches_groupby(norm):
+    cube = build_seasonal_cube(norm)
+    check_against_groupby(cube, norm, [norm.index.year, norm.index.month])
+    # the missing month has no row rather than an empty one
+    assert (norm.columns[0], 2021, 3) not in cube.index
+    assert cube.index.is_monotonic_increasing
+
+def test_yearly_stats_matches_groupby(norm):
+    check_against_groupby(build_yearly_stats(norm), norm, [norm.index.year])
+
+def test_slices_match_masks(norm):
+    asset = norm[norm.columns[0]]
+    for year in (2019, 2020, 2021, 2022):
+        pd.testing.assert_series_equal(year_slice(asset, year), asset[asset.index.year == year])
+        for month in range(1, 13):
+            expected = norm[(norm.index.year == year) & (norm.index.month == month)]
+            pd.testing.assert_frame_equal(month_slice(norm, year, month), expected)
+    assert month_slice(norm, 2021, 3).empty
+    # December rolls over to the next year's January start
+    assert month_slice(asset, 2020, 12).index[-1] == asset.loc['2020-12'].index[-1]
+
+def test_year_summary_skips_missing_months(norm):
+    asset = norm.columns[0]
+    months = build_seasonal_cube(norm).loc[asset].loc[2021]
+    summary = year_summary(months, build_yearly_stats(norm).loc[(asset, 2021)])
+    changes = {month: (frame.iloc[-1] - frame.iloc[0]) / frame.iloc[0] * 100
+               for month, frame in norm.loc['2021', asset].groupby(norm.loc['2021'].index.month)}
+    assert 3 not in changes
+    assert summary['best_change'] == pytest.approx(max(changes.values()))
+    assert summary['worst_change'] == pytest.approx(min(changes.values()))
+    assert summary['avg_price'] == pytest.approx(np.mean([norm.loc['2021', asset][norm.loc['2021'].index.month == m].mean()
+                                                          for m in changes]))
+    assert year_summary(months.iloc[:0], None) is None
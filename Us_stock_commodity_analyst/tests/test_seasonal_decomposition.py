@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_prices
+from utils.seasonal_decomposition import DAYS, TREND_WINDOW, calendar_day, decompose, typical_year, year_overlay
+
+LEAP_CALENDAR = pd.date_range('2000-01-01', periods=DAYS)
+
+def test_calendar_day_lines_up_leap_and_common_years():
+    dates = pd.DatetimeIndex(['2020-02-28', '2020-02-29', '2020-03-01', '2021-02-28', '2021-03-01', '2021-12-31', '2020-12-31'])
+    np.testing.assert_array_equal(calendar_day(dates), [58, 59, 60, 58, 60, 365, 365])
+
+def brute_force_year(prices, asset, year, stop=None):
+    # rebase one year to 100, put it on a leap-year calendar and carry closes over the gaps
+    data = prices[asset][str(year)]
+    path = 100 * data / data.iloc[0]
+    path.index = pd.to_datetime({'year': 2000, 'month': path.index.month, 'day': path.index.day})
+    path = path.reindex(LEAP_CALENDAR).ffill()
+    if stop is not None:
+        path[path.index > stop] = np.nan
+    return path.to_numpy()
+
+def test_typical_year_matches_pandas():
+    # three years, the data ends in the middle of 2022
+    prices = generate_prices(n_assets=3, n_years=3, start='2020-01-01', seed=2)
+    last = prices.index[-1]
+    assert last.year == 2022 and last.month < 12
+
+    paths, years, average = typical_year(prices)
+    assert list(years) == [2020, 2021, 2022]
+    asset = prices.columns[1]
+    for position, year in enumerate(years):
+        stop = pd.Timestamp(2000, last.month, last.day) if year == 2022 else None
+        np.testing.assert_allclose(paths[1, position], brute_force_year(prices, asset, year, stop), rtol=1e-5)
+
+    # 2021 ended on Friday 31 December, 2020 on Thursday the 31st, the completed years reach the last day
+    assert not np.isnan(paths[1, :2, -1]).any()
+    overlay = year_overlay(paths, years, average, 1)
+    np.testing.assert_allclose(overlay['Average'].iloc[-1], np.mean(paths[1, :2, -1]), rtol=1e-6)
+
+def test_completed_year_ending_early_is_filled_to_december_31():
+    index = pd.bdate_range('2021-01-04', '2022-12-29')   # stops one day short of 2022's last business day
+    prices = pd.DataFrame({'A_Price': np.linspace(10, 20, len(index))}, index=index)
+    paths, _, _ = typical_year(prices)
+    # 2022 is still running: nothing after 29 December
+    assert np.isnan(paths[0, 1, calendar_day(pd.DatetimeIndex(['2022-12-30']))[0]:]).all()
+
+    index = pd.bdate_range('2021-01-04', '2022-12-30')
+    prices = pd.DataFrame({'A_Price': np.linspace(10, 20, len(index))}, index=index)
+    paths, _, _ = typical_year(prices)
+    # 30 December is the last business day of 2022, so the year is complete and filled to the end
+    assert not np.isnan(paths[0, :, -1]).any()
+
+def test_decomposition_adds_up_to_log_prices(prices):
+    result = decompose(prices)
+    log_prices = np.log(prices)
+
+    half = TREND_WINDOW // 2
+    trend = np.exp(log_prices.rolling(2 * half + 1, center=True, min_periods=1).mean())
+    pd.testing.assert_frame_equal(result['trend'], trend, rtol=1e-9, check_freq=False)
+
+    rebuilt = np.log(result['trend']) + np.log1p(result['seasonal'] / 100) + np.log1p(result['residual'] / 100)
+    pd.testing.assert_frame_equal(rebuilt, log_prices, rtol=1e-9, check_freq=False)
+
+    # the seasonal profile is centred on zero and looked up on the leap-year calendar
+    profile = np.log1p(result['profile'] / 100)
+    np.testing.assert_allclose(profile.mean(), 0, atol=1e-12)
+    seasonal = np.log1p(result['seasonal'] / 100)
+    np.testing.assert_allclose(seasonal.to_numpy(), profile.to_numpy()[calendar_day(prices.index)], rtol=1e-9)
@@ -0,0 +1,95 @@
+import gzip
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils import stats_service
+from utils.stats_service import accepts_gzip, etag_matches, serve
+
+@pytest.fixture(scope="module")
+def base_url():
+    server = serve(0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+def get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as exc:
+        return exc.code, dict(exc.headers), exc.read()
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip", True),
+    ("gzip, deflate, br", True),
+    ("GZIP;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, deflate", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("gzip;q=0, *", False),
+    ("deflate", False),
+    ("", False)
+])
+def test_accepts_gzip(header, expected):
+    assert accepts_gzip(header) is expected
+
+def test_gzip_negotiation(base_url):
+    status, headers, body = get(f"{base_url}/correlation", {"Accept-Encoding": "gzip"})
+    assert status == 200 and headers.get("Content-Encoding") == "gzip"
+    plain = json.loads(gzip.decompress(body))
+
+    status, headers, body = get(f"{base_url}/correlation", {"Accept-Encoding": "gzip;q=0"})
+    assert status == 200 and "Content-Encoding" not in headers
+    assert json.loads(body) == plain
+
+def test_etag_revalidation(base_url):
+    status, headers, _ = get(f"{base_url}/stats")
+    assert status == 200
+    status, _, body = get(f"{base_url}/stats", {"If-None-Match": headers["ETag"]})
+    assert status == 304 and body == b""
+
+@pytest.mark.parametrize("header, expected", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", W/"abc"', True),
+    ('*', True),
+    ('"xyz"', False),
+    ('W/"xyz"', False),
+    ('', False)
+])
+def test_etag_matches(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+@pytest.mark.parametrize("make_header", [lambda etag: "W/" + etag, lambda etag: "*", lambda etag: '"old", ' + etag])
+def test_etag_revalidation_weak_and_wildcard(base_url, make_header):
+    _, headers, _ = get(f"{base_url}/stats")
+    status, _, _ = get(f"{base_url}/stats", {"If-None-Match": make_header(headers["ETag"])})
+    assert status == 304
+
+@pytest.mark.parametrize("k", [0, -2])
+def test_top_pairs_rejects_small_k(base_url, k):
+    status, _, body = get(f"{base_url}/correlation/top?k={k}")
+    assert status == 400
+    assert "k" in json.loads(body)["error"]
+
+def test_top_pairs_caps_k(base_url):
+    status, _, body = get(f"{base_url}/correlation/top?k=1000000")
+    assert status == 200
+    n_assets = len(stats_service.data_store.list_assets())
+    assert len(json.loads(body)) == n_assets * (n_assets - 1) // 2
+
+def test_unexpected_error_is_a_json_500(base_url, monkeypatch):
+    def broken(params):
+        raise KeyError("not a column")
+    monkeypatch.setitem(stats_service.ENDPOINTS, "/stats", broken)
+    status, headers, body = get(f"{base_url}/stats?benchmark=broken")
+    assert status == 500
+    assert headers["Content-Type"] == "application/json"
+    assert json.loads(body) == {"error": "internal server error"}
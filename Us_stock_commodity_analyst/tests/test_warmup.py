@@ -0,0 +1,62 @@
+import pytest
+
+from utils import data_store, warmup
+from utils.warmup import RISK_WINDOW, VAR_CONFIDENCES, WarmupJob
+
+# the compute behind every cache the job warms, none of it may run again afterwards
+COMPUTE = ['read_store', 'blocked_correlation', 'reorder_correlation', 'correlation_significance', 'rolling_correlation',
+           'rolling_risk', 'build_seasonal_cube', 'build_yearly_stats', 'compute_asset_stats']
+
+def test_job_fills_the_shared_caches(prices, tmp_path, monkeypatch):
+    path = str(tmp_path / 'store.parquet')
+    prices.to_parquet(path)
+
+    job = WarmupJob(path)
+    job.run()
+    progress = job.progress()
+    assert progress['done'] == progress['total'] > 0
+    assert progress['errors'] == [] and not progress['running']
+
+    for name in COMPUTE:
+        monkeypatch.setattr(data_store, name, lambda *args, name=name, **kwargs: pytest.fail(f"{name} was not cached"))
+    data_store.get_asset_stats(path=path)
+    data_store.get_returns(path)
+    data_store.get_correlation_matrix(path)
+    data_store.get_return_correlation(path)
+    data_store.get_clustered_correlation('returns', path=path)
+    data_store.get_correlation_significance('prices', path=path)
+    data_store.get_rolling_correlation(window=90, path=path)
+    data_store.get_seasonal_cube(path)
+    data_store.get_asset_year(prices.columns[0], prices.index[-1].year, path=path)
+    for confidence in VAR_CONFIDENCES:
+        data_store.get_rolling_risk(window=RISK_WINDOW, alpha=1 - confidence / 100, path=path)
+
+def test_stopped_job_does_no_more_steps(prices, tmp_path):
+    path = str(tmp_path / 'store.parquet')
+    prices.to_parquet(path)
+    job = WarmupJob(path)
+    job.stop()
+    job.run()
+    assert job.progress()['done'] == 0
+
+class FakeJob:
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+def test_new_data_version_starts_a_new_job(monkeypatch):
+    version = {'value': 'v1'}
+    monkeypatch.setattr(data_store, 'data_version', lambda path=None: version['value'])
+    monkeypatch.setattr(warmup, 'start_warmup', lambda path=None: FakeJob())
+    warmup._warmup_job.clear()
+
+    first = warmup.get_warmup_job()
+    assert warmup.get_warmup_job() is first
+    version['value'] = 'v2'
+    second = warmup.get_warmup_job()
+    assert second is not first
+    # the job of the old version is stopped when its cache entry goes
+    assert first.stopped and not second.stopped
+    warmup._warmup_job.clear()
@@ -0,0 +1,30 @@
+ASSET_CATEGORIES = {
+    'Tech Stocks': ['Apple_Price', 'Tesla_Price', 'Microsoft_Price', 'Google_Price',
+                    'Nvidia_Price', 'Netflix_Price', 'Amazon_Price', 'Meta_Price'],
+    'Cryptocurrencies': ['Bitcoin_Price', 'Ethereum_Price'],
+    'Commodities': ['Natural_Gas_Price', 'Crude_oil_Price', 'Copper_Price',
+                    'Silver_Price', 'Gold_Price', 'Platinum_Price'],
+    'Market Indices': ['S&P_500_Price', 'Nasdaq_100_Price', 'Berkshire_Price']
+}
+
+# short labels used by the Portfolio leaderboard
+CATEGORY_LABELS = {
+    'Tech Stocks': 'Tech Stock',
+    'Cryptocurrencies': 'Crypto',
+    'Commodities': 'Commodity',
+    'Market Indices': 'Index'
+}
+
+# headers used by the Portfolio "Performance by Category" cards
+CATEGORY_CARDS = {
+    '💻 TECH STOCKS': 'Tech Stocks',
+    '🪙 CRYPTO': 'Cryptocurrencies',
+    '🏭 COMMODITIES': 'Commodities',
+    '📈 INDICES': 'Market Indices'
+}
+
+ASSET_TO_CATEGORY = {
+    asset: category
+    for category, assets in ASSET_CATEGORIES.items()
+    for asset in assets
+}
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+
+from utils.portfolio_stats import TRADING_DAYS
+from utils.profiling import profiled
+
+REBALANCE_FREQUENCIES = {'none': None, 'monthly': 'M', 'quarterly': 'Q'}
+
+def rebalance_positions(index, rebalance='none'):
+    """Row positions where the portfolio is (re)bought: always the first row, then the first trading day of each period."""
+    if REBALANCE_FREQUENCIES[rebalance] is None:
+        return np.array([0])
+    periods = index.to_period(REBALANCE_FREQUENCIES[rebalance]).asi8
+    return np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+
+@profiled
+def backtest(prices, weights, start=None, rebalance='none', cost_bps=0.0, initial=1.0):
+    """Simulate many allocations at once on a price matrix.
+
+    weights is a (portfolios x assets) DataFrame whose columns are a subset of
+    prices' columns (a Series is treated as one portfolio). Between rebalance
+    dates holdings are fixed, so each segment is one holdings @ prices.T
+    product for every portfolio together. cost_bps is charged on traded value.
+    Raises ValueError when start or the weights leave no prices to simulate.
+    Returns the equity curves (dates x portfolios), their drawdowns and a
+    stats frame with one row per portfolio.
+    """
+    if isinstance(weights, pd.Series):
+        weights = weights.to_frame().T
+    if rebalance not in REBALANCE_FREQUENCIES:
+        raise ValueError(f"rebalance must be one of {tuple(REBALANCE_FREQUENCIES)}, got {rebalance!r}")
+    if weights.shape[1] == 0:
+        raise ValueError("weights select no assets")
+    unknown = weights.columns.difference(prices.columns)
+    if len(unknown):
+        raise ValueError(f"weights name assets without prices: {list(unknown)}")
+
+    if start is not None:
+        prices = prices.loc[pd.Timestamp(start):]
+    if prices.empty:
+        raise ValueError(f"no prices on or after {start}")
+    prices = prices[weights.columns]
+    w = weights.to_numpy(dtype=np.float64)
+    w = w / w.sum(axis=1, keepdims=True)
+    p = prices.to_numpy(dtype=np.float64)
+    cost_rate = cost_bps / 10_000
+
+    n_rows = len(p)
+    equity = np.empty((n_rows, len(w)))
+    costs = np.zeros(len(w))
+    positions = rebalance_positions(prices.index, rebalance)
+    bounds = np.r_[positions, n_rows]
+
+    value = np.full(len(w), float(initial))
+    holdings = np.zeros_like(w)
+    for seg_start, seg_end in zip(bounds[:-1], bounds[1:]):
+        row = p[seg_start]
+        # value drifted into the current holdings, then trade back to the targets
+        current = holdings * row
+        if seg_start > 0:
+            value = current.sum(axis=1)
+        traded = np.abs(w * value[:, None] - current).sum(axis=1)
+        cost = traded * cost_rate
+        costs += cost
+        value = value - cost
+        holdings = w * value[:, None] / row
+
+        equity[seg_start:seg_end] = p[seg_start:seg_end] @ holdings.T
+
+    equity = pd.DataFrame(equity, index=prices.index, columns=weights.index)
+    drawdown = equity / equity.cummax() - 1
+
+    daily = equity.pct_change().iloc[1:]
+    years = max((prices.index[-1] - prices.index[0]).days / 365.25, 1 / 365.25)
+    final = equity.iloc[-1]
+    stats = pd.DataFrame({
+        'Final Value': final,
+        'Total Return': (final / initial - 1) * 100,
+        'CAGR': ((final / initial).clip(lower=0) ** (1 / years) - 1) * 100,
+        'Volatility': daily.std() * np.sqrt(TRADING_DAYS) * 100,
+        'Sharpe': daily.mean() * TRADING_DAYS / (daily.std() * np.sqrt(TRADING_DAYS)),
+        'Max Drawdown': drawdown.min() * 100,
+        'Costs': pd.Series(costs, index=weights.index),
+        'Rebalances': len(positions) - 1
+    })
+    return equity, drawdown, stats
@@ -0,0 +1,152 @@
+import argparse
+import calendar
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from urllib.parse import quote
+
+import pandas as pd
+
+from utils.seasonal_cube import month_slice, year_slice, year_summary
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORTS_DIR = os.path.join(BASE_DIR, 'reports')
+
+MONTH_COLUMNS = ['start', 'end', 'high', 'low', 'mean', 'count', 'std', 'change']
+
+def compute_year_report(data, year, month_stats, year_stats):
+    """Numbers behind one (asset, year) seasonal report, no rendering."""
+    return {
+        'asset': data.name,
+        'year': int(year),
+        'trend': year_slice(data, year),
+        'monthly_mean': month_stats['mean'].set_axis([f"{year}-{month:02d}" for month in month_stats.index]),
+        'months': month_stats,
+        'year_stats': year_stats,
+        'summary': year_summary(month_stats, year_stats)
+    }
+
+def report_rows(report):
+    rows = report['months'][MONTH_COLUMNS].reset_index()
+    rows.insert(0, 'year', report['year'])
+    rows.insert(0, 'asset', report['asset'])
+    summary = report['summary'] or {}
+    for key in ['best_month', 'best_change', 'worst_month', 'worst_change', 'avg_price', 'volatility']:
+        rows[f"year_{key}"] = summary.get(key)
+    return rows
+
+def render_year_report(report):
+    # plotly is only needed in the workers that render
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    from utils.downsampling import decimated_line
+
+    asset, year = report['asset'], report['year']
+    label = asset.replace('_', ' ')
+
+    trend = decimated_line(report['trend'])
+    trend.update_layout(title=f"{label} {year} Price Trend", xaxis_title="Date", yaxis_title="Price", showlegend=False)
+
+    monthly_mean = report['monthly_mean']
+    mean_fig = go.Figure(go.Scatter(x=monthly_mean.index, y=monthly_mean.values, mode='lines+markers'))
+    mean_fig.update_layout(title=f"Mean of {year}", xaxis_title="Month", yaxis_title="Mean Price")
+
+    cards = make_subplots(rows=4, cols=3, subplot_titles=[f"{calendar.month_name[m].upper()} {year}" for m in range(1, 13)])
+    for month in range(1, 13):
+        data_month = month_slice(report['trend'], year, month)
+        if len(data_month) > 0:
+            cards.add_trace(
+                go.Scatter(x=data_month.index, y=data_month.values, mode='lines+markers', name=calendar.month_name[month]),
+                row=(month - 1) // 3 + 1, col=(month - 1) % 3 + 1
+            )
+    cards.update_layout(height=1000, showlegend=False)
+
+    months = report['months'][MONTH_COLUMNS].copy()
+    months.index = [calendar.month_name[m] for m in months.index]
+    summary = report['summary']
+    if summary is None:
+        summary_html = "<p>No data available for this year.</p>"
+    else:
+        summary_html = (
+            "<ul>"
+            f"<li>Best Month: {summary['best_month']} ({summary['best_change']:+.1f}%)</li>"
+            f"<li>Worst Month: {summary['worst_month']} ({summary['worst_change']:+.1f}%)</li>"
+            f"<li>Avg Price: {summary['avg_price']:.2f}</li>"
+            f"<li>Volatility: {summary['volatility']:.2f}</li>"
+            "</ul>"
+        )
+
+    parts = [
+        f"<html><head><meta charset='utf-8'><title>{html.escape(label)} {year}</title></head><body>",
+        f"<h1>Seasonal Analysis of {html.escape(label)} {year}</h1>",
+        trend.to_html(full_html=False, include_plotlyjs='cdn'),
+        mean_fig.to_html(full_html=False, include_plotlyjs=False),
+        "<h2>Monthly Seasonal</h2>",
+        cards.to_html(full_html=False, include_plotlyjs=False),
+        months.round(3).to_html(),
+        "<h2>Year Summary</h2>",
+        summary_html,
+        "</body></html>"
+    ]
+    return "\n".join(parts)
+
+def report_file_name(asset, year):
+    return f"{asset}_{year}.html"
+
+def _asset_reports(data, month_cube, yearly, out_dir, render):
+    # one task per asset so the series is pickled once for all its years
+    rows = []
+    for year in yearly.index:
+        report = compute_year_report(data, year, month_cube.loc[year], yearly.loc[year])
+        rows.append(report_rows(report))
+        if render:
+            with open(os.path.join(out_dir, report_file_name(data.name, year)), 'w', encoding='utf-8') as f:
+                f.write(render_year_report(report))
+    return pd.concat(rows, ignore_index=True)
+
+def generate_reports(norm_df, seasonal_cube, yearly_stats, out_dir, assets=None, max_workers=None, render=True):
+    """Compute (and render) every asset x year report on a process pool, returns the combined numbers."""
+    os.makedirs(out_dir, exist_ok=True)
+    assets = list(norm_df.columns) if assets is None else list(assets)
+
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(_asset_reports, norm_df[asset], seasonal_cube.loc[asset], yearly_stats.loc[asset], out_dir, render)
+            for asset in assets
+        ]
+        numbers = pd.concat([future.result() for future in futures], ignore_index=True)
+
+    numbers.to_parquet(os.path.join(out_dir, 'seasonal_report.parquet'), index=False)
+
+    if render:
+        links = "".join(
+            # asset names like S&P_500_Price are not URL or attribute safe as they are
+            f"<li><a href=\"{html.escape(quote(report_file_name(row.asset, row.year)), quote=True)}\">{html.escape(row.asset.replace('_', ' '))} {row.year}</a></li>"
+            for row in numbers[['asset', 'year']].drop_duplicates().itertuples()
+        )
+        with open(os.path.join(out_dir, 'index.html'), 'w', encoding='utf-8') as f:
+            f.write(f"<html><head><meta charset='utf-8'><title>Seasonal Reports</title></head><body><h1>Seasonal Reports</h1><ul>{links}</ul></body></html>")
+
+    return numbers
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render every asset x year seasonal report as static HTML plus a Parquet of the numbers.")
+    parser.add_argument('--output', default=os.path.join(REPORTS_DIR, date.today().isoformat()), help="directory for the reports")
+    parser.add_argument('--assets', nargs='+', help="only these assets (default: all)")
+    parser.add_argument('--workers', type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument('--no-html', action='store_true', help="only write the Parquet file")
+    args = parser.parse_args(argv)
+
+    from utils.data_store import get_normalized_prices, get_seasonal_cube
+
+    norm_df = get_normalized_prices()
+    seasonal_cube, yearly_stats = get_seasonal_cube()
+    numbers = generate_reports(norm_df, seasonal_cube, yearly_stats, args.output,
+                               assets=args.assets, max_workers=args.workers, render=not args.no_html)
+    n_reports = len(numbers[['asset', 'year']].drop_duplicates())
+    print(f"Wrote {n_reports} reports to {args.output}")
+
+if __name__ == '__main__':
+    main()
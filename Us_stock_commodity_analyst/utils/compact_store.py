@@ -0,0 +1,106 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+# set US_STOCK_STORAGE=mmap to serve prices from a memory-mapped float32 Feather file
+STORAGE_MODE = os.environ.get('US_STOCK_STORAGE', 'parquet').lower()
+
+VERSION_KEY = b'source_version'
+
+def feather_path(source_path):
+    return os.path.splitext(source_path)[0] + '.f32.feather'
+
+def write_feather_store(df, path, source_version=''):
+    """Write prices as uncompressed float32 columns so the file can be memory-mapped without decoding."""
+    table = pa.table(
+        {'Date': pa.array(df.index.to_numpy(dtype='datetime64[ns]'))} |
+        {col: pa.array(df[col].to_numpy(dtype=np.float32)) for col in df.columns}
+    )
+    table = table.replace_schema_metadata({VERSION_KEY: source_version.encode()})
+    tmp_path = path + '.tmp'
+    # one record batch, open_feather_store maps every column as a single contiguous chunk
+    feather.write_feather(table, tmp_path, compression='uncompressed', chunksize=max(len(df), 1))
+    os.replace(tmp_path, path)
+
+def stored_version(path):
+    if not os.path.exists(path):
+        return None
+    table = feather.read_table(path, memory_map=True)
+    if _max_chunks(table) > 1:
+        # written by an older version in several record batches, rebuild it
+        return None
+    return (table.schema.metadata or {}).get(VERSION_KEY, b'').decode()
+
+def _max_chunks(table):
+    return max((column.num_chunks for column in table.columns), default=0)
+
+def ensure_feather_store(source_path, source_version, read_source):
+    """Path of an up to date Feather copy of source_path, rebuilt from read_source() when the source changed."""
+    path = feather_path(source_path)
+    if stored_version(path) != source_version:
+        write_feather_store(read_source(), path, source_version)
+    return path
+
+def open_feather_store(path):
+    """DataFrame whose float32 columns are read-only views straight into the memory-mapped file.
+
+    The pages live in the OS page cache, so every session and every process
+    reading the same file shares one physical copy.
+    """
+    table = feather.read_table(path, memory_map=True)
+    if _max_chunks(table) > 1:
+        raise ValueError(f"{path} holds {_max_chunks(table)} record batches, a zero-copy view needs exactly one")
+    index = pd.DatetimeIndex(table.column('Date').to_numpy(), name='Date')
+    columns = {
+        name: table.column(name).chunk(0).to_numpy(zero_copy_only=True)
+        for name in table.column_names if name != 'Date'
+    }
+    # copy=False keeps one block per column instead of consolidating into a new 2-D array
+    return pd.DataFrame(columns, index=index, copy=False)
+
+def _external_buffer(arr):
+    # zero-copy Arrow columns end their .base chain in an Arrow buffer instead of a numpy array
+    base = arr
+    while isinstance(base, np.ndarray) and base.base is not None:
+        base = base.base
+    return not isinstance(base, np.ndarray)
+
+def is_zero_copy(df):
+    return all(_external_buffer(df[col].to_numpy()) for col in df.columns)
+
+def process_rss():
+    """Resident set size of this process in bytes (Linux /proc, peak RSS elsewhere)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def frame_bytes(frame):
+    if isinstance(frame, (pd.DataFrame, pd.Series)):
+        return int(frame.memory_usage(deep=True).sum()) if isinstance(frame, pd.DataFrame) else int(frame.memory_usage(deep=True))
+    return int(getattr(frame, 'nbytes', 0))
+
+def memory_report(frames, mapped_path=None):
+    """One row per named frame with its size and whether it is a zero-copy view of an Arrow buffer, plus process RSS."""
+    rows = []
+    for name, frame in frames.items():
+        shared = isinstance(frame, pd.DataFrame) and len(frame.columns) > 0 and is_zero_copy(frame)
+        rows.append({
+            'Frame': name,
+            'Shape': 'x'.join(str(n) for n in np.shape(frame)),
+            'Dtype': str(frame.dtypes.iloc[0]) if isinstance(frame, pd.DataFrame) and len(frame.columns) else str(getattr(frame, 'dtype', '')),
+            'MB': frame_bytes(frame) / 1024 ** 2,
+            'Zero Copy': shared
+        })
+    report = pd.DataFrame(rows)
+    summary = {
+        'storage_mode': STORAGE_MODE,
+        'process_rss_mb': process_rss() / 1024 ** 2,
+        'mapped_file_mb': os.path.getsize(mapped_path) / 1024 ** 2 if mapped_path and os.path.exists(mapped_path) else 0.0
+    }
+    return report, summary
@@ -0,0 +1,186 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+try:
+    from scipy.cluster.hierarchy import leaves_list, linkage, fcluster
+    from scipy.spatial.distance import squareform
+except ImportError:  # clustering falls back to a spectral ordering without scipy
+    linkage = None
+
+# above this many assets the main heatmap switches to cluster tiles
+TILE_THRESHOLD = 200
+BLOCK_SIZE = 512
+
+def standardize(data, dtype=np.float32):
+    """Column-wise z-scores scaled by 1/sqrt(n-1), so Z.T @ Z is the correlation matrix.
+
+    Only for data without missing values, a constant column becomes all zeros.
+    """
+    x = np.asarray(data, dtype=np.float64)
+    n = x.shape[0]
+    mean = x.mean(axis=0)
+    std = x.std(axis=0, ddof=1)
+    std[std == 0] = np.nan
+    z = (x - mean) / (std * np.sqrt(n - 1))
+    return np.nan_to_num(z).astype(dtype, copy=False)
+
+def _pairwise_blocks(x):
+    """Block function for data with gaps: each pair only uses the rows where both columns have a value.
+
+    The sums over those rows come from products with the validity mask, the same
+    pairwise-complete correlation DataFrame.corr() computes one pair at a time.
+    Pairs sharing fewer than two rows are NaN.
+    """
+    valid = ~np.isnan(x)
+    with np.errstate(invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)   # all-NaN columns
+        centered = np.where(valid, x - np.nanmean(x, axis=0), 0.0)
+        # constant columns are exactly zero after this, their pairs come out as 0 like in standardize()
+        centered[:, np.nanmax(x, axis=0) == np.nanmin(x, axis=0)] = 0.0
+    mask = valid.astype(np.float64)
+    squared = centered * centered
+
+    def block(i, j):
+        xi, xj, mi, mj = centered[:, i], centered[:, j], mask[:, i], mask[:, j]
+        n = mi.T @ mj
+        si = xi.T @ mj
+        sj = mi.T @ xj
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = xi.T @ xj - si * sj / n
+            var = (squared[:, i].T @ mj - si * si / n) * (mi.T @ squared[:, j] - sj * sj / n)
+            corr = np.where(var > 0, cov / np.sqrt(var), 0.0)
+        corr[n < 2] = np.nan
+        return corr
+
+    return block
+
+@profiled
+def blocked_correlation(data, block_size=BLOCK_SIZE, dtype=np.float32):
+    """Correlation matrix computed block by block in float32.
+
+    Only one (block_size x block_size) product is live at a time on top of the
+    standardized input and the output, so peak memory stays bounded. With
+    missing values (late listings, halts) correlations are pairwise like
+    DataFrame.corr(), worked out in float64 from masked sums.
+    """
+    columns = data.columns if isinstance(data, pd.DataFrame) else None
+    x = np.asarray(data, dtype=np.float64)
+    if np.isnan(x).any():
+        product = _pairwise_blocks(x)
+    else:
+        z = standardize(x, dtype=dtype)
+
+        def product(i, j):
+            return z[:, i].T @ z[:, j]
+    n_assets = x.shape[1]
+    out = np.empty((n_assets, n_assets), dtype=dtype)
+
+    for i in range(0, n_assets, block_size):
+        rows = slice(i, i + block_size)
+        for j in range(i, n_assets, block_size):
+            cols = slice(j, j + block_size)
+            block = product(rows, cols)
+            out[rows, cols] = block
+            if j != i:
+                out[cols, rows] = block.T
+
+    np.clip(out, -1, 1, out=out)
+    np.fill_diagonal(out, 1)
+    if columns is not None:
+        return pd.DataFrame(out, index=columns, columns=columns)
+    return out
+
+def cluster_order(corr, n_clusters=None, method='average'):
+    """Leaf order of a hierarchical clustering on 1 - corr, plus a cluster label per asset in that order."""
+    values = np.asarray(corr, dtype=np.float64)
+    n_assets = values.shape[0]
+    if n_assets < 3:
+        return np.arange(n_assets), np.ones(n_assets, dtype=int)
+    n_clusters = n_clusters or max(2, int(np.sqrt(n_assets)))
+
+    if linkage is not None:
+        distance = np.clip(1 - values, 0, 2)
+        np.fill_diagonal(distance, 0)
+        tree = linkage(squareform(distance, checks=False), method=method)
+        order = leaves_list(tree)
+        labels = fcluster(tree, t=n_clusters, criterion='maxclust')[order]
+    else:
+        # without scipy sort by the leading eigenvector and cut the ordering into equal groups
+        _, vectors = np.linalg.eigh(values)
+        order = np.argsort(vectors[:, -1])
+        labels = np.arange(n_assets) * n_clusters // n_assets + 1
+
+    # renumber clusters 1..k in the order they appear along the axis
+    _, first = np.unique(labels, return_index=True)
+    rank = {label: i + 1 for i, label in enumerate(labels[np.sort(first)])}
+    return order, np.array([rank[label] for label in labels])
+
+@profiled
+def reorder_correlation(corr_df, n_clusters=None):
+    """corr_df with rows/columns in cluster order and the matching cluster labels as a Series."""
+    order, labels = cluster_order(corr_df.to_numpy(), n_clusters=n_clusters)
+    ordered = corr_df.iloc[order, order]
+    return ordered, pd.Series(labels, index=ordered.index, name='cluster')
+
+def cluster_tiles(ordered_corr, clusters):
+    """Mean correlation between every pair of clusters, the cluster-level view of a large heatmap."""
+    values = ordered_corr.to_numpy(dtype=np.float64)
+    labels = clusters.to_numpy()
+    ids = np.unique(labels)
+    # indicator matrix turns the block means into two matrix products
+    member = (labels[:, None] == ids[None, :]).astype(np.float64)
+    sizes = member.sum(axis=0)
+    tiles = member.T @ values @ member / np.outer(sizes, sizes)
+    names = [f"Cluster {i} ({int(size)})" for i, size in zip(ids, sizes)]
+    return pd.DataFrame(tiles, index=names, columns=names)
+
+@profiled
+def top_correlated_pairs(corr, k=6, largest=True, block_size=BLOCK_SIZE):
+    """k most (or least) correlated distinct pairs from the upper triangle, as Asset1/Asset2/Correlation rows.
+
+    Works row block by row block with argpartition, so it never builds the
+    full list of N*(N-1)/2 pairs.
+    """
+    labels = np.asarray(corr.index) if isinstance(corr, pd.DataFrame) else None
+    values = np.asarray(corr, dtype=np.float64)
+    n_assets = values.shape[0]
+    sign = 1.0 if largest else -1.0
+    columns = np.arange(n_assets)
+
+    cand_scores, cand_rows, cand_cols = [], [], []
+    for start in range(0, n_assets, block_size):
+        rows = np.arange(start, min(start + block_size, n_assets))
+        score = sign * values[rows]
+        # keep only j > i, everything else can never be picked; NaN (constant or empty
+        # columns) would sort above every real score, so it goes to the bottom too
+        score = np.where((columns[None, :] > rows[:, None]) & ~np.isnan(score), score, -np.inf)
+        flat = score.ravel()
+        take = min(k, flat.size)
+        if take == 0:
+            continue
+        idx = np.argpartition(flat, -take)[-take:]
+        idx = idx[np.isfinite(flat[idx])]
+        cand_scores.append(flat[idx])
+        cand_rows.append(rows[idx // n_assets])
+        cand_cols.append(idx % n_assets)
+
+    if not cand_scores:
+        return pd.DataFrame(columns=['Asset1', 'Asset2', 'Correlation'])
+
+    scores = np.concatenate(cand_scores)
+    best = np.argsort(-scores, kind='stable')[:k]
+    rows = np.concatenate(cand_rows)[best]
+    cols = np.concatenate(cand_cols)[best]
+    names = labels if labels is not None else np.arange(n_assets)
+
+    pairs = pd.DataFrame({
+        'Asset1': names[rows],
+        'Asset2': names[cols],
+        'Correlation': values[rows, cols]
+    })
+    # same order as the old descending sort: head() for positive, tail() for negative
+    return pairs.sort_values(by='Correlation', ascending=False, ignore_index=True)
@@ -0,0 +1,270 @@
+import pandas as pd
+import streamlit as st
+
+from utils.asset_categories import ASSET_CATEGORIES as asset_categories
+from utils.correlation_engine import TILE_THRESHOLD
+from utils.data_store import (
+    get_correlation_matrix,
+    get_correlation_significance,
+    get_rebased_prices,
+    list_assets,
+    get_clustered_correlation,
+    get_return_correlation,
+    get_rolling_correlation
+)
+from utils.date_range import get_date_range, range_positions
+from utils.fungction_correlation_page import(
+    main_correlation,
+    clustered_correlation,
+    correlation_summary,
+    categori_correlation,
+    single_correlation,
+    universe_top_pairs,
+    price_line_plot,
+    plot_custom_asset
+)
+from utils.profiling import profiled_section
+
+@profiled_section
+def render_correlation_page():
+    assets = list_assets()
+    # every section works on the sidebar date range
+    start, end = get_date_range()
+    corr_df = get_correlation_matrix(start=start, end=end)
+
+    if "selected_catergory" not in st.session_state:
+        st.session_state.selected_catergory = "Tech Stocks"
+
+    if "selected_indi_corr" not in st.session_state:
+        st.session_state.selected_indi_corr = assets[0]
+
+    if "selected_category_plot" not in st.session_state:
+        st.session_state.selected_category_plot = "Tech Stocks"
+
+    st.title("Correlation Analysis of US Market")
+    st.checkbox(
+        "Flag insignificant correlations (95% block bootstrap)",
+        value=False,
+        help="Bootstraps every correlation in the date range, the first run can take a while",
+        key="corr_significance"
+    )
+
+    main_correlation_section(corr_df)
+
+    st.markdown("---")
+
+    # every section below is a fragment, a widget change only reruns its own section
+    category_correlation_section(corr_df)
+
+    st.markdown("---")
+    individual_correlation_section(corr_df)
+
+    rolling_correlation_section(corr_df)
+
+    st.markdown("---")
+    category_trend_section(assets)
+
+    custom_asset_section(assets)
+
+def significance_mask(basis='prices'):
+    # None while the checkbox is off, so nothing is bootstrapped unless asked for
+    if not st.session_state.get("corr_significance"):
+        return None
+    start, end = get_date_range()
+    return get_correlation_significance(basis, start=start, end=end)['significant']
+
+@st.fragment
+@profiled_section
+def main_correlation_section(corr_df):
+    st.subheader("Correlation Heatmap of US Market Assets")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        basis = st.radio(
+            "Correlation Basis",
+            options=["Normalized Price", "Daily Returns"],
+            horizontal=True,
+            key="corr_basis"
+        )
+    with col2:
+        # clustered by default once an unordered grid gets hard to read; above TILE_THRESHOLD
+        # the full N x N grid is too heavy for the browser and only the tiles view is offered
+        too_large = len(corr_df) > TILE_THRESHOLD
+        clustered = st.checkbox(
+            "Group by cluster",
+            value=len(corr_df) > 40,
+            disabled=too_large,
+            help=f"Always on above {TILE_THRESHOLD} assets" if too_large else None,
+            key="corr_clustered"
+        ) or too_large
+
+    start, end = get_date_range()
+    significant = significance_mask('returns' if basis == "Daily Returns" else 'prices')
+    if clustered or basis == "Daily Returns":
+        ordered_corr, clusters = get_clustered_correlation('returns' if basis == "Daily Returns" else 'prices', start=start, end=end)
+        if clustered:
+            insignificant = ~significant.loc[ordered_corr.index, ordered_corr.columns] if significant is not None else None
+            clustered_correlation(ordered_corr, clusters, title=f"Clustered Correlation Heatmap ({basis})", insignificant=insignificant)
+        else:
+            main_correlation(ordered_corr.loc[corr_df.index, corr_df.columns], ~significant if significant is not None else None)
+    else:
+        main_correlation(corr_df, ~significant if significant is not None else None)
+
+    st.subheader(f"Top Pairs Across All Assets ({basis})")
+    universe_top_pairs(get_return_correlation(start=start, end=end) if basis == "Daily Returns" else corr_df)
+
+@st.fragment
+@profiled_section
+def category_correlation_section(corr_df):
+    st.subheader("Correlation Analysis of Categories of Assets")
+    categories = st.selectbox(
+        "Select Asset Category",
+        options=list(asset_categories.keys()),
+        index=list(asset_categories.keys()).index(st.session_state.selected_catergory),
+        key="corr_categories"
+    )
+
+    asset_tect = asset_categories[categories]
+
+    st.session_state.selected_catergory = categories
+    available_tech = [asset for asset in asset_tect if asset in corr_df.columns]
+
+    tech_corr = corr_df.loc[available_tech, available_tech]
+
+    significant = significance_mask()
+    insignificant = ~significant.loc[available_tech, available_tech] if significant is not None else None
+    categori_correlation(categories, tech_corr, available_tech, insignificant)
+
+@st.fragment
+@profiled_section
+def individual_correlation_section(corr_df):
+    st. title   ("Individual Asset Correlation Analysis")
+
+    # Asset selection
+    selected_asset = st.selectbox(
+        "Select Asset for Analysis:",
+        options=corr_df.columns,
+        index=list(corr_df.columns).index(st.session_state.selected_indi_corr)
+    )
+    st.session_state.selected_indi_corr = selected_asset
+
+    asset_correlations = corr_df[selected_asset].drop(selected_asset).sort_values(ascending=False)
+
+    # Main layout
+    st.subheader(f"{selected_asset.replace('_Price', '')} Correlation with All Assets")
+
+    # Create heatmap for single asset
+    single_correlation(asset_correlations, selected_asset)
+
+    # Summary section
+    st.markdown("---")
+    st.subheader(f"Correlation Summary for {selected_asset.replace('_Price', '')}")
+
+    # Create 4 columns for different correlation strengths
+    significant = significance_mask()
+    correlation_summary(asset_correlations, significant[selected_asset] if significant is not None else None)
+
+@st.fragment
+@profiled_section
+def rolling_correlation_section(corr_df):
+    st.title("Correlation Over Time")
+
+    rolling_windows = {"30 Days": 30, "90 Days": 90, "180 Days": 180, "Expanding": None}
+    window_label = st.radio(
+        "Rolling Window",
+        options=list(rolling_windows.keys()),
+        index=1,
+        horizontal=True,
+        key="rolling_corr_window"
+    )
+    window = rolling_windows[window_label]
+    rolling_dates, rolling_cube = get_rolling_correlation(window=window)
+
+    # skip the warm-up rows where the window is not full yet, then keep the sidebar date range
+    first_valid = (window or 2) - 1
+    rolling_dates = rolling_dates[first_valid:]
+    rolling_cube = rolling_cube[first_valid:]
+    i, j = range_positions(rolling_dates, *get_date_range())
+    rolling_dates = rolling_dates[i:j]
+    rolling_cube = rolling_cube[i:j]
+    if len(rolling_dates) == 0:
+        st.info("The selected date range is shorter than the rolling window")
+        return
+
+    rolling_date = st.select_slider(
+        "Correlation as of",
+        options=list(rolling_dates.date),
+        value=rolling_dates[-1].date(),
+        key="rolling_corr_date"
+    )
+    position = rolling_dates.searchsorted(pd.Timestamp(rolling_date))
+    rolling_corr = pd.DataFrame(rolling_cube[position], index=corr_df.index, columns=corr_df.columns)
+
+    st.subheader(f"Correlation Heatmap ({window_label} window ending {rolling_date})")
+    main_correlation(rolling_corr)
+
+    # own selector so this section does not depend on the individual analysis fragment
+    selected_asset = st.selectbox(
+        "Select Asset:",
+        options=corr_df.columns,
+        index=list(corr_df.columns).index(st.session_state.selected_indi_corr),
+        format_func=lambda x: x.replace('_Price', ''),
+        key="rolling_corr_asset"
+    )
+    st.subheader(f"{selected_asset.replace('_Price', '')} Correlation ({window_label} window ending {rolling_date})")
+    single_correlation(
+        rolling_corr[selected_asset].drop(selected_asset).sort_values(ascending=False),
+        selected_asset
+    )
+
+@st.fragment
+@profiled_section
+def category_trend_section(assets):
+    # the widget value is already in session_state when this fragment reruns
+    title_category = st.session_state.get("plot_categories", st.session_state.selected_category_plot)
+    st.title(f"{title_category} Price Trends Over Time")
+    categories = st.selectbox(
+        "Select Asset Category",
+        options=list(asset_categories.keys()),
+        index=list(asset_categories.keys()).index(st.session_state.selected_category_plot),
+        key="plot_categories"
+    )
+
+    st.session_state.selected_category_plot = categories
+    selected_assets = asset_categories[categories]
+    available_assets = [asset for asset in selected_assets if asset in assets]
+
+    st.subheader("Customize Assets Display")
+    filtered_assets = st.multiselect(
+    f"Select {categories} assets to display:",
+    options=available_assets,
+    default=available_assets,  # Default semua assets
+    format_func=lambda x: x.replace('_Price', ''),
+    key=f"filter_assets_{categories}"
+    )
+    
+    if filtered_assets:
+        # only the displayed columns and dates are read
+        category_data = get_rebased_prices(filtered_assets, *get_date_range())
+        price_line_plot(category_data, filtered_assets, categories)
+
+    else:
+        st.warning(f"Please select at least one {categories} asset to display")
+
+@st.fragment
+@profiled_section
+def custom_asset_section(assets):
+    st.title("Custom Asset Plot")
+
+    selected_custom_assets = st.multiselect(
+        "Select Assets to Plot:",
+        options=assets,
+        default=assets[:3],  # Default 3 asset pertama
+        format_func=lambda x: x.replace('_Price', '')
+    )
+
+    if selected_custom_assets:
+        plot_custom_asset(get_rebased_prices(selected_custom_assets, *get_date_range()), selected_custom_assets)
+
+    else:
+        st.info("Please select at least one asset to plot")
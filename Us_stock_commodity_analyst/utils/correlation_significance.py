@@ -0,0 +1,100 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+N_BOOT = 500
+CONFIDENCE = 0.95
+# below this many multiply-adds (n_boot x rows x pairs) a process pool costs more than it saves
+POOL_THRESHOLD = 50_000_000
+CHUNK_VALUES = 8_000_000
+# the pool is started from inside the threaded Streamlit server (and the warmup thread),
+# forking a process with live threads can deadlock, so workers never come from fork
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+def block_length(n_rows):
+    # n^(1/3) rule, but never shorter than the 14-day smoothing window so one block keeps its dependence
+    return max(14, int(round(n_rows ** (1 / 3))))
+
+def block_indices(rng, n_rows, length, n_boot):
+    """Moving-block bootstrap row indices, one row of n_rows per replicate."""
+    n_blocks = -(-n_rows // length)
+    starts = rng.integers(0, n_rows - length + 1, size=(n_boot, n_blocks))
+    return (starts[:, :, None] + np.arange(length)).reshape(n_boot, -1)[:, :n_rows]
+
+def _bootstrap_chunk(values, n_boot, length, seed):
+    """Upper-triangle correlations of n_boot block-bootstrap replicates, shape (n_boot, n_pairs)."""
+    rng = np.random.default_rng(seed)
+    n_rows, n_assets = values.shape
+    upper = np.triu_indices(n_assets, k=1)
+    out = np.empty((n_boot, len(upper[0])), dtype=np.float32)
+
+    batch = max(1, CHUNK_VALUES // (n_rows * n_assets))
+    for start in range(0, n_boot, batch):
+        idx = block_indices(rng, n_rows, length, min(batch, n_boot - start))
+        samples = values[idx]   # (batch, rows, assets), every replicate gathered at once
+        samples = samples - samples.mean(axis=1, keepdims=True)
+        samples /= np.linalg.norm(samples, axis=1, keepdims=True)
+        corr = np.einsum('bti,btj->bij', samples, samples)
+        out[start:start + len(idx)] = corr[:, upper[0], upper[1]]
+    return out
+
+def bootstrap_correlations(values, n_boot=N_BOOT, length=None, seed=0, max_workers=None):
+    """Block-bootstrap replicates of every pairwise correlation, spread over a process pool when large enough."""
+    values = np.asarray(values, dtype=np.float64)
+    n_rows, n_assets = values.shape
+    length = length or block_length(n_rows)
+    seeds = np.random.SeedSequence(seed)
+
+    work = n_boot * n_rows * n_assets * n_assets
+    workers = min(max_workers or os.cpu_count() or 1, n_boot)
+    if workers <= 1 or work < POOL_THRESHOLD:
+        return _bootstrap_chunk(values, n_boot, length, seeds.spawn(1)[0])
+
+    # independent streams per worker, so the result does not depend on scheduling
+    sizes = np.diff(np.linspace(0, n_boot, workers + 1).astype(int))
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(POOL_START_METHOD)) as pool:
+        futures = [
+            pool.submit(_bootstrap_chunk, values, int(size), length, child)
+            for size, child in zip(sizes, seeds.spawn(workers)) if size > 0
+        ]
+        return np.concatenate([future.result() for future in futures])
+
+@profiled
+def correlation_significance(data, n_boot=N_BOOT, confidence=CONFIDENCE, length=None, seed=0, max_workers=None):
+    """Bootstrap p-values and confidence intervals for every entry of data.corr().
+
+    p-values are two-sided for a zero correlation: twice the share of replicates on
+    the other side of zero. Returns a dict of asset x asset frames: p_value, ci_low,
+    ci_high and significant (p below 1 - confidence); the diagonal is always significant.
+    """
+    data = data.dropna()
+    columns = data.columns
+    n_assets = len(columns)
+    replicates = bootstrap_correlations(data.to_numpy(), n_boot, length, seed, max_workers)
+
+    tail = (1 - confidence) / 2
+    low, high = np.quantile(replicates, [tail, 1 - tail], axis=0)
+    below = (replicates <= 0).sum(axis=0)
+    above = (replicates >= 0).sum(axis=0)
+    # +1 keeps a p-value of exactly 0 out of a finite bootstrap
+    p_value = np.minimum(1.0, 2 * (np.minimum(below, above) + 1) / (len(replicates) + 1))
+
+    def square(upper_values, diagonal):
+        out = np.full((n_assets, n_assets), diagonal, dtype=np.float64)
+        i, j = np.triu_indices(n_assets, k=1)
+        out[i, j] = upper_values
+        out[j, i] = upper_values
+        return pd.DataFrame(out, index=columns, columns=columns)
+
+    result = {
+        'p_value': square(p_value, 0.0),
+        'ci_low': square(low, 1.0),
+        'ci_high': square(high, 1.0)
+    }
+    result['significant'] = result['p_value'] < 1 - confidence
+    return result
@@ -0,0 +1,301 @@
+import os
+import pandas as pd
+import streamlit as st
+
+from utils.compact_store import STORAGE_MODE, ensure_feather_store, feather_path, memory_report, open_feather_store
+from utils.correlation_engine import blocked_correlation, reorder_correlation
+from utils.correlation_significance import correlation_significance
+from utils.date_range import cumulative_log_returns, rebase, slice_range
+from utils.incremental import StateRegistry
+from utils.ingestion import OUTPUT_PATH as PARQUET_PATH, append_rows, appended_parts, dataset_path, read_store
+from utils import partitioned_store
+from utils.portfolio_stats import compute_asset_stats
+from utils.portfolio_optimizer import annualized_moments, efficient_frontier, random_portfolios
+from utils.rolling_correlation import rolling_correlation
+from utils.rolling_risk import rolling_risk, running_drawdown
+from utils.seasonal_decomposition import decompose, typical_year
+from utils.seasonal_cube import build_seasonal_cube, build_yearly_stats, year_slice
+from utils.profiling import profiled
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# older Parquet export that was saved with a .csv extension
+LEGACY_PATH = os.path.join(BASE_DIR, 'US_Stock_Data_Cleaned.csv')
+
+def resolve_data_path(path=None):
+    # prefer the artifact written by `python -m utils.ingestion`
+    if path is not None:
+        return path
+    return PARQUET_PATH if os.path.exists(PARQUET_PATH) else LEGACY_PATH
+
+def data_version(path=None):
+    path = resolve_data_path(path)
+    # mtime + size is cheap to check on every rerun and changes whenever the file is rewritten
+    # or a part of new trading days is appended next to it
+    return '-'.join(f"{stat.st_mtime_ns}-{stat.st_size}" for stat in map(os.stat, [path] + appended_parts(path)))
+
+def resolve_dataset_root(path=None):
+    # the year-partitioned copy only exists next to the ingested Parquet file
+    root = dataset_path(resolve_data_path(path))
+    return root if os.path.isdir(root) else None
+
+# cache_resource keeps one copy per process shared by every session,
+# the frames below are read-only, never modify them in place
+@st.cache_resource(show_spinner="Loading market data...", max_entries=4)
+def _load_prices(path, version):
+    if STORAGE_MODE == 'mmap':
+        store = ensure_feather_store(path, version, lambda: _read_price_columns(path))
+        return open_feather_store(store)
+    return _read_price_columns(path)
+
+def _read_price_columns(path):
+    df = read_store(path)
+    # the ingestion step can keep *_Vol. columns, the dashboard only works on prices
+    return df[[col for col in df.columns if col.endswith('_Price')]]
+
+@st.cache_resource
+def _state_registry():
+    return StateRegistry()
+
+def _incremental_state(path, version):
+    # a store that only gained rows is extended in place instead of recomputed
+    return _state_registry().get(path, version, lambda: _load_prices(path, version), window=14, smoothing='sma')
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _normalized_prices(path, version):
+    return _incremental_state(path, version).normalized()
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _returns(path, version):
+    return _load_prices(path, version).pct_change().iloc[1:]
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _correlation_matrix(path, version):
+    return _incremental_state(path, version).correlation()
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _asset_stats(path, version, benchmark):
+    return _incremental_state(path, version).asset_stats(benchmark)
+
+@st.cache_resource(show_spinner="Computing rolling correlations...", max_entries=8)
+def _rolling_correlation(path, version, window, step):
+    norm_df = _normalized_prices(path, version)
+    positions, cube = rolling_correlation(norm_df.to_numpy(), window=window, step=step)
+    return norm_df.index[positions], cube
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _seasonal_cube(path, version):
+    norm_df = _normalized_prices(path, version)
+    return build_seasonal_cube(norm_df), build_yearly_stats(norm_df)
+
+@st.cache_resource(show_spinner="Decomposing seasonality...", max_entries=4)
+def _seasonal_decomposition(path, version):
+    # every asset in one batch, the page only picks a column
+    prices = _load_prices(path, version)
+    return decompose(prices), typical_year(prices)
+
+@st.cache_resource(show_spinner="Computing return correlations...", max_entries=4)
+def _return_correlation(path, version):
+    return blocked_correlation(_returns(path, version))
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _cum_log_returns(path, version):
+    return cumulative_log_returns(_normalized_prices(path, version))
+
+# the (start, end) variants below are only used for a narrowed date range,
+# the full range always goes through the unfiltered caches above
+@st.cache_resource(show_spinner="Computing correlations for the date range...", max_entries=16)
+def _range_correlation(path, version, basis, start, end):
+    frame = _returns(path, version) if basis == 'returns' else _normalized_prices(path, version)
+    return blocked_correlation(slice_range(frame, start, end))
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _range_asset_stats(path, version, benchmark, start, end):
+    return compute_asset_stats(slice_range(_load_prices(path, version), start, end), benchmark)
+
+def _correlation(path, version, basis, start, end):
+    if start is not None or end is not None:
+        return _range_correlation(path, version, basis, start, end)
+    if basis == 'returns':
+        return _return_correlation(path, version)
+    return _correlation_matrix(path, version)
+
+@st.cache_resource(show_spinner="Bootstrapping correlation significance...", max_entries=16)
+def _correlation_significance(path, version, basis, start, end):
+    # same frame and range as _correlation, so the masks line up with the matrix they describe
+    frame = _returns(path, version) if basis == 'returns' else _normalized_prices(path, version)
+    return correlation_significance(slice_range(frame, start, end))
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _clustered_correlation(path, version, basis, start, end):
+    return reorder_correlation(_correlation(path, version, basis, start, end))
+
+@st.cache_resource(show_spinner="Simulating portfolios...", max_entries=32)
+def _portfolio_frontier(path, version, assets, n_portfolios, start, end):
+    mu, cov = annualized_moments(slice_range(_returns(path, version), start, end)[list(assets)])
+    cloud, best = random_portfolios(mu, cov, n_portfolios=n_portfolios)
+    return mu, cov, cloud, best, efficient_frontier(mu, cov)
+
+@st.cache_resource(show_spinner="Computing rolling risk...", max_entries=16)
+def _rolling_risk(path, version, window, alpha, n_boot):
+    return rolling_risk(_load_prices(path, version), window=window, alpha=alpha, n_boot=n_boot)
+
+@st.cache_resource(show_spinner=False, max_entries=16)
+def _range_rolling_risk(path, version, window, alpha, n_boot, start, end):
+    # rolling measures keep their look-back before the range start, drawdown restarts at the range start
+    risk = {name: slice_range(frame, start, end) for name, frame in _rolling_risk(path, version, window, alpha, n_boot).items()}
+    prices = slice_range(_load_prices(path, version), start, end)
+    risk['drawdown'] = pd.DataFrame(running_drawdown(prices.to_numpy(dtype=float)) * 100, index=prices.index, columns=prices.columns)
+    return risk
+
+# pruned reads: only the requested columns and years are read from the partitioned dataset
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _normalized_slice(root, version, columns, start, end):
+    return partitioned_store.read_normalized(root, list(columns), start=start, end=end, window=14, smoothing='sma')
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _asset_year(root, version, asset, year):
+    data = _normalized_slice(root, version, (asset,), f"{year}-01-01", f"{year}-12-31")
+    # cube statistics are per (asset, year[, month]) group, so the slice gives the same numbers as the full cube
+    return data[asset], build_seasonal_cube(data), build_yearly_stats(data)
+
+@profiled
+def load_prices(path=None):
+    path = resolve_data_path(path)
+    return _load_prices(path, data_version(path))
+
+@profiled
+def get_normalized_prices(path=None):
+    path = resolve_data_path(path)
+    return _normalized_prices(path, data_version(path))
+
+@profiled
+def get_returns(path=None):
+    path = resolve_data_path(path)
+    return _returns(path, data_version(path))
+
+@profiled
+def get_correlation_matrix(path=None, start=None, end=None):
+    path = resolve_data_path(path)
+    return _correlation(path, data_version(path), 'prices', start, end)
+
+@profiled
+def get_asset_stats(benchmark='S&P_500_Price', path=None, start=None, end=None):
+    path = resolve_data_path(path)
+    if start is not None or end is not None:
+        return _range_asset_stats(path, data_version(path), benchmark, start, end)
+    return _asset_stats(path, data_version(path), benchmark)
+
+@profiled
+def get_rolling_correlation(window=None, step=1, path=None):
+    path = resolve_data_path(path)
+    return _rolling_correlation(path, data_version(path), window, step)
+
+@profiled
+def get_rolling_risk(window=63, alpha=0.05, n_boot=0, path=None, start=None, end=None):
+    path = resolve_data_path(path)
+    if start is not None or end is not None:
+        return _range_rolling_risk(path, data_version(path), window, alpha, n_boot, start, end)
+    return _rolling_risk(path, data_version(path), window, alpha, n_boot)
+
+@profiled
+def get_seasonal_cube(path=None):
+    path = resolve_data_path(path)
+    return _seasonal_cube(path, data_version(path))
+
+@profiled
+def get_seasonal_decomposition(path=None):
+    path = resolve_data_path(path)
+    return _seasonal_decomposition(path, data_version(path))
+
+@profiled
+def get_return_correlation(path=None, start=None, end=None):
+    path = resolve_data_path(path)
+    return _correlation(path, data_version(path), 'returns', start, end)
+
+@profiled
+def get_correlation_significance(basis='prices', path=None, start=None, end=None):
+    """Bootstrap p-values, confidence intervals and a significance mask for get_correlation_matrix()/get_return_correlation()."""
+    path = resolve_data_path(path)
+    return _correlation_significance(path, data_version(path), basis, start, end)
+
+@profiled
+def get_clustered_correlation(basis='prices', path=None, start=None, end=None):
+    path = resolve_data_path(path)
+    return _clustered_correlation(path, data_version(path), basis, start, end)
+
+@profiled
+def get_portfolio_frontier(assets, n_portfolios=100_000, path=None, start=None, end=None):
+    path = resolve_data_path(path)
+    return _portfolio_frontier(path, data_version(path), tuple(assets), n_portfolios, start, end)
+
+def list_assets(path=None):
+    root = resolve_dataset_root(path)
+    if root is not None:
+        return partitioned_store.list_assets(root)
+    return list(get_normalized_prices(path).columns)
+
+def list_years(path=None):
+    root = resolve_dataset_root(path)
+    if root is not None:
+        return partitioned_store.list_years(root)
+    return list(get_normalized_prices(path).index.year.unique())
+
+@profiled
+def get_normalized_slice(columns, start=None, end=None, path=None):
+    """Normalized prices for some assets and an optional date range, same values as slicing get_normalized_prices()."""
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    root = resolve_dataset_root(path)
+    if root is not None:
+        return _normalized_slice(root, partitioned_store.dataset_version(root), tuple(columns), start, end)
+    return slice_range(get_normalized_prices(path), start, end)[list(columns)]
+
+@profiled
+def get_rebased_prices(columns, start=None, end=None, path=None):
+    """Normalized prices for the range, rebased to 100 at its first day; unchanged without a start."""
+    if start is None:
+        return get_normalized_slice(columns, end=end, path=path)
+    root = resolve_dataset_root(path)
+    if root is not None:
+        return rebase(cumulative_log_returns(get_normalized_slice(columns, start, end, path)))
+    path = resolve_data_path(path)
+    return rebase(slice_range(_cum_log_returns(path, data_version(path)), start, end)[list(columns)])
+
+def get_date_bounds(path=None):
+    root = resolve_dataset_root(path)
+    if root is not None:
+        return partitioned_store.date_bounds(root)
+    index = get_normalized_prices(path).index
+    return index[0], index[-1]
+
+@profiled
+def get_asset_year(asset, year, path=None, start=None, end=None):
+    """One asset's series for a year plus the seasonal cube/yearly stats covering it.
+
+    With a date range the year is clipped to it and rebased like get_rebased_prices(),
+    the cube and stats are then built on that clipped year alone.
+    """
+    if start is not None or end is not None:
+        data = year_slice(get_rebased_prices([asset], start, end, path)[asset], year)
+        frame = data.to_frame()
+        return data, build_seasonal_cube(frame), build_yearly_stats(frame)
+    root = resolve_dataset_root(path)
+    if root is not None:
+        return _asset_year(root, partitioned_store.dataset_version(root), asset, year)
+    seasonal_cube, yearly_stats = get_seasonal_cube(path)
+    return year_slice(get_normalized_prices(path)[asset], year), seasonal_cube, yearly_stats
+
+@profiled
+def get_memory_report(path=None):
+    path = resolve_data_path(path)
+    frames = {
+        'prices': load_prices(path),
+        'normalized': get_normalized_prices(path),
+        'returns': get_returns(path),
+        'correlation': get_correlation_matrix(path)
+    }
+    return memory_report(frames, mapped_path=feather_path(path) if STORAGE_MODE == 'mmap' else None)
+
+def append_trading_days(new_rows, path=None):
+    """Append new rows to the store as a new part, the next read extends the derived data instead of rebuilding it."""
+    return append_rows(new_rows, resolve_data_path(path))
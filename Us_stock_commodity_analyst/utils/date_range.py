@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+def range_positions(index, start=None, end=None):
+    """Row bounds of [start, end] (both inclusive) on a sorted DatetimeIndex, by binary search."""
+    i = 0 if start is None else index.searchsorted(pd.Timestamp(start), side='left')
+    j = len(index) if end is None else index.searchsorted(pd.Timestamp(end), side='right')
+    return i, j
+
+def slice_range(frame, start=None, end=None):
+    # positional slice of a sorted frame, a view instead of a boolean-mask copy
+    i, j = range_positions(frame.index, start, end)
+    return frame.iloc[i:j]
+
+def cumulative_log_returns(norm_df):
+    """log(price / first price) per column, computed once so any range can be rebased with one subtraction."""
+    values = np.log(norm_df.to_numpy(dtype=np.float64))
+    return pd.DataFrame(values - values[0], index=norm_df.index, columns=norm_df.columns)
+
+def rebase(cum_log):
+    """Rebase a (sliced) cumulative log-return frame to 100 at its first row."""
+    if cum_log.empty:
+        return cum_log
+    values = cum_log.to_numpy()
+    return pd.DataFrame(100 * np.exp(values - values[0]), index=cum_log.index, columns=cum_log.columns)
+
+def get_date_range():
+    """(start, end) picked in the sidebar, None on a side that is at the edge of the data."""
+    return st.session_state.get('active_date_range', (None, None))
+
+def date_range_control(first_date, last_date):
+    first_date, last_date = first_date.date(), last_date.date()
+    picked = st.sidebar.date_input(
+        "Date Range",
+        value=(first_date, last_date),
+        min_value=first_date,
+        max_value=last_date,
+        key="date_range"
+    )
+    # while the user is still picking the end date the widget holds a single date
+    picked = tuple(picked) if isinstance(picked, (tuple, list)) else (picked,)
+    start = picked[0] if len(picked) > 0 else first_date
+    end = picked[1] if len(picked) > 1 else last_date
+
+    # the full range maps to (None, None) so the pages hit the same caches as without a filter
+    active = (
+        pd.Timestamp(start) if start > first_date else None,
+        pd.Timestamp(end) if end < last_date else None
+    )
+    st.session_state.active_date_range = active
+    if active != (None, None):
+        st.sidebar.caption("Prices are rebased to 100 at the start of the range")
+    return active
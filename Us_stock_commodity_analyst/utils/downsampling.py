@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from utils.profiling import profiled
+
+# roughly the pixel width of a wide chart, no point sending more samples per line than that
+PIXEL_BUDGET = 1200
+# above this many points in a figure switch the traces to Scattergl
+WEBGL_THRESHOLD = 5000
+
+def lttb_indices(x, y, n_out):
+    """Positions kept by Largest-Triangle-Three-Buckets when reducing (x, y) to n_out points."""
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        # area of the triangle (previous pick, candidate, next bucket average) for every candidate at once
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
+
+def downsample(series, n_out=PIXEL_BUDGET):
+    series = series.dropna()
+    if len(series) <= n_out:
+        return series
+    x = series.index.asi8.astype(np.float64) if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series), dtype=np.float64)
+    return series.iloc[lttb_indices(x, series.to_numpy(dtype=np.float64), n_out)]
+
+def downsample_long(frame, columns, n_out=PIXEL_BUDGET):
+    """Downsample every column on its own and stack them into (Date, variable, value) rows for px.line."""
+    parts = []
+    for col in columns:
+        reduced = downsample(frame[col], n_out)
+        parts.append(pd.DataFrame({'Date': reduced.index, 'variable': col, 'value': reduced.to_numpy()}))
+    if not parts:
+        return pd.DataFrame(columns=['Date', 'variable', 'value'])
+    return pd.concat(parts, ignore_index=True)
+
+def render_mode(n_points, threshold=WEBGL_THRESHOLD):
+    return 'webgl' if n_points > threshold else 'svg'
+
+@profiled
+def decimated_line(frame, columns=None, n_out=PIXEL_BUDGET, webgl_threshold=WEBGL_THRESHOLD, **kwargs):
+    """px.line on a wide price frame, decimated per column and switched to WebGL for large payloads."""
+    if isinstance(frame, pd.Series):
+        frame = frame.to_frame()
+    columns = list(frame.columns) if columns is None else list(columns)
+
+    long_df = downsample_long(frame, columns, n_out)
+    return px.line(
+        long_df,
+        x='Date',
+        y='value',
+        color='variable',
+        render_mode=render_mode(len(long_df), webgl_threshold),
+        **kwargs
+    )
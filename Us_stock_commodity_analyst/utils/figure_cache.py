@@ -0,0 +1,75 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+MAX_ENTRIES = 128
+MAX_BYTES = 64 * 1024 * 1024
+
+class FigureCache:
+    """Process-wide LRU of built Plotly figures, bounded by entry count and serialized size.
+
+    Cached figures are shared between sessions, never mutate one after it is returned.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key, build):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key][0]
+            self.misses += 1
+
+        fig = build()
+        size = len(fig.to_json())
+        if size > self.max_bytes:
+            return fig
+
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = (fig, size)
+                self._bytes += size
+            while self._items and (len(self._items) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, old_size) = self._items.popitem(last=False)
+                self._bytes -= old_size
+        return fig
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache()
+
+def frame_key(obj):
+    """Content hash of a Series/DataFrame (values, index and labels) to use in figure keys."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(obj, index=True).to_numpy().tobytes())
+    labels = obj.columns if isinstance(obj, pd.DataFrame) else [obj.name]
+    h.update(repr(list(labels)).encode())
+    return h.hexdigest()
+
+def cached_figure(name, key, build):
+    return get_figure_cache().get_or_build((name,) + tuple(key), build)
@@ -2,59 +2,66 @@ import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
 import calendar
+import pandas as pd
+from plotly.subplots import make_subplots
 
-def yearly_seasonal_plot(data_tahun, year):
+from utils.batch_report import compute_year_report
+from utils.downsampling import decimated_line
+from utils.profiling import plotly_chart
+from utils.seasonal_cube import month_slice
+
+def yearly_seasonal_plot(data_tahun, year, year_stats):
 
     colom1, colom2 = st.columns([3, 1])
     with colom1:
-        fig = px.line(data_tahun, x=data_tahun.index, y=data_tahun)
+        fig = decimated_line(data_tahun)
 
         fig.update_layout(
             title=f"{year} Price Trend",
+            showlegend=False,
             xaxis_title="Date",
             yaxis_title="Price",
             height=600
         )
-        st.plotly_chart(fig, use_container_width=False)                
+        plotly_chart(fig, use_container_width=False)                
 
     with colom2:
         st.subheader(f"Price Statistics of {year}")
-        st.metric("Total Days", len(data_tahun), delta=None)
-        st.write(f"From {data_tahun.index[0].strftime('%Y-%m-%d')} to {data_tahun.index[-1].strftime('%Y-%m-%d')}")
+        st.metric("Total Days", int(year_stats['count']), delta=None)
+        st.write(f"From {year_stats['start_date'].strftime('%Y-%m-%d')} to {year_stats['end_date'].strftime('%Y-%m-%d')}")
 
         col1, col2 = st.columns(2)
                         
         with col1:
             with st.container(border=True):
-                st.metric("Starting Price", f"{data_tahun.iloc[0]:.2f}", delta=None)
-                st.write(data_tahun.index[0].strftime("%Y-%m-%d"))
+                st.metric("Starting Price", f"{year_stats['start']:.2f}", delta=None)
+                st.write(year_stats['start_date'].strftime("%Y-%m-%d"))
             
             with st.container(border=True):
-                st.metric("Closing Price", f"{data_tahun.iloc[-1]:.2f}", delta=None)
-                st.write(data_tahun.index[-1].strftime("%Y-%m-%d"))
+                st.metric("Closing Price", f"{year_stats['end']:.2f}", delta=None)
+                st.write(year_stats['end_date'].strftime("%Y-%m-%d"))
 
         with col2:
             with st.container(border=True):
-                st.metric("Max Price", f"{data_tahun.max():.2f}", delta=None)
-                st.write(data_tahun.idxmax().strftime("%Y-%m-%d"))
+                st.metric("Max Price", f"{year_stats['high']:.2f}", delta=None)
+                st.write(year_stats['high_date'].strftime("%Y-%m-%d"))
             
             with st.container(border=True):
-                st.metric("Min Price", f"{data_tahun.min():.2f}", delta=None)
-                st.write(data_tahun.idxmin().strftime("%Y-%m-%d"))
+                st.metric("Min Price", f"{year_stats['low']:.2f}", delta=None)
+                st.write(year_stats['low_date'].strftime("%Y-%m-%d"))
 
-def monthly_mean_seasonal_plot(data_tahun, year):
+def monthly_mean_seasonal_plot(monthly_mean, year):
 
     colom3, colom4 = st.columns([3,1])
     with colom3:
-        monthly_mean = data_tahun.groupby(data_tahun.index.to_period("M")).mean()
-        fig = px.line(monthly_mean, x=monthly_mean.index.astype(str), y=monthly_mean, markers=True,)
+        fig = px.line(monthly_mean, x=monthly_mean.index, y=monthly_mean, markers=True,)
 
         fig.layout.update(
             title=f"Mean of {year}",
             xaxis_title="Month",
             yaxis_title="Mean Price",
         )
-        st.plotly_chart(fig, use_container_width=False)
+        plotly_chart(fig, use_container_width=False)
 
     with colom4:
         st.subheader(f"Mean Price Statistics of {year}")
@@ -62,14 +69,14 @@ def monthly_mean_seasonal_plot(data_tahun, year):
         with col5:
             with st.container(border=True):
                 st.metric("Max Monthly Mean", f"{monthly_mean.max():.2f}", delta=None)
-                st.write(monthly_mean.idxmax().strftime("%Y-%m"))
+                st.write(monthly_mean.idxmax())
         with col6:
             with st.container(border=True):
                 st.metric("Min Monthly Mean", f"{monthly_mean.min():.2f}", delta=None)
-                st.write(monthly_mean.idxmin().strftime("%Y-%m")) 
+                st.write(monthly_mean.idxmin())
 
-def card_monthly_seasonal(data_month, month_name):
-    if len(data_month) > 0:  # Check if data exists
+def card_monthly_seasonal(data_month, month_name, stats):
+    if stats is not None and stats['count'] > 0:  # Check if data exists
         fig = go.Figure()
         fig.add_trace(go.Scatter(
             x=data_month.index,
@@ -84,7 +91,7 @@ def card_monthly_seasonal(data_month, month_name):
             margin=dict(l=20, r=20, t=20, b=20),
             showlegend=False
         )
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(fig, use_container_width=True)
         
         # Area untuk statistics
         stats_container = st.container()
@@ -93,27 +100,27 @@ def card_monthly_seasonal(data_month, month_name):
             metric_col1, metric_col2, metric_col3 = st.columns(3)
             
             with metric_col1:
-                st.metric("Start", f"{data_month.iloc[0]:.2f}")
-                st.metric("High", f"{data_month.max():.2f}")
-                st.metric("Days", f"{len(data_month)}")
+                st.metric("Start", f"{stats['start']:.2f}")
+                st.metric("High", f"{stats['high']:.2f}")
+                st.metric("Days", f"{stats['count']}")
             
             with metric_col2:
-                st.metric("End", f"{data_month.iloc[-1]:.2f}")
-                st.metric("Low", f"{data_month.min():.2f}")
-                st.metric("Avg", f"{data_month.mean():.2f}")
+                st.metric("End", f"{stats['end']:.2f}")
+                st.metric("Low", f"{stats['low']:.2f}")
+                st.metric("Avg", f"{stats['mean']:.2f}")
 
             with metric_col3:
-                change_start_end = data_month.iloc[-1] - data_month.iloc[0]
-                change_percent = (change_start_end / data_month.iloc[0])
+                change_start_end = stats['end'] - stats['start']
+                change_percent = stats['change'] / 100
                 st.metric("Start-End", f"{change_start_end:+.2f}", f"{change_percent:+.1%}")
-                change_high_low = data_month.max() - data_month.min()
-                change_high_low_percent = (change_high_low / data_month.min())
+                change_high_low = stats['high'] - stats['low']
+                change_high_low_percent = (change_high_low / stats['low'])
                 st.metric("High-Low", f"{change_high_low:+.2f}", f"{change_high_low_percent:+.1%}") 
                                                                     
     else:
         st.info(f"No data available for {month_name}")
 
-def card_layout(data_tahun, year):
+def card_layout(data_tahun, year, month_stats):
     
     months = list(range(1, 13))  # 1-12 untuk bulan
     month_names = [calendar.month_name[i] for i in months]
@@ -127,51 +134,34 @@ def card_layout(data_tahun, year):
             if month_index < 12:
                 month_num = months[month_index]
                 month_name = month_names[month_index]
-                data_month = data_tahun[data_tahun.index.month == month_num]
+                stats = month_stats.loc[month_num] if month_num in month_stats.index else None
+                data_month = month_slice(data_tahun, year, month_num) if stats is not None else None
 
                 with col:
                     with st.container(border=True):
                         st.subheader(f"{month_name.upper()} {year}" )
-                        card_monthly_seasonal(data_month, month_name)
+                        card_monthly_seasonal(data_month, month_name, stats)
 
         if row < 3:
             st.markdown("---")  # Garis pemisah antar baris
 
-def summary_year_seasonal(data_tahun):
+def summary_year_seasonal(summary):
 
     st.markdown("### 📈 Year Summary")
     summary_col1, summary_col2, summary_col3, summary_col4 = st.columns(4)
 
-    # Calculate monthly stats for summary
-    monthly_stats = []
-    for month in range(1, 13):
-        month_data = data_tahun[data_tahun.index.month == month]
-        if len(month_data) > 0:
-            monthly_change = ((month_data.iloc[-1] - month_data.iloc[0]) / month_data.iloc[0]) * 100
-            monthly_stats.append({
-                'month': calendar.month_name[month],
-                'change': monthly_change,
-                'avg_price': month_data.mean()
-            })
-
-    if monthly_stats:
-        # Find best and worst months
-        best_month = max(monthly_stats, key=lambda x: x['change'])
-        worst_month = min(monthly_stats, key=lambda x: x['change'])
-        
+    if summary is not None:
         with summary_col1:
-            st.metric("Best Month", best_month['month'], f"+{best_month['change']:.1f}%")
+            st.metric("Best Month", summary['best_month'], f"+{summary['best_change']:.1f}%")
             
         with summary_col2:
-            st.metric("Worst Month", worst_month['month'], f"{worst_month['change']:.1f}%")
+            st.metric("Worst Month", summary['worst_month'], f"{summary['worst_change']:.1f}%")
             
         with summary_col3:
-            avg_price = sum([stat['avg_price'] for stat in monthly_stats]) / len(monthly_stats)
-            st.metric("Avg Price", f"{avg_price:.2f}")
+            st.metric("Avg Price", f"{summary['avg_price']:.2f}")
             
         with summary_col4:
-            volatility = data_tahun.std()
-            st.metric("Volatility", f"{volatility:.2f}")
+            st.metric("Volatility", f"{summary['volatility']:.2f}")
     else:
         with summary_col1:
             st.metric("Best Month", "N/A", "N/A")
@@ -182,23 +172,70 @@ def summary_year_seasonal(data_tahun):
         with summary_col4:
             st.metric("Volatility", "N/A")  
     
-def tap_year_seasonal(data ,year):
-    data_tahun = data[data.index.year == year]
+def tap_year_seasonal(data, year, seasonal_cube, yearly_stats):
+    # everything except the raw lines comes from the precomputed cube,
+    # the numbers are the same ones the batch reports are built from
+    report = compute_year_report(data, year, seasonal_cube.loc[(data.name, year)], yearly_stats.loc[(data.name, year)])
     
     st.subheader(f"Seasonal Analysis of {year}")
     
     # Plot yearly trend
-    yearly_seasonal_plot(data_tahun, year)
+    yearly_seasonal_plot(report['trend'], year, report['year_stats'])
     st.markdown("---")
 
     # Monthly mean plot
-    monthly_mean_seasonal_plot(data_tahun, year)
+    monthly_mean_seasonal_plot(report['monthly_mean'], year)
     st.markdown("---")
 
     # Card layout for monthly seasonal data
-    card_layout(data_tahun, year)
+    card_layout(report['trend'], year, report['months'])
     st.markdown("---")
 
     # Summary of the data_tahun, year
-    summary_year_seasonal(data_tahun)
-    st.markdown("---")
\ No newline at end of file
+    summary_year_seasonal(report['summary'])
+    st.markdown("---")
+# day-of-year 1..366 drawn on a leap year so the x axis can show month names
+DAY_OF_YEAR_AXIS = pd.date_range('2020-01-01', periods=366)
+
+def typical_year_plot(overlay, asset):
+    fig = go.Figure()
+    for year in overlay.columns.drop('Average'):
+        fig.add_trace(go.Scatter(x=DAY_OF_YEAR_AXIS, y=overlay[year], mode='lines', name=year, opacity=0.6,
+                                 hovertemplate='%{x|%d %b}: %{y:.1f}<extra>' + year + '</extra>'))
+    fig.add_trace(go.Scatter(x=DAY_OF_YEAR_AXIS, y=overlay['Average'], mode='lines', name="Average",
+                             line=dict(color='black', width=4), hovertemplate='%{x|%d %b}: %{y:.1f}<extra>Average</extra>'))
+    fig.update_layout(
+        title=f"Typical Year of {asset.replace('_', ' ')} (each year rebased to 100)",
+        xaxis=dict(title="Day of Year", tickformat="%b"),
+        yaxis_title="Rebased Price",
+        height=500
+    )
+    plotly_chart(fig, use_container_width=True)
+
+def decomposition_plot(price, trend, seasonal, residual, asset):
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True, vertical_spacing=0.05,
+                        subplot_titles=("Price and Trend", "Seasonal (% vs trend)", "Residual (%)"))
+    # every panel is decimated like the other long price lines, the series cover the whole history
+    panels = [
+        decimated_line(pd.DataFrame({"Price": price, "Trend": trend}), color_discrete_sequence=['#888', '#FF6B6B']),
+        decimated_line(seasonal.rename("Seasonal"), color_discrete_sequence=['#4ECDC4']),
+        decimated_line(residual.rename("Residual"), color_discrete_sequence=['#45B7D1'])
+    ]
+    for row, panel in enumerate(panels, start=1):
+        for trace in panel.data:
+            fig.add_trace(trace, row=row, col=1)
+    fig.update_traces(line_width=3, selector=dict(name="Trend"))
+    fig.update_layout(title=f"Seasonal Decomposition of {asset.replace('_', ' ')}", height=750, showlegend=False)
+    plotly_chart(fig, use_container_width=True)
+
+def seasonal_profile_plot(month_profile, asset):
+    profile = month_profile.set_axis([calendar.month_abbr[month] for month in month_profile.index])
+    fig = px.bar(x=profile.index, y=profile.values, color=profile.values > 0,
+                 color_discrete_map={True: '#4ECDC4', False: '#FF6B6B'})
+    fig.update_layout(
+        title=f"Average Seasonal Effect per Month of {asset.replace('_', ' ')}",
+        xaxis_title="Month",
+        yaxis_title="% vs Trend",
+        showlegend=False
+    )
+    plotly_chart(fig, use_container_width=True)
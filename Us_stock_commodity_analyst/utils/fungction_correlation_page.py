@@ -1,13 +1,19 @@
 import streamlit as st
 import plotly.graph_objects as go
-import plotly.express as px
+import numpy as np
 import pandas as pd
 
-def asset_correlation_strength(corr):
+from utils.correlation_engine import TILE_THRESHOLD, cluster_tiles, top_correlated_pairs
+from utils.downsampling import decimated_line
+from utils.figure_cache import cached_figure, frame_key
+from utils.profiling import plotly_chart
+
+def asset_correlation_strength(corr, significant=None):
     with st.container(border=True):        
         if len(corr) > 0:
             for i, (asset, corr) in enumerate(corr.head(3).items()):
-                st.write(f"**{i+1}. {asset.replace('_Price', '')}** {corr:.3f}")
+                flag = " *(n.s.)*" if significant is not None and not significant[asset] else ""
+                st.write(f"**{i+1}. {asset.replace('_Price', '')}** {corr:.3f}{flag}")
         else:
             st.write("*No correlations*")
 
@@ -17,7 +23,9 @@ def stastistic_correlation(top_corr):
             st.write(f"**{row['Asset1'].replace('_Price', '')}** <-> **{row['Asset2'].replace('_Price', '')}**")
             st.write(f"Correlation: {row['Correlation']:.3f}")
 
-def correlation_summary(asset_correlations):
+def correlation_summary(asset_correlations, significant=None):
+    if significant is not None:
+        st.caption("n.s. = not significantly different from zero (95% block bootstrap)")
     col1, col2, col3, col4 = st.columns(4)
 
     # Categorize correlations by strength
@@ -34,42 +42,49 @@ def correlation_summary(asset_correlations):
     with col1:
         st.markdown("### STRONGEST")
         st.markdown("**POSITIVE CORRELATION** *(> 0.8)*")
-        asset_correlation_strength(very_strong_pos)
+        asset_correlation_strength(very_strong_pos, significant)
         
         st.markdown("**NEGATIVE CORRELATION** *(< -0.8)*")
-        asset_correlation_strength(very_strong_neg)
+        asset_correlation_strength(very_strong_neg, significant)
 
     with col2:
         st.markdown("### STRONG")
         st.markdown("**POSITIVE CORRELATION** *(0.6 - 0.8)*")
-        asset_correlation_strength(strong_pos)     
+        asset_correlation_strength(strong_pos, significant)     
 
         st.markdown("**NEGATIVE CORRELATION** *(−0.6 - −0.8)*")
-        asset_correlation_strength(strong_neg)
+        asset_correlation_strength(strong_neg, significant)
 
     with col3:
         st.markdown("### MODERATE")
         st.markdown("**POSITIVE CORRELATION** *(0.3 - 0.6)*")
-        asset_correlation_strength(moderate_pos)
+        asset_correlation_strength(moderate_pos, significant)
         
             
         st.markdown("**NEGATIVE CORRELATION** *(−0.3 - −0.6)*")
-        asset_correlation_strength(moderate_neg)
+        asset_correlation_strength(moderate_neg, significant)
 
     with col4:
         st.markdown("### WEAK")
         st.markdown("**POSITIVE CORRELATION** *(−0.1 - −0.3)*")
 
-        asset_correlation_strength(weak_pos)
+        asset_correlation_strength(weak_pos, significant)
 
         st.markdown("**NEGATIVE CORRELATION** *(−0.1 - −0.3)*")
         
-        asset_correlation_strength(weak_neg)
+        asset_correlation_strength(weak_neg, significant)
     # Bottom statistics and insights section
     st.markdown("---")
 
 def single_correlation (asset_correlations, selected_asset):
+    fig = cached_figure(
+        "single_correlation",
+        (frame_key(asset_correlations), selected_asset),
+        lambda: _single_correlation_figure(asset_correlations, selected_asset)
+    )
+    plotly_chart(fig, use_container_width=True)
 
+def _single_correlation_figure(asset_correlations, selected_asset):
     fig = go.Figure(data=go.Heatmap(
         z=[asset_correlations.values],  # Single row
         x=[col.replace('_Price', '') for col in asset_correlations.index],
@@ -96,61 +111,102 @@ def single_correlation (asset_correlations, selected_asset):
             tickfont=dict(size=13)
         )
     )
+    return fig
 
-    st.plotly_chart(fig, use_container_width=True)
+def categori_correlation_figure(categories, tech_corr, available_tech, insignificant=None):
+    return cached_figure(
+        "categori_correlation",
+        (frame_key(tech_corr), categories, _mask_key(insignificant)),
+        lambda: flag_insignificant(_categori_correlation_figure(categories, tech_corr, available_tech), insignificant)
+    )
 
-def categori_correlation(categories, tech_corr, available_tech):
+def categori_correlation(categories, tech_corr, available_tech, insignificant=None):
     corr, summary = st.columns([2,1])
 
     with corr:
         st.subheader(f"Correlation of {categories} Assets")
 
-        clean_labels = [asset.replace('_Price', '') for asset in available_tech]
-        fig = go.Figure(data=go.Heatmap(
-            z=tech_corr.values,
-            x=clean_labels,
-            y=clean_labels,
-            colorscale='RdBu',
-            zmin=-1, zmax=1,
-            textfont={"size" : 16},
-            texttemplate='%{z:.3f}',
-            hovertemplate='%{x} vs %{y}: %{z:.6f}',
-        ))
-        fig.update_layout(
-            title=f"Correlation Heatmap of {categories}",
-            height=800,
-            width=800,
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        plotly_chart(categori_correlation_figure(categories, tech_corr, available_tech, insignificant), use_container_width=True)
 
     with summary:
         st.subheader("Summary of Correlation")
-        corr_pairs = []
-        for i in range(len(available_tech)):
-            for j in range(i+1, len(available_tech)):
-                corr_pairs.append({
-                    'Asset1': available_tech[i],
-                    'Asset2': available_tech[j],
-                    'Correlation': tech_corr.iloc[i, j]
-                })
+        top_positive = top_correlated_pairs(tech_corr, k=6, largest=True)
         
-        if corr_pairs:
-            corr_df = pd.DataFrame(corr_pairs)
-            corr_df = corr_df.sort_values(by='Correlation', ascending=False)
+        if len(top_positive) > 0:
+            top_negative = top_correlated_pairs(tech_corr, k=6, largest=False)
             
             poss, neg = st.columns(2)
 
             with poss:
                 st.subheader("Top Positive")
-                top_positive = corr_df.head(6)
                 stastistic_correlation(top_positive)
                 
             with neg:    
                 st.subheader("Top Negative")
-                top_negative = corr_df.tail(6)
                 stastistic_correlation(top_negative)
 
-def main_correlation(corr_df):
+def universe_top_pairs(corr_df, k=6):
+    poss, neg = st.columns(2)
+
+    with poss:
+        st.subheader("Most Correlated Pairs")
+        stastistic_correlation(top_correlated_pairs(corr_df, k=k, largest=True))
+
+    with neg:
+        st.subheader("Least Correlated Pairs")
+        stastistic_correlation(top_correlated_pairs(corr_df, k=k, largest=False))
+
+def _categori_correlation_figure(categories, tech_corr, available_tech):
+    clean_labels = [asset.replace('_Price', '') for asset in available_tech]
+    fig = go.Figure(data=go.Heatmap(
+        z=tech_corr.values,
+        x=clean_labels,
+        y=clean_labels,
+        colorscale='RdBu',
+        zmin=-1, zmax=1,
+        textfont={"size" : 16},
+        texttemplate='%{z:.3f}',
+        hovertemplate='%{x} vs %{y}: %{z:.6f}',
+    ))
+    fig.update_layout(
+        title=f"Correlation Heatmap of {categories}",
+        height=800,
+        width=800,
+    )
+    return fig
+
+def main_correlation_figure(corr_df, insignificant=None):
+    return cached_figure(
+        "main_correlation",
+        (frame_key(corr_df), _mask_key(insignificant)),
+        lambda: flag_insignificant(_main_correlation_figure(corr_df), insignificant)
+    )
+
+def main_correlation(corr_df, insignificant=None):
+    plotly_chart(main_correlation_figure(corr_df, insignificant), use_container_width=True)
+
+def _mask_key(insignificant):
+    return frame_key(insignificant) if insignificant is not None else None
+
+def flag_insignificant(fig, insignificant):
+    """Cross out the cells of a heatmap whose correlation is not significantly different from zero."""
+    if insignificant is None:
+        return fig
+    rows, cols = np.nonzero(insignificant.to_numpy())
+    x_labels = [col.replace("_Price", "") for col in insignificant.columns]
+    y_labels = [row.replace("_Price", "") for row in insignificant.index]
+    fig.add_trace(go.Scatter(
+        x=[x_labels[j] for j in cols],
+        y=[y_labels[i] for i in rows],
+        mode='markers',
+        marker=dict(symbol='x-thin', size=12, line=dict(width=2, color='black')),
+        name="Not significant (95%)",
+        hoverinfo='skip'
+    ))
+    fig.update_layout(showlegend=True, legend=dict(orientation='h', y=-0.15))
+    return fig
+
+def _main_correlation_figure(corr_df):
     fig = go.Figure(data=go.Heatmap(
         z=corr_df.values,
         x=[col.replace("_Price", "") for col in corr_df.columns],
@@ -167,15 +223,13 @@ def main_correlation(corr_df):
         xaxis=dict(tickangle=-25, tickfont=dict(size = 13)),
         yaxis=dict(tickangle=0, tickfont=dict(size = 13))
     )
-
-    st.plotly_chart(fig, use_container_width=True)  
+    return fig
 
 
-def price_line_plot(category_data, available_assets, categories, norm_df):
-    fig = px.line(
+def _price_line_figure(category_data, available_assets, categories):
+    fig = decimated_line(
         category_data,
-        x=category_data.index,
-        y=available_assets,
+        available_assets,
         title=f"{categories} Price Movement",
         labels={'index': 'Date', 'value': 'Normalized Price', 'variable': 'Assets'},
         height=600
@@ -187,12 +241,88 @@ def price_line_plot(category_data, available_assets, categories, norm_df):
         legend_title="Assets",
         hovermode='x unified'
     )
-    
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+def _clustered_heatmap_figure(ordered_corr, clusters, title):
+    labels = [col.replace("_Price", "") for col in ordered_corr.columns]
+    annotate = len(labels) <= 40
+    fig = go.Figure(data=go.Heatmap(
+        z=ordered_corr.values,
+        x=labels,
+        y=labels,
+        colorscale='RdBu',
+        zmin=-1, zmax=1,
+        texttemplate='%{z:.2f}' if annotate else None,
+        hovertemplate='%{x} vs %{y}: %{z:.2f}<extra></extra>',
+    ))
+
+    # outline every cluster block along the diagonal
+    values = clusters.to_numpy()
+    bounds = [0] + [i for i in range(1, len(values)) if values[i] != values[i - 1]] + [len(values)]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        fig.add_shape(
+            type="rect",
+            x0=start - 0.5, x1=end - 0.5,
+            y0=start - 0.5, y1=end - 0.5,
+            line=dict(color="black", width=2)
+        )
+
+    fig.update_layout(
+        title=title,
+        height=800,
+        width=800,
+        xaxis=dict(tickangle=-25, tickfont=dict(size = 13), showticklabels=annotate),
+        yaxis=dict(tickangle=0, tickfont=dict(size = 13), showticklabels=annotate, autorange='reversed')
+    )
+    return fig
+
+def clustered_correlation(ordered_corr, clusters, title="Clustered Correlation Heatmap", insignificant=None):
+    if len(ordered_corr) <= TILE_THRESHOLD:
+        fig = cached_figure(
+            "clustered_correlation",
+            (frame_key(ordered_corr), title, _mask_key(insignificant)),
+            lambda: flag_insignificant(_clustered_heatmap_figure(ordered_corr, clusters, title), insignificant)
+        )
+        plotly_chart(fig, use_container_width=True)
+        return
+
+    # too many cells for the browser: show cluster tiles and drill into one cluster pair
+    tiles = cluster_tiles(ordered_corr, clusters)
+    fig = cached_figure(
+        "cluster_tiles",
+        (frame_key(tiles), title),
+        lambda: _main_correlation_figure(tiles).update_layout(title=f"{title} (cluster averages)")
+    )
+    plotly_chart(fig, use_container_width=True)
+
+    cluster_ids = sorted(clusters.unique())
+    col1, col2 = st.columns(2)
+    with col1:
+        row_cluster = st.selectbox("Drill down: row cluster", cluster_ids, key="drill_row_cluster")
+    with col2:
+        col_cluster = st.selectbox("Drill down: column cluster", cluster_ids, key="drill_col_cluster")
+
+    rows = clusters.index[clusters == row_cluster]
+    cols = clusters.index[clusters == col_cluster]
+    block = ordered_corr.loc[rows, cols]
+    fig = cached_figure(
+        "cluster_block",
+        (frame_key(block), title),
+        lambda: _main_correlation_figure(block).update_layout(title=f"Cluster {row_cluster} vs Cluster {col_cluster}")
+    )
+    plotly_chart(fig, use_container_width=True)
+
+def price_line_figure(category_data, available_assets, categories):
+    return cached_figure(
+        "price_line_plot",
+        (frame_key(category_data[available_assets]), categories),
+        lambda: _price_line_figure(category_data, available_assets, categories)
+    )
 
+def price_line_metrics(category_data, available_assets):
     metrics_data = []
     for asset in available_assets:
-        info_asset = norm_df[asset]
+        info_asset = category_data[asset]
         metrics_data.append({
             'Asset': asset.replace('_Price', ''),
             'Close': info_asset.iloc[-1],
@@ -203,8 +333,12 @@ def price_line_plot(category_data, available_assets, categories, norm_df):
             'Change': ((info_asset.iloc[-1] - info_asset.iloc[0]) / info_asset.iloc[0]) * 100,
             'Volatility': info_asset.std()
         })
+    return pd.DataFrame(metrics_data)
 
-    metrics_df = pd.DataFrame(metrics_data)
+def price_line_plot(category_data, available_assets, categories):
+    plotly_chart(price_line_figure(category_data, available_assets, categories), use_container_width=True)
+
+    metrics_df = price_line_metrics(category_data, available_assets)
 
     # Display metrics table
     st.dataframe(
@@ -222,23 +356,37 @@ def price_line_plot(category_data, available_assets, categories, norm_df):
         }
     )
 
-def plot_custom_asset(norm_df, selected_custom_assets):
-    date_filter = st.checkbox("Filter by Date Range")
+def plot_custom_asset(plot_data, selected_custom_assets):
+    # plot_data already covers the sidebar date range, see utils.date_range
+    fig = cached_figure(
+        "plot_custom_asset",
+        (frame_key(plot_data[selected_custom_assets]),),
+        lambda: _custom_asset_figure(plot_data, selected_custom_assets)
+    )
+    plotly_chart(fig, use_container_width=True)
+    
+    if len(selected_custom_assets) > 0:
+        st.subheader("Selected Assets Summary")
         
-    if date_filter:
-        start_date = st.date_input("Start Date", norm_df.index[0])
-        end_date = st.date_input("End Date", norm_df.index[-1])
+        cols = st.columns(len(selected_custom_assets))
         
-        # Filter data berdasarkan date range
-        mask = (norm_df.index.date >= start_date) & (norm_df.index.date <= end_date)
-        plot_data = norm_df.loc[mask, selected_custom_assets]
-    else:
-        plot_data = norm_df[selected_custom_assets]
-    
-    fig = px.line(
+        for i, asset in enumerate(selected_custom_assets):
+            with cols[i]:
+                asset_data = plot_data[asset]
+                current_price = asset_data.iloc[-1]
+                start_price = asset_data.iloc[0]
+                change = ((current_price - start_price) / start_price) * 100
+                
+                st.metric(
+                    label=asset.replace('_Price', ''),
+                    value=f"{current_price:.3f}",
+                    delta=f"{change:+.2f}%"
+                )
+
+def _custom_asset_figure(plot_data, selected_custom_assets):
+    fig = decimated_line(
         plot_data,
-        x=plot_data.index,
-        y=selected_custom_assets,
+        selected_custom_assets,
         title="Custom Assets Comparison",
         labels={'index': 'Date', 'value': 'Normalized Price', 'variable': 'Assets'}
     )
@@ -255,23 +403,4 @@ def plot_custom_asset(norm_df, selected_custom_assets):
     for i, trace in enumerate(fig.data):
         fig.data[i].line.width = 3
         fig.data[i].line.color = colors[i % len(colors)]
-    
-    st.plotly_chart(fig, use_container_width=True)
-    
-    if len(selected_custom_assets) > 0:
-        st.subheader("Selected Assets Summary")
-        
-        cols = st.columns(len(selected_custom_assets))
-        
-        for i, asset in enumerate(selected_custom_assets):
-            with cols[i]:
-                asset_data = plot_data[asset] if date_filter else norm_df[asset]
-                current_price = asset_data.iloc[-1]
-                start_price = asset_data.iloc[0]
-                change = ((current_price - start_price) / start_price) * 100
-                
-                st.metric(
-                    label=asset.replace('_Price', ''),
-                    value=f"{current_price:.3f}",
-                    delta=f"{change:+.2f}%"
-                )
\ No newline at end of file
+    return fig
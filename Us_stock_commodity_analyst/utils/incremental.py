@@ -0,0 +1,286 @@
+import copy
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from utils.normalization import SMOOTHING_METHODS
+from utils.portfolio_stats import TRADING_DAYS, label_stats
+
+class _RowBuffer:
+    """Rows kept in arrays with spare capacity, so an append only copies the new rows.
+
+    Frames are views of the first n rows. States made by copy() share the buffer,
+    only the one whose n is still the filled length may write after it, any other
+    writer moves to a copy first.
+    """
+
+    def __init__(self, columns, index_name):
+        self.columns = columns
+        self.index_name = index_name
+        self.values = np.empty((0, len(columns)))
+        self.dates = None
+        self.filled = 0
+
+    def append(self, n, values, dates):
+        """Write rows after the caller's first n rows and return the buffer holding them."""
+        end = n + len(values)
+        buffer = self
+        if self.filled != n or end > len(self.values):
+            buffer = _RowBuffer(self.columns, self.index_name)
+            # doubling keeps the copies amortized O(1) per row
+            capacity = max(end, 2 * n, 256)
+            buffer.values = np.empty((capacity, len(self.columns)))
+            buffer.values[:n] = self.values[:n]
+            buffer.dates = np.empty(capacity, dtype=dates.dtype)
+            if n:
+                buffer.dates[:n] = self.dates[:n]
+        buffer.values[n:end] = values
+        buffer.dates[n:end] = dates
+        buffer.filled = end
+        return buffer
+
+    def frame(self, n):
+        if self.dates is None:
+            return pd.DataFrame(columns=self.columns)
+        index = pd.DatetimeIndex(self.dates[:n], name=self.index_name, copy=False)
+        return pd.DataFrame(self.values[:n], index=index, columns=self.columns, copy=False)
+
+class IncrementalState:
+    """Derived data of a price store that can be extended with new trading days.
+
+    append() only touches the new rows: the smoothing tail, running sums for
+    the correlation of normalized prices, cumulative max/drawdown and the raw
+    return moments behind Sharpe, skew, kurtosis and Beta/Alpha/Corr. The
+    outputs match normalize_prices(), norm_df.corr() and compute_asset_stats()
+    on the full history. For VaR the returns are kept sorted per asset, new
+    rows are merged in with a binary search so the percentile is a lookup
+instead of a full pass.
+    """
+
+    def __init__(self, columns, window=14, smoothing='sma'):
+        if smoothing not in SMOOTHING_METHODS:
+            raise ValueError(f"smoothing must be one of {SMOOTHING_METHODS}, got {smoothing!r}")
+        self.columns = pd.Index(columns)
+        self.window = window
+        self.smoothing = smoothing
+        self.version = None
+        self.n_rows = 0
+        self.last_date = None
+
+        n = len(self.columns)
+        # prices
+        self.base = None
+        self.last_price = None
+        self.cummax = None
+        self.max_dd = np.zeros(n)
+        # normalization
+        self.tail = np.empty((0, n))
+        self.norm_rows = _RowBuffer(self.columns, None)
+        self._norm_df = None
+        # running sums of normalized prices, shifted by the first normalized row
+        self.shift = None
+        self.n_norm = 0
+        self.norm_sum = np.zeros(n)
+        self.norm_outer = np.zeros((n, n))
+        # raw moments of daily returns
+        self.n_ret = 0
+        self.ret_moments = np.zeros((4, n))
+        self.ret_outer = np.zeros((n, n))
+        # one sorted row of returns per asset
+        self.sorted_returns = np.empty((n, 0))
+
+    @classmethod
+    def from_prices(cls, prices, window=14, smoothing='sma'):
+        state = cls(prices.columns, window=window, smoothing=smoothing)
+        state.append(prices)
+        return state
+
+    def copy(self):
+        """Independent state sharing the already computed normalized rows (they are never modified)."""
+        other = copy.copy(self)
+        for name in ['max_dd', 'norm_sum', 'norm_outer', 'ret_moments', 'ret_outer']:
+            setattr(other, name, getattr(self, name).copy())
+        return other
+
+    def can_extend(self, prices):
+        """True when prices starts with exactly the rows this state has already seen."""
+        if self.last_date is None or not prices.columns.equals(self.columns):
+            return False
+        position = prices.index.searchsorted(self.last_date)
+        return (position == self.n_rows - 1
+                and position < len(prices)
+                and prices.index[position] == self.last_date
+                and np.allclose(prices.iloc[position].to_numpy(dtype=np.float64), self.last_price, equal_nan=True))
+
+    def append(self, new_rows):
+        new_rows = new_rows[self.columns]
+        if self.last_date is not None:
+            new_rows = new_rows.iloc[new_rows.index.searchsorted(self.last_date, side='right'):]
+        if len(new_rows) == 0:
+            return self
+
+        dates = new_rows.index
+        new = new_rows.to_numpy(dtype=np.float64)
+
+        if self.base is None:
+            # the first row is only the base of the normalization, like the dropped row of norm_df
+            self.base = new[0].copy()
+            self.last_price = new[0].copy()
+            self.cummax = new[0].copy()
+            self.tail = (new[:1] / self.base * 100)
+            self.n_rows = 1
+            self.last_date = dates[0]
+            self.norm_rows.index_name = dates.name
+            new, dates = new[1:], dates[1:]
+            if len(new) == 0:
+                return self
+
+        self._append_normalized(new, dates)
+        self._append_returns(new)
+
+        self.last_price = new[-1].copy()
+        self.n_rows += len(new)
+        self.last_date = dates[-1]
+        return self
+
+    def _append_normalized(self, new, dates):
+        rebased = new / self.base * 100
+        ext = np.vstack([self.tail, rebased])
+
+        if self.smoothing == 'sma':
+            smoothed = pd.DataFrame(ext).rolling(window=self.window, min_periods=1).mean().to_numpy()[len(self.tail):]
+            keep = max(self.window - 1, 0)
+            self.tail = ext[len(ext) - keep:] if keep else ext[:0]
+        elif self.smoothing == 'ema':
+            # the tail holds the last smoothed value, ewm(adjust=False) carries on from it
+            smoothed = pd.DataFrame(ext).ewm(span=self.window, adjust=False).mean().to_numpy()[len(self.tail):]
+            self.tail = smoothed[-1:]
+        else:
+            smoothed = rebased
+            self.tail = rebased[-1:]
+
+        self.norm_rows = self.norm_rows.append(self.n_norm, smoothed, dates.to_numpy())
+        self._norm_df = None
+
+        if self.shift is None:
+            self.shift = smoothed[0].copy()
+        centered = smoothed - self.shift
+        self.n_norm += len(centered)
+        self.norm_sum += centered.sum(axis=0)
+        self.norm_outer += centered.T @ centered
+
+    def _append_returns(self, new):
+        prev = np.vstack([self.last_price, new[:-1]])
+        r = new / prev - 1
+        # only the new returns are sorted, a binary search places them in each asset's sorted row;
+        # NaN sorts and is inserted last, the same as np.percentile it then makes the whole column NaN
+        ranked = self.sorted_returns
+        merged = np.empty((ranked.shape[0], ranked.shape[1] + len(r)))
+        for column, values in enumerate(np.sort(r, axis=0).T):
+            merged[column] = np.insert(ranked[column], np.searchsorted(ranked[column], values, side='right'), values)
+        self.sorted_returns = merged
+        self.n_ret += len(r)
+        for k in range(4):
+            self.ret_moments[k] += (r ** (k + 1)).sum(axis=0)
+        self.ret_outer += r.T @ r
+
+        running_max = np.maximum.accumulate(np.vstack([self.cummax, new]), axis=0)[1:]
+        self.max_dd = np.minimum(self.max_dd, (new / running_max - 1).min(axis=0))
+        self.cummax = running_max[-1]
+
+    def normalized(self):
+        if self._norm_df is None:
+            self._norm_df = self.norm_rows.frame(self.n_norm)
+        return self._norm_df
+
+    def correlation(self):
+        n = self.n_norm
+        cov = self.norm_outer - np.outer(self.norm_sum, self.norm_sum) / n
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = cov / np.outer(std, std)
+        np.fill_diagonal(corr, 1)
+        return pd.DataFrame(np.clip(corr, -1, 1), index=self.columns, columns=self.columns)
+
+    def _return_percentile(self, q):
+        # linear interpolation between the two closest ranks, like np.percentile
+        ranked = self.sorted_returns
+        position = q / 100 * (ranked.shape[1] - 1)
+        lo = int(np.floor(position))
+        hi = min(lo + 1, ranked.shape[1] - 1)
+        value = ranked[:, lo] + (ranked[:, hi] - ranked[:, lo]) * (position - lo)
+        return np.where(np.isnan(ranked[:, -1]), np.nan, value)
+
+    def asset_stats(self, benchmark='S&P_500_Price'):
+        n = self.n_ret
+        s1, s2, s3, s4 = self.ret_moments
+        mean = s1 / n
+        # central sums from raw sums
+        m2 = s2 - s1 * mean
+        m3 = s3 - 3 * mean * s2 + 3 * mean ** 2 * s1 - n * mean ** 3
+        m4 = s4 - 4 * mean * s3 + 6 * mean ** 2 * s2 - 4 * mean ** 3 * s1 + n * mean ** 4
+        std = np.sqrt(m2 / (n - 1))
+
+        stats = pd.DataFrame(index=self.columns)
+        stats['Return'] = (self.last_price / self.base - 1) * 100
+        stats['Risk'] = std * np.sqrt(TRADING_DAYS) * 100
+        stats['Sharpe'] = (mean * TRADING_DAYS) / (std * np.sqrt(TRADING_DAYS))
+        stats['VaR'] = self._return_percentile(5) * 100
+        stats['MaxDD'] = self.max_dd * 100
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # same bias-corrected estimators as pandas skew()/kurtosis()
+            stats['Skew'] = n * np.sqrt(n - 1) / (n - 2) * m3 / m2 ** 1.5
+            stats['Kurt'] = (n * (n + 1) * (n - 1) * m4 / ((n - 2) * (n - 3) * m2 ** 2)
+                             - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+
+        if benchmark in self.columns:
+            b = self.columns.get_loc(benchmark)
+            cov_b = (self.ret_outer[:, b] - s1 * mean[b]) / (n - 1)
+            beta = cov_b / std[b] ** 2
+            stats['Beta'] = beta
+            stats['Alpha'] = (mean - beta * mean[b]) * TRADING_DAYS * 100
+            stats['Corr'] = cov_b / (std * std[b])
+        else:
+            stats['Beta'] = np.nan
+            stats['Alpha'] = np.nan
+            stats['Corr'] = np.nan
+
+        return label_stats(stats)
+
+class StateRegistry:
+    """IncrementalStates by (path, version), a new version that only gained rows extends a copy of an older one.
+
+    States are never changed once registered, so sessions still reading an older
+    version keep their state while newer ones are added next to it.
+    """
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path, version, load_prices, window=14, smoothing='sma'):
+        with self._lock:
+            key = (path, version, window, smoothing)
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+                return state
+
+            prices = load_prices()
+            # newest first, the most recent version usually needs the fewest new rows
+            base = next((
+                other for (other_path, _, other_window, other_smoothing), other in reversed(self._states.items())
+                if (other_path, other_window, other_smoothing) == (path, window, smoothing) and other.can_extend(prices)
+            ), None)
+            if base is not None:
+                state = base.copy().append(prices)
+            else:
+                state = IncrementalState.from_prices(prices, window=window, smoothing=smoothing)
+            state.version = version
+            self._states[key] = state
+            while len(self._states) > self.max_entries:
+                self._states.popitem(last=False)
+            return state
@@ -0,0 +1,186 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.partitioned_store import append_partition_rows, write_partitioned_dataset
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_PATH = os.path.join(BASE_DIR, 'US_stock_commodity', 'US_Stock_Data.csv')
+OUTPUT_PATH = os.path.join(BASE_DIR, 'US_Stock_Data_Cleaned.parquet')
+
+def dataset_path(output_path):
+    # year-partitioned copy of the same data, read with column/date pushdown by the dashboard
+    return os.path.splitext(output_path)[0] + '_by_year'
+
+def append_path(output_path):
+    # trading days added after the ingest, one small Parquet file per append
+    return os.path.splitext(output_path)[0] + '_appends'
+
+def appended_parts(output_path):
+    root = append_path(output_path)
+    if not os.path.isdir(root):
+        return []
+    # part-<first>-<last>.parquet, so name order is date order
+    return [os.path.join(root, name) for name in sorted(os.listdir(root)) if name.endswith('.parquet')]
+
+def read_store(output_path, columns=None):
+    """The cleaned file followed by every appended part."""
+    frames = [pd.read_parquet(path, columns=columns) for path in [output_path] + appended_parts(output_path)]
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+def _file_end_date(path):
+    # max of the index column from the row-group statistics, only the footer is read
+    parquet = pq.ParquetFile(path)
+    index_column = parquet.schema_arrow.pandas_metadata['index_columns'][0]
+    position = parquet.metadata.schema.names.index(index_column)
+    stats = [parquet.metadata.row_group(i).column(position).statistics for i in range(parquet.metadata.num_row_groups)]
+    if all(s is not None and s.has_min_max for s in stats):
+        return max(pd.Timestamp(s.max) for s in stats)
+    return pd.read_parquet(path, columns=[]).index.max()
+
+def store_end_date(output_path):
+    return max(_file_end_date(path) for path in [output_path] + appended_parts(output_path))
+
+def append_rows(new_rows, output_path=OUTPUT_PATH):
+    """Add trading days after the end of the store as new files, the existing files are never rewritten.
+
+    Rows on or before the last stored date are ignored. The year-partitioned
+    dataset, when there is one, gets the same rows as new files in its year
+    directories. Returns the number of rows added.
+    """
+    new_rows = new_rows.sort_index()
+    new_rows = new_rows.iloc[new_rows.index.searchsorted(store_end_date(output_path), side='right'):]
+    if len(new_rows) == 0:
+        return 0
+    schema = pq.read_schema(output_path)
+    index_columns = schema.pandas_metadata['index_columns']
+    # same columns as the cleaned file, an asset missing from the new days is NaN
+    new_rows = new_rows.reindex(columns=[name for name in schema.names if name not in index_columns])
+
+    name = f"part-{new_rows.index[0]:%Y%m%d}-{new_rows.index[-1]:%Y%m%d}"
+    root = append_path(output_path)
+    os.makedirs(root, exist_ok=True)
+    part_path = os.path.join(root, name + '.parquet')
+    # rename keeps readers from seeing a half-written part
+    new_rows.to_parquet(part_path + '.tmp')
+    os.replace(part_path + '.tmp', part_path)
+
+    if os.path.isdir(dataset_path(output_path)):
+        append_partition_rows(new_rows, dataset_path(output_path), name)
+    return len(new_rows)
+
+def file_checksum(path, chunk_size=1 << 20):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+def manifest_path(output_path):
+    return os.path.splitext(output_path)[0] + '.manifest.json'
+
+def read_manifest(output_path):
+    path = manifest_path(output_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def _to_number(col):
+    # "5,89,498" (Indian grouping) and "43,194.70" both become plain floats once the commas are gone
+    if col.dtype.kind in 'fiu':
+        return col.astype('float64')
+    return pd.to_numeric(col.str.replace(',', '', regex=False).str.strip(), errors='coerce')
+
+def clean_raw_data(raw, include_volume=False):
+    raw = raw.drop(columns=[c for c in raw.columns if c.startswith('Unnamed')])
+
+    # the feed mixes "2/2/2024" and "31-01-2024", both day first
+    dates = pd.to_datetime(raw['Date'].str.strip().str.replace('-', '/', regex=False), format='%d/%m/%Y')
+
+    price_cols = [c for c in raw.columns if c.endswith('_Price')]
+    vol_cols = [c for c in raw.columns if c.endswith('_Vol.')] if include_volume else []
+
+    clean = pd.DataFrame({col: _to_number(raw[col]) for col in price_cols})
+    for col in vol_cols:
+        clean[col] = _to_number(raw[col]).round().astype('Int64')
+    clean.index = pd.DatetimeIndex(dates, name='Date')
+
+    clean = clean[~clean.index.duplicated(keep='last')].sort_index()
+    return clean
+
+def ingest(raw_path=RAW_PATH, output_path=OUTPUT_PATH, include_volume=False, force=False):
+    """Clean the raw feed into a Parquet file and a manifest, skipping the work when the input is unchanged."""
+    input_sha = file_checksum(raw_path)
+    manifest = read_manifest(output_path)
+
+    if (not force and manifest is not None and os.path.exists(output_path)
+            and os.path.isdir(dataset_path(output_path))
+            and manifest.get('input_sha256') == input_sha
+            and manifest.get('include_volume') == include_volume):
+        return manifest, False
+
+    raw = pd.read_csv(raw_path, dtype=str, keep_default_na=False)
+    clean = clean_raw_data(raw, include_volume=include_volume)
+    parts = appended_parts(output_path)
+    if parts and len(clean):
+        # appended days the feed does not cover yet are folded into the rebuilt file
+        appended = pd.concat([pd.read_parquet(path) for path in parts])
+        later = appended.iloc[appended.index.searchsorted(clean.index[-1], side='right'):]
+        clean = pd.concat([clean, later.reindex(columns=clean.columns)])
+
+    # write to a temp file first so readers never see a half-written artifact
+    tmp_path = output_path + '.tmp'
+    clean.to_parquet(tmp_path)
+    os.replace(tmp_path, output_path)
+    write_partitioned_dataset(clean, dataset_path(output_path))
+    shutil.rmtree(append_path(output_path), ignore_errors=True)
+
+    manifest = {
+        'input_path': os.path.relpath(raw_path, BASE_DIR),
+        'input_sha256': input_sha,
+        'input_rows': int(len(raw)),
+        'output_path': os.path.relpath(output_path, BASE_DIR),
+        'output_sha256': file_checksum(output_path),
+        'output_rows': int(len(clean)),
+        'dataset_path': os.path.relpath(dataset_path(output_path), BASE_DIR),
+        'partitions': sorted(int(year) for year in clean.index.year.unique()),
+        'columns': list(clean.columns),
+        'include_volume': include_volume,
+        'start_date': clean.index[0].strftime('%Y-%m-%d') if len(clean) else None,
+        'end_date': clean.index[-1].strftime('%Y-%m-%d') if len(clean) else None,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    }
+    with open(manifest_path(output_path), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest, True
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean the raw US stock/commodity CSV into the Parquet store.")
+    parser.add_argument('--input', default=RAW_PATH, help="raw CSV exported from the feed")
+    parser.add_argument('--output', default=OUTPUT_PATH, help="cleaned Parquet file to write")
+    parser.add_argument('--include-volume', action='store_true', help="also keep the *_Vol. columns")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the input checksum is unchanged")
+    parser.add_argument('--append', metavar='CSV', help="add the new trading days of a CSV in the raw format to the existing store")
+    args = parser.parse_args(argv)
+
+    if args.append:
+        raw = pd.read_csv(args.append, dtype=str, keep_default_na=False)
+        added = append_rows(clean_raw_data(raw, include_volume=True), args.output)
+        print(f"Appended {added} new rows to {os.path.relpath(args.output, BASE_DIR)}")
+        return
+
+    manifest, rebuilt = ingest(args.input, args.output, include_volume=args.include_volume, force=args.force)
+    status = "Rebuilt" if rebuilt else "Up to date, skipped"
+    print(f"{status}: {manifest['output_path']} ({manifest['output_rows']} rows, "
+          f"{manifest['start_date']} to {manifest['end_date']})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,28 @@
+import pandas as pd
+
+from utils.profiling import profiled
+
+SMOOTHING_METHODS = ('sma', 'ema', 'none')
+
+@profiled
+def normalize_prices(df, window=14, smoothing='sma', base_date=None):
+    """Rebase every asset to 100 at the base date and smooth the whole frame in one pass."""
+    smoothing = (smoothing or 'none').lower()
+    if smoothing not in SMOOTHING_METHODS:
+        raise ValueError(f"smoothing must be one of {SMOOTHING_METHODS}, got {smoothing!r}")
+
+    if base_date is not None:
+        df = df.loc[pd.Timestamp(base_date):]
+    if df.empty:
+        return df.copy()
+
+    # divide the full block by the base row instead of looping column by column
+    norm_df = df.div(df.iloc[0]).mul(100)
+
+    if smoothing == 'sma':
+        norm_df = norm_df.rolling(window=window, min_periods=1).mean()
+    elif smoothing == 'ema':
+        norm_df = norm_df.ewm(span=window, adjust=False).mean()
+
+    # the base row is always exactly 100, drop it like the original loop did
+    return norm_df.iloc[1:]
@@ -0,0 +1,102 @@
+import os
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from utils.normalization import normalize_prices
+from utils.profiling import profiled
+
+PARTITIONING = ds.partitioning(pa.schema([('year', pa.int32())]), flavor='hive')
+
+def _year_table(df):
+    table = pa.Table.from_pandas(df.rename_axis('Date').reset_index(), preserve_index=False)
+    return table.append_column('year', pa.array(df.index.year.to_numpy(), type=pa.int32()))
+
+def write_partitioned_dataset(df, root):
+    """Write prices as one Parquet directory per year (year=2021/...), replacing any previous dataset."""
+    tmp_root = root + '.tmp'
+    shutil.rmtree(tmp_root, ignore_errors=True)
+    ds.write_dataset(_year_table(df), tmp_root, format='parquet', partitioning=PARTITIONING)
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(tmp_root, root)
+
+def append_partition_rows(df, root, name):
+    # new files next to the existing ones in each year directory, nothing already written is touched
+    ds.write_dataset(_year_table(df), root, format='parquet', partitioning=PARTITIONING,
+                     basename_template=f"{name}-{{i}}.parquet", existing_data_behavior='overwrite_or_ignore')
+
+def open_dataset(root):
+    return ds.dataset(root, format='parquet', partitioning=PARTITIONING)
+
+def dataset_version(root):
+    # newest mtime plus total size of every file in the dataset
+    latest, total = 0, 0
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            stat = os.stat(os.path.join(dirpath, name))
+            latest = max(latest, stat.st_mtime_ns)
+            total += stat.st_size
+    return f"{latest}-{total}"
+
+def list_assets(root):
+    return [name for name in open_dataset(root).schema.names if name.endswith('_Price')]
+
+def list_years(root):
+    # partition values come straight from the directory names, no data is read
+    return sorted(int(name.split('=', 1)[1]) for name in os.listdir(root) if name.startswith('year='))
+
+@profiled
+def read_prices(root, columns=None, start=None, end=None):
+    """Read only the requested columns and dates, pruning year partitions and row groups on the way."""
+    dataset = open_dataset(root)
+    columns = list_assets(root) if columns is None else list(columns)
+
+    condition = None
+    if start is not None:
+        start = pd.Timestamp(start)
+        condition = (ds.field('year') >= start.year) & (ds.field('Date') >= start)
+    if end is not None:
+        end = pd.Timestamp(end)
+        upper = (ds.field('year') <= end.year) & (ds.field('Date') <= end)
+        condition = upper if condition is None else condition & upper
+
+    table = dataset.to_table(columns=['Date'] + columns, filter=condition)
+    df = table.to_pandas().set_index('Date').sort_index()
+    df.index = pd.DatetimeIndex(df.index, name='Date')
+    return df
+
+def date_bounds(root):
+    # only the Date column is read; the first row is the base row that normalization drops
+    dates = open_dataset(root).to_table(columns=['Date']).column('Date').to_pandas().sort_values()
+    return pd.Timestamp(dates.iloc[1]), pd.Timestamp(dates.iloc[-1])
+
+def first_row(root, columns):
+    first_year = list_years(root)[0]
+    return read_prices(root, columns, start=f"{first_year}-01-01", end=f"{first_year}-12-31").iloc[:1]
+
+@profiled
+def read_normalized(root, columns, start=None, end=None, window=14, smoothing='sma'):
+    """Same values as slicing normalize_prices() of the full store, but only reads the base row,
+    the requested range and the few rows the rolling window needs before it."""
+    if smoothing != 'sma' or start is None:
+        # EMA carries the whole history, only the end of the range can be pruned
+        norm = normalize_prices(read_prices(root, columns, end=end), window=window, smoothing=smoothing)
+        return norm.loc[start:] if start is not None else norm
+
+    base = first_row(root, columns)
+    start = pd.Timestamp(start)
+    pad = pd.Timedelta(days=2 * window + 10)
+    while True:
+        frame = read_prices(root, columns, start=start - pad, end=end)
+        if frame.empty or frame.index[0] <= base.index[0] or (frame.index < start).sum() >= window - 1:
+            break
+        pad *= 2
+
+    if frame.empty or frame.index[0] <= base.index[0]:
+        return normalize_prices(frame, window=window, smoothing=smoothing).loc[start:]
+
+    # the window never reaches the base row here, so rebasing on it is enough
+    norm = frame.div(base.iloc[0]).mul(100).rolling(window=window, min_periods=1).mean()
+    return norm.loc[start:]
@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+
+try:
+    from scipy.optimize import minimize
+except ImportError:  # without scipy the optimizer picks from the Monte Carlo cloud
+    minimize = None
+
+from utils.portfolio_stats import TRADING_DAYS
+from utils.profiling import profiled
+
+OPTIMIZER_METHODS = ('min_variance', 'max_sharpe', 'target_return')
+
+class OptimizerError(Exception):
+    """SLSQP stopped without converging, its weights are not an optimum."""
+
+def annualized_moments(returns):
+    r = np.asarray(returns, dtype=np.float64)
+    mu = r.mean(axis=0) * TRADING_DAYS
+    cov = np.cov(r, rowvar=False, ddof=1) * TRADING_DAYS
+    return mu, np.atleast_2d(cov)
+
+def portfolio_performance(weights, mu, cov, risk_free=0.0):
+    """Annual return, volatility and Sharpe for a (portfolios x assets) weights matrix in one batch."""
+    w = np.atleast_2d(weights)
+    ret = w @ mu
+    # row-wise w' C w without building a portfolios x portfolios matrix
+    vol = np.sqrt(np.einsum('ij,ij->i', w @ cov, w))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = (ret - risk_free) / vol
+    return ret, vol, sharpe
+
+@profiled
+def random_portfolios(mu, cov, n_portfolios=100_000, chunk_size=20_000, risk_free=0.0, seed=0):
+    """Monte Carlo of long-only portfolios evaluated chunk by chunk.
+
+    Only the per-portfolio metrics are kept for the whole run, plus the
+    weights of the best max-Sharpe and min-variance draws.
+    """
+    rng = np.random.default_rng(seed)
+    n_assets = len(mu)
+    rets = np.empty(n_portfolios)
+    vols = np.empty(n_portfolios)
+    sharpes = np.empty(n_portfolios)
+    best = {'max_sharpe': (-np.inf, None), 'min_variance': (np.inf, None)}
+
+    for start in range(0, n_portfolios, chunk_size):
+        size = min(chunk_size, n_portfolios - start)
+        w = rng.dirichlet(np.ones(n_assets), size=size)
+        ret, vol, sharpe = portfolio_performance(w, mu, cov, risk_free)
+        rets[start:start + size] = ret
+        vols[start:start + size] = vol
+        sharpes[start:start + size] = sharpe
+
+        i = np.nanargmax(sharpe)
+        if sharpe[i] > best['max_sharpe'][0]:
+            best['max_sharpe'] = (sharpe[i], w[i])
+        i = np.argmin(vol)
+        if vol[i] < best['min_variance'][0]:
+            best['min_variance'] = (vol[i], w[i])
+
+    cloud = pd.DataFrame({'Return': rets, 'Volatility': vols, 'Sharpe': sharpes})
+    return cloud, {name: weights for name, (_, weights) in best.items()}
+
+def _solve(objective, n_assets, constraints=()):
+    x0 = np.full(n_assets, 1 / n_assets)
+    result = minimize(
+        objective,
+        x0,
+        method='SLSQP',
+        bounds=[(0, 1)] * n_assets,
+        constraints=[{'type': 'eq', 'fun': lambda w: w.sum() - 1}, *constraints],
+        # the default 1e-6 stops early on variances of ~1e-2, weights could be off by a few tenths of a percent
+        options={'ftol': 1e-10}
+    )
+    if not result.success:
+        raise OptimizerError(f"SLSQP did not converge: {result.message}")
+    w = np.clip(result.x, 0, None)
+    return w / w.sum()
+
+def monte_carlo_weights(best, method, mu, target_return=None):
+    """The Monte Carlo stand-in for optimize_weights(), picked from random_portfolios' best draws."""
+    if method == 'target_return':
+        # only the two extreme draws are kept, use min variance when it already reaches the target
+        reaches = best['min_variance'] @ mu >= target_return
+        return best['min_variance'] if reaches else best['max_sharpe']
+    return best[method]
+
+@profiled
+def optimize_weights(mu, cov, method='max_sharpe', target_return=None, risk_free=0.0, fallback=None):
+    """Long-only, fully invested weights for one optimizer mode.
+
+    fallback is the best-weights dict from random_portfolios, used when scipy is missing.
+    Raises ValueError for a target return above the best asset's, no long-only
+    portfolio reaches it, and OptimizerError when SLSQP does not converge.
+    """
+    if method not in OPTIMIZER_METHODS:
+        raise ValueError(f"method must be one of {OPTIMIZER_METHODS}, got {method!r}")
+    if method == 'target_return' and target_return > mu.max():
+        raise ValueError(f"target return {target_return:.2%} is above the best asset's {mu.max():.2%}")
+    n_assets = len(mu)
+    if n_assets == 1:
+        return np.ones(1)
+
+    if minimize is None:
+        if fallback is None:
+            raise ImportError("scipy is required for the optimizer without a Monte Carlo fallback")
+        return monte_carlo_weights(fallback, method, mu, target_return)
+
+    if method == 'min_variance':
+        return _solve(lambda w: w @ cov @ w, n_assets)
+    if method == 'max_sharpe':
+        return _solve(lambda w: -(w @ mu - risk_free) / np.sqrt(w @ cov @ w), n_assets)
+
+    return _solve(
+        lambda w: w @ cov @ w,
+        n_assets,
+        constraints=[{'type': 'ineq', 'fun': lambda w: w @ mu - target_return}]
+    )
+
+@profiled
+def efficient_frontier(mu, cov, n_points=30):
+    """Minimum volatility for a grid of target returns, from the min-variance portfolio to the best asset."""
+    if minimize is None or len(mu) < 2:
+        return pd.DataFrame(columns=['Return', 'Volatility'])
+    try:
+        w_min = optimize_weights(mu, cov, 'min_variance')
+    except OptimizerError:
+        return pd.DataFrame(columns=['Return', 'Volatility'])
+    weights = []
+    for target in np.linspace(w_min @ mu, mu.max(), n_points):
+        try:
+            weights.append(optimize_weights(mu, cov, 'target_return', target_return=target))
+        except OptimizerError:
+            # a point that did not converge is left out rather than drawn off the frontier
+            continue
+    ret, vol, _ = portfolio_performance(np.array(weights), mu, cov)
+    return pd.DataFrame({'Return': ret, 'Volatility': vol})
@@ -0,0 +1,420 @@
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+from utils.asset_categories import ASSET_CATEGORIES, CATEGORY_CARDS
+from utils.backtest import backtest
+from utils.data_store import get_asset_stats, get_portfolio_frontier, get_rolling_risk, load_prices
+from utils.date_range import get_date_range, slice_range
+from utils.downsampling import decimated_line
+from utils.portfolio_optimizer import OptimizerError, monte_carlo_weights, optimize_weights, portfolio_performance
+from utils.portfolio_stats import category_performance
+from utils.profiling import plotly_chart, profiled_section
+from utils.rolling_risk import RISK_WINDOWS
+
+@profiled_section
+def render_portfolio_page():
+    # stats, risk, optimizer and backtest all follow the sidebar date range
+    start, end = get_date_range()
+    asset_stats = get_asset_stats(benchmark='S&P_500_Price', start=start, end=end)
+
+    st.title("Portofolio Analysis of US Stock Market")
+
+    st.subheader("📊 Detailed Statistical Analysis")
+
+    # Numeric table, formatting only happens in column_config
+    stats_columns = ['Return', 'Risk', 'Sharpe', 'VaR', 'MaxDD', 'Skew', 'Kurt', 'Beta', 'Alpha', 'Corr']
+    stats_df = asset_stats[stats_columns].reset_index()
+    stats_df['Asset'] = stats_df['Asset'].str.replace('_Price', '')
+    st.dataframe(
+        stats_df,
+        use_container_width=True,
+        column_config={
+            "Return": st.column_config.NumberColumn("Return", format="%.1f%%"),
+            "Risk": st.column_config.NumberColumn("Risk", format="%.1f%%"),
+            "Sharpe": st.column_config.NumberColumn("Sharpe", format="%.2f"),
+            "VaR": st.column_config.NumberColumn("VaR", format="%.1f%%"),
+            "MaxDD": st.column_config.NumberColumn("MaxDD", format="%.1f%%"),
+            "Skew": st.column_config.NumberColumn("Skew", format="%.2f"),
+            "Kurt": st.column_config.NumberColumn("Kurt", format="%.1f"),
+            "Beta": st.column_config.NumberColumn("Beta", format="%.2f"),
+            "Alpha": st.column_config.NumberColumn("Alpha", format="%.1f%%"),
+            "Corr": st.column_config.NumberColumn("Corr", format="%.2f")
+        }
+    )
+
+    st.subheader("🏆 Asset Performance Leaderboard")
+
+    # Ranking comes straight from the stats frame, no per-asset lookup
+    leaderboard_df = asset_stats.sort_values('Rank')[['Rank', 'Return', 'Risk', 'Sharpe', 'Category', 'Grade']].reset_index()
+    leaderboard_df['Asset'] = leaderboard_df['Asset'].str.replace('_Price', '')
+    medals = {1: "🥇1", 2: "🥈2", 3: "🥉3"}
+    leaderboard_df['Rank'] = leaderboard_df['Rank'].map(lambda r: medals.get(r, f"{r}"))
+    st.dataframe(
+        leaderboard_df[['Rank', 'Asset', 'Return', 'Risk', 'Sharpe', 'Category', 'Grade']],
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Return": st.column_config.NumberColumn("Return", format="%.1f%%"),
+            "Risk": st.column_config.NumberColumn("Risk", format="%.1f%%"),
+            "Sharpe": st.column_config.NumberColumn("Sharpe", format="%.2f")
+        }
+    )
+
+    st.subheader("📂 Performance by Category")
+
+    col1, col2, col3, col4 = st.columns(4)
+    columns = [col1, col2, col3, col4]
+
+    for i, (category, category_key) in enumerate(CATEGORY_CARDS.items()):
+        category_returns = category_performance(asset_stats, ASSET_CATEGORIES[category_key])
+
+        if len(category_returns) > 0 and i < len(columns):
+            best_asset = category_returns.index[0]
+            best_return = category_returns.iloc[0]
+
+            with columns[i]:
+                st.markdown(f"### {category}")
+                st.metric("Avg", f"{category_returns.mean():.1f}%")
+                st.metric("Best", best_asset.replace('_Price', ''))
+                st.metric("Return", f"{best_return:.1f}%")
+                st.markdown("────────────")
+                
+                # Show top assets in category
+                for asset, return_val in category_returns.head(5).items():
+                    st.write(f"• {asset.replace('_Price', '')} {return_val:+.1f}%")
+
+    st.subheader("📉 Rolling Risk")
+    risk_section(asset_stats)
+
+    st.subheader("🎯 Portfolio Builder")
+    portfolio_builder(asset_stats)
+
+@st.fragment
+@profiled_section
+def risk_section(asset_stats):
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        window_label = st.radio("Risk Window", list(RISK_WINDOWS.keys()), index=1, horizontal=True, key="risk_window")
+    with col2:
+        confidence = st.radio("VaR Confidence", [95, 99], horizontal=True, format_func=lambda c: f"{c}%", key="risk_confidence")
+    with col3:
+        show_bands = st.checkbox("Bootstrap bands (90%)", key="risk_bands")
+
+    # top 3 by rank to start with, any asset can be added
+    default_assets = list(asset_stats.sort_values('Rank').index[:3])
+    risk_assets = st.multiselect(
+        "Assets",
+        options=list(asset_stats.index),
+        default=default_assets,
+        format_func=lambda x: x.replace('_Price', ''),
+        key="risk_assets"
+    )
+    if not risk_assets:
+        st.info("Please select at least one asset")
+        return
+
+    # every asset is computed together and cached, the selection only picks columns
+    start, end = get_date_range()
+    risk = get_rolling_risk(window=RISK_WINDOWS[window_label], alpha=1 - confidence / 100, n_boot=200 if show_bands else 0,
+                            start=start, end=end)
+
+    tab_vol, tab_var, tab_dd = st.tabs(["Volatility", "VaR / CVaR", "Drawdown"])
+    with tab_vol:
+        fig = decimated_line(risk['volatility'][risk_assets], title=f"Rolling Volatility ({window_label})",
+                             labels={'value': 'Annualized Volatility (%)', 'variable': 'Asset'})
+        if show_bands:
+            risk_bands(fig, risk['volatility_low'][risk_assets], risk['volatility_high'][risk_assets])
+        fig.update_layout(xaxis_title="Date", yaxis_title="Annualized Volatility (%)", height=450)
+        plotly_chart(fig, use_container_width=True)
+
+    with tab_var:
+        var_cvar = pd.concat(
+            [risk['var'][risk_assets].add_suffix(' VaR'), risk['cvar'][risk_assets].add_suffix(' CVaR')],
+            axis=1
+        )
+        fig = decimated_line(var_cvar, title=f"Rolling {confidence}% Historical VaR / CVaR ({window_label})",
+                             labels={'value': 'Daily Return (%)', 'variable': 'Measure'})
+        if show_bands:
+            risk_bands(fig, risk['var_low'][risk_assets], risk['var_high'][risk_assets])
+        fig.update_layout(xaxis_title="Date", yaxis_title="Daily Return (%)", height=450)
+        plotly_chart(fig, use_container_width=True)
+
+    with tab_dd:
+        fig = decimated_line(risk['drawdown'][risk_assets], title="Drawdown from Running Peak",
+                             labels={'value': 'Drawdown (%)', 'variable': 'Asset'})
+        fig.update_layout(xaxis_title="Date", yaxis_title="Drawdown (%)", height=450)
+        plotly_chart(fig, use_container_width=True)
+
+    latest = pd.DataFrame({
+        'Asset': [asset.replace('_Price', '') for asset in risk_assets],
+        'Volatility': risk['volatility'][risk_assets].iloc[-1].to_numpy(),
+        'VaR': risk['var'][risk_assets].iloc[-1].to_numpy(),
+        'CVaR': risk['cvar'][risk_assets].iloc[-1].to_numpy(),
+        'Drawdown': risk['drawdown'][risk_assets].iloc[-1].to_numpy()
+    })
+    st.dataframe(
+        latest,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Volatility": st.column_config.NumberColumn("Volatility", format="%.1f%%"),
+            "VaR": st.column_config.NumberColumn(f"VaR {confidence}%", format="%.2f%%"),
+            "CVaR": st.column_config.NumberColumn(f"CVaR {confidence}%", format="%.2f%%"),
+            "Drawdown": st.column_config.NumberColumn("Drawdown", format="%.1f%%")
+        }
+    )
+
+def risk_bands(fig, low, high):
+    # one shaded band per asset, drawn under the lines
+    for asset in low.columns:
+        fig.add_trace(go.Scatter(x=high.index, y=high[asset], mode='lines', line=dict(width=0),
+                                 showlegend=False, hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=low.index, y=low[asset], mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor='rgba(128, 128, 128, 0.2)', name=f"{asset.replace('_Price', '')} 90% band",
+                                 hoverinfo='skip'))
+
+# Checkbox and input changes only rerun the builder, not the tables above
+@st.fragment
+@profiled_section
+def portfolio_builder(asset_stats):
+    # Control panel in header style
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        investment_year = st.selectbox("Investment Year", sorted(slice_range(load_prices(), *get_date_range()).index.year.unique()))
+    with col2:
+        total_investment = st.number_input("Total Investment ($)", min_value=100, value=1200, step=100)
+    with col3:
+        allocation_method = st.selectbox(
+            "Allocation Method",
+            ["Return Weighted", "Max Sharpe", "Min Variance", "Target Return"],
+            key="allocation_method"
+        )
+    with col4:
+        if allocation_method == "Target Return":
+            target_return = st.number_input("Target Annual Return (%)", value=30.0, step=5.0) / 100
+        else:
+            target_return = None
+            st.write("") # spacer
+
+    st.markdown("**Select Assets for Portfolio:**")
+
+    # Asset selection with checkboxes in grid
+    assets_per_row = 4
+    available_assets = asset_stats.index.tolist()
+    selected_assets = []
+
+    for i in range(0, len(available_assets), assets_per_row):
+        cols = st.columns(assets_per_row)
+        for j, col in enumerate(cols):
+            if i + j < len(available_assets):
+                asset = available_assets[i + j]
+                with col:
+                    if st.checkbox(asset.replace('_Price', ''), key=f"portfolio_{asset}"):
+                        selected_assets.append(asset)
+
+    if selected_assets:
+        st.session_state.portfolio_assets = selected_assets
+        st.session_state.portfolio_investment = total_investment
+        st.success(f"✅ Portfolio built with {len(selected_assets)} assets!")
+
+    if 'portfolio_assets' in st.session_state and st.session_state.portfolio_assets:
+        st.subheader("Portfolio Allocation")
+        
+        portfolio_assets = st.session_state.portfolio_assets
+        total_investment = st.session_state.portfolio_investment
+        
+        portfolio_returns = asset_stats.loc[portfolio_assets, 'Return']
+
+        if allocation_method == "Return Weighted":
+            # Calculate allocation based on positive returns
+            allocation_data = [
+                {'Asset': asset.replace('_Price', ''), 'Key': asset, 'Return': total_return}
+                for asset, total_return in portfolio_returns.items()
+                if total_return > 0  # Only positive returns for allocation
+            ]
+            allocation_df = pd.DataFrame(allocation_data)
+            if allocation_data:
+                allocation_df['Weight'] = allocation_df['Return'] / allocation_df['Return'].sum()
+        else:
+            weights = optimized_allocation(portfolio_assets, allocation_method, target_return)
+            if weights is None:
+                return
+            allocation_df = pd.DataFrame({
+                'Asset': [asset.replace('_Price', '') for asset in portfolio_assets],
+                'Key': portfolio_assets,
+                'Return': portfolio_returns.to_numpy(),
+                'Weight': weights
+            })
+            # drop assets the optimizer left out
+            allocation_df = allocation_df[allocation_df['Weight'] > 1e-4]
+        
+        if len(allocation_df) > 0:
+            allocation_df['Amount'] = allocation_df['Weight'] * total_investment
+            
+            # Two-column layout for pie chart and table
+            col1, col2 = st.columns([2,1])
+            
+            with col1:
+                # Interactive donut chart
+                fig = px.pie(
+                    allocation_df, 
+                    values='Weight', 
+                    names='Asset',
+                    title="Portfolio Allocation",
+                    color_discrete_sequence=px.colors.qualitative.T10
+                )
+                fig.update_traces(
+                    textposition='inside', 
+                    textinfo='percent+label',
+                    textfont_size=16
+                )
+
+                fig.update_layout(
+                    height=800,  # Pixel height
+                    width=800    # Pixel width
+                )
+                plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                st.markdown("**Allocation Table**")
+                
+                # Format table data
+                table_data = allocation_df.copy()
+                table_data['Weight'] = (table_data['Weight'] * 100).round(1).astype(str) + '%'
+                table_data['Amount'] = '$' + table_data['Amount'].round(0).astype(int).astype(str)
+                table_data['Return'] = table_data['Return'].round(1).astype(str) + '%'
+                
+                # Display formatted table
+                st.dataframe(
+                    table_data[['Asset', 'Weight', 'Amount', 'Return']], 
+                    use_container_width=True, 
+                    hide_index=True,
+                    column_config={
+                        "Asset": "Asset",
+                        "Weight": "Weight",
+                        "Amount": "Amount", 
+                        "Return": "Expected Return"
+                    }
+                )
+
+            backtest_section(allocation_df, portfolio_assets, investment_year, total_investment)
+        else:
+            st.warning("No assets with positive returns selected for allocation.")
+
+OPTIMIZER_MODES = {"Max Sharpe": 'max_sharpe', "Min Variance": 'min_variance', "Target Return": 'target_return'}
+
+def optimized_allocation(portfolio_assets, allocation_method, target_return):
+    start, end = get_date_range()
+    mu, cov, cloud, best, frontier = get_portfolio_frontier(portfolio_assets, start=start, end=end)
+    method = OPTIMIZER_MODES[allocation_method]
+    if method == 'target_return' and target_return > mu.max():
+        st.warning(f"No long-only portfolio reaches {target_return * 100:.1f}% a year, "
+                   f"the best selected asset returns {mu.max() * 100:.1f}%. Lower the target.")
+        return None
+    try:
+        weights = optimize_weights(mu, cov, method, target_return=target_return, fallback=best)
+    except OptimizerError:
+        st.warning("The optimizer did not converge, showing the best Monte Carlo portfolio instead.")
+        weights = monte_carlo_weights(best, method, mu, target_return)
+    ret, vol, sharpe = portfolio_performance(weights, mu, cov)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Expected Annual Return", f"{ret[0] * 100:.1f}%")
+    with col2:
+        st.metric("Annual Volatility", f"{vol[0] * 100:.1f}%")
+    with col3:
+        st.metric("Sharpe Ratio", f"{sharpe[0]:.2f}")
+
+    frontier_plot(cloud, frontier, ret[0], vol[0], allocation_method)
+    return weights
+
+def frontier_plot(cloud, frontier, ret, vol, allocation_method, max_points=5000):
+    # the full Monte Carlo cloud is only needed for the optimum, a sample is enough to draw it
+    sample = cloud.sample(min(max_points, len(cloud)), random_state=0)
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(
+        x=sample['Volatility'] * 100,
+        y=sample['Return'] * 100,
+        mode='markers',
+        marker=dict(size=4, color=sample['Sharpe'], colorscale='Viridis', showscale=True, colorbar=dict(title="Sharpe")),
+        name=f"{len(cloud):,} Random Portfolios",
+        hovertemplate='Risk %{x:.1f}%<br>Return %{y:.1f}%<extra></extra>'
+    ))
+    if len(frontier) > 0:
+        fig.add_trace(go.Scatter(
+            x=frontier['Volatility'] * 100,
+            y=frontier['Return'] * 100,
+            mode='lines',
+            line=dict(color='#FF6B6B', width=3),
+            name="Efficient Frontier"
+        ))
+    fig.add_trace(go.Scatter(
+        x=[vol * 100],
+        y=[ret * 100],
+        mode='markers',
+        marker=dict(size=16, symbol='star', color='gold', line=dict(width=1, color='black')),
+        name=allocation_method
+    ))
+    fig.update_layout(
+        title="Efficient Frontier",
+        xaxis_title="Annual Volatility (%)",
+        yaxis_title="Expected Annual Return (%)",
+        height=500
+    )
+    plotly_chart(fig, use_container_width=True)
+
+@profiled_section
+def backtest_section(allocation_df, portfolio_assets, investment_year, total_investment):
+    st.subheader(f"📈 Backtest from {investment_year}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        rebalance = st.selectbox("Rebalancing", ["none", "monthly", "quarterly"], format_func=str.title, key="backtest_rebalance")
+    with col2:
+        cost_bps = st.number_input("Transaction Cost (bps)", min_value=0.0, value=10.0, step=5.0, key="backtest_cost")
+
+    # every candidate is one row of the weights matrix, all simulated in a single call
+    candidates = pd.DataFrame(0.0, index=["Selected Allocation", "Equal Weight"], columns=portfolio_assets)
+    candidates.loc["Selected Allocation", allocation_df['Key']] = allocation_df['Weight'].to_numpy()
+    candidates.loc["Equal Weight"] = 1 / len(portfolio_assets)
+    for asset in portfolio_assets:
+        candidates.loc[f"100% {asset.replace('_Price', '')}"] = 0.0
+        candidates.loc[f"100% {asset.replace('_Price', '')}", asset] = 1.0
+
+    # start at the later of the investment year and the date range, stop at the end of the range
+    range_start, range_end = get_date_range()
+    start = max(pd.Timestamp(f"{investment_year}-01-01"), range_start or pd.Timestamp.min)
+    equity, drawdown, stats = backtest(
+        slice_range(load_prices(), end=range_end),
+        candidates,
+        start=start,
+        rebalance=rebalance,
+        cost_bps=cost_bps,
+        initial=total_investment
+    )
+
+    fig = decimated_line(equity, title="Equity Curve", labels={'value': 'Portfolio Value ($)', 'variable': 'Portfolio'})
+    fig.update_layout(xaxis_title="Date", yaxis_title="Portfolio Value ($)", legend_title="Portfolio", height=500)
+    plotly_chart(fig, use_container_width=True)
+
+    fig = decimated_line(drawdown * 100, title="Drawdown", labels={'value': 'Drawdown (%)', 'variable': 'Portfolio'})
+    fig.update_layout(xaxis_title="Date", yaxis_title="Drawdown (%)", legend_title="Portfolio", height=400)
+    plotly_chart(fig, use_container_width=True)
+
+    st.dataframe(
+        stats,
+        use_container_width=True,
+        column_config={
+            "Final Value": st.column_config.NumberColumn("Final Value", format="$%.0f"),
+            "Total Return": st.column_config.NumberColumn("Total Return", format="%.1f%%"),
+            "CAGR": st.column_config.NumberColumn("CAGR", format="%.1f%%"),
+            "Volatility": st.column_config.NumberColumn("Volatility", format="%.1f%%"),
+            "Sharpe": st.column_config.NumberColumn("Sharpe", format="%.2f"),
+            "Max Drawdown": st.column_config.NumberColumn("Max Drawdown", format="%.1f%%"),
+            "Costs": st.column_config.NumberColumn("Costs", format="$%.2f")
+        }
+    )
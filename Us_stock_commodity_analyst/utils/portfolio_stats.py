@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from utils.asset_categories import ASSET_TO_CATEGORY, CATEGORY_LABELS
+from utils.profiling import profiled
+
+TRADING_DAYS = 252
+
+GRADE_BINS = [-np.inf, -10, 0, 20, 40, 60, 80, np.inf]
+GRADE_LABELS = ['D-', 'C', 'B', 'B+', 'A-', 'A', 'A+']
+
+@profiled
+def compute_asset_stats(df, benchmark='S&P_500_Price'):
+    """Return one numeric row of performance and risk metrics per asset in df."""
+    prices = df.to_numpy(dtype=np.float64)
+    returns = df.pct_change().iloc[1:]
+    r = returns.to_numpy(dtype=np.float64)
+    n = len(r)
+
+    mean = r.mean(axis=0)
+    std = r.std(axis=0, ddof=1)
+    centered = r - mean
+
+    stats = pd.DataFrame(index=df.columns)
+    stats['Return'] = (prices[-1] / prices[0] - 1) * 100
+    stats['Risk'] = std * np.sqrt(TRADING_DAYS) * 100
+    stats['Sharpe'] = (mean * TRADING_DAYS) / (std * np.sqrt(TRADING_DAYS))
+    stats['VaR'] = np.percentile(r, 5, axis=0) * 100
+    stats['MaxDD'] = (prices / np.maximum.accumulate(prices, axis=0) - 1).min(axis=0) * 100
+    stats['Skew'] = returns.skew().to_numpy()
+    stats['Kurt'] = returns.kurtosis().to_numpy()
+
+    if benchmark in df.columns:
+        b = df.columns.get_loc(benchmark)
+        # covariance of every asset with the benchmark as a single matrix-vector product
+        cov_b = centered.T @ centered[:, b] / (n - 1)
+        beta = cov_b / std[b] ** 2
+        stats['Beta'] = beta
+        stats['Alpha'] = (mean - beta * mean[b]) * TRADING_DAYS * 100
+        stats['Corr'] = cov_b / (std * std[b])
+    else:
+        stats['Beta'] = np.nan
+        stats['Alpha'] = np.nan
+        stats['Corr'] = np.nan
+
+    return label_stats(stats)
+
+def label_stats(stats):
+    """Add Category, Grade and Rank to a numeric stats frame indexed by asset."""
+    stats['Category'] = [CATEGORY_LABELS.get(ASSET_TO_CATEGORY.get(asset), 'Other') for asset in stats.index]
+    stats['Grade'] = pd.cut(stats['Return'], bins=GRADE_BINS, labels=GRADE_LABELS, right=False).astype(str)
+    stats['Rank'] = stats['Return'].rank(ascending=False, method='first').astype(int)
+
+    # the index can be the caller's columns object, name a copy rather than renaming it in place
+    return stats.rename_axis('Asset')
+
+def category_performance(stats, assets):
+    available = [asset for asset in assets if asset in stats.index]
+    return stats.loc[available, 'Return'].sort_values(ascending=False)
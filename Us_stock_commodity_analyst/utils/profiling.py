@@ -0,0 +1,245 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import pandas as pd
+
+# US_STOCK_PROFILE=1 turns the panel on by default, US_STOCK_PROFILE_LOG appends every profiled rerun as a JSON line
+PROFILE_DEFAULT = os.environ.get('US_STOCK_PROFILE', '0').lower() in ('1', 'true', 'yes')
+PROFILE_LOG = os.environ.get('US_STOCK_PROFILE_LOG')
+# tracemalloc is process-wide: it slows down every session and sees every thread's allocations,
+# so the memory columns are a development option, set US_STOCK_PROFILE_MEMORY=1 to enable them
+PROFILE_MEMORY = os.environ.get('US_STOCK_PROFILE_MEMORY', '0').lower() in ('1', 'true', 'yes')
+
+# every session runs its script in its own thread, so the active profile is per thread
+_local = threading.local()
+# only one profiled run at a time may trace memory, reset_peak() of another would corrupt its peaks
+_memory_owner = threading.Lock()
+_tracing_started = False
+
+class RerunProfile:
+    """Timings, allocations and figure payloads recorded during one script run."""
+
+    def __init__(self, label):
+        self.label = label
+        self.records = []
+        self.stack = []
+        self.started = time.perf_counter()
+        self.total_ms = 0.0
+        self.memory = False
+
+    def frame(self):
+        """One row per section name: call count, wall time, net allocation, peak and figure payload."""
+        columns = {'Wall ms': ('wall_ms', 'sum'), 'Payload KB': ('payload_kb', 'sum')}
+        if self.memory:
+            columns = {'Wall ms': ('wall_ms', 'sum'), 'Alloc MB': ('alloc_mb', 'sum'),
+                       'Peak MB': ('peak_mb', 'max'), 'Payload KB': ('payload_kb', 'sum')}
+        if not self.records:
+            return pd.DataFrame(columns=['Section', 'Calls'] + list(columns))
+        df = pd.DataFrame(self.records)
+        summary = df.groupby('Section', sort=False).agg(Calls=('wall_ms', 'size'), **columns)
+        return summary.sort_values('Wall ms', ascending=False).reset_index()
+
+def active_profile():
+    return getattr(_local, 'profile', None)
+
+def _start_tracing():
+    """Claim memory tracing for the calling run, False when it is off or another run already holds it."""
+    global _tracing_started
+    if not PROFILE_MEMORY or not _memory_owner.acquire(blocking=False):
+        return False
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _tracing_started = True
+    return True
+
+def _stop_tracing():
+    global _tracing_started
+    # leave tracemalloc alone if someone else started it
+    if _tracing_started:
+        tracemalloc.stop()
+        _tracing_started = False
+    _memory_owner.release()
+
+@contextmanager
+def rerun_profile(enabled, label=''):
+    """Collect every profiled section of this run; yields the profile, or None when disabled."""
+    if not enabled:
+        yield None
+        return
+    profile = RerunProfile(label)
+    _local.profile = profile
+    profile.memory = _start_tracing()
+    try:
+        yield profile
+    finally:
+        profile.total_ms = (time.perf_counter() - profile.started) * 1000
+        _local.profile = None
+        if profile.memory:
+            _stop_tracing()
+        if PROFILE_LOG:
+            write_log(profile, PROFILE_LOG)
+
+@contextmanager
+def profile_section(name, payload_bytes=0):
+    """Time a block and record it on the active profile, a plain no-op when nothing is being profiled."""
+    profile = active_profile()
+    if profile is None:
+        yield
+        return
+    if not profile.memory:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            profile.records.append({
+                'Section': name,
+                'depth': len(profile.stack),
+                'wall_ms': (time.perf_counter() - start) * 1000,
+                'payload_kb': payload_bytes / 1e3
+            })
+        return
+
+    start_mem = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    # the absolute peak of nested sections is handed up, reset_peak() would otherwise hide it from the parent
+    frame = {'child_peak': 0}
+    profile.stack.append(frame)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        wall_ms = (time.perf_counter() - start) * 1000
+        current, peak = tracemalloc.get_traced_memory()
+        peak = max(peak, frame['child_peak'])
+        profile.stack.pop()
+        if profile.stack:
+            parent = profile.stack[-1]
+            parent['child_peak'] = max(parent['child_peak'], peak)
+        profile.records.append({
+            'Section': name,
+            'depth': len(profile.stack),
+            'wall_ms': wall_ms,
+            'alloc_mb': (current - start_mem) / 1e6,
+            'peak_mb': (peak - start_mem) / 1e6,
+            'payload_kb': payload_bytes / 1e3
+        })
+
+def profiled(func=None, name=None):
+    """Decorator form of profile_section, named module.function unless a name is given."""
+    if func is None:
+        return functools.partial(profiled, name=name)
+    section = name or f"{func.__module__.removeprefix('utils.')}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if active_profile() is None:
+            return func(*args, **kwargs)
+        with profile_section(section):
+            return func(*args, **kwargs)
+    return wrapper
+
+def profiled_section(func):
+    """profiled() for page sections; a fragment rerun has no page-level profile, so it opens its own."""
+    section = f"{func.__module__.removeprefix('utils.')}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if active_profile() is not None:
+            with profile_section(section):
+                return func(*args, **kwargs)
+
+        import streamlit as st
+        if not st.session_state.get('profile_reruns', PROFILE_DEFAULT):
+            return func(*args, **kwargs)
+        with rerun_profile(True, label=section) as profile:
+            with profile_section(section):
+                result = func(*args, **kwargs)
+        # shown by the sidebar panel on the next full rerun
+        st.session_state.last_fragment_profile = profile
+        return result
+    return wrapper
+
+def _json_size(value):
+    # numeric arrays go out base64 encoded, anything else as quoted text
+    if hasattr(value, 'dtype') and value.dtype.kind in 'biuf':
+        return value.nbytes * 4 // 3 + 40
+    if isinstance(value, dict):
+        return sum(len(key) + 4 + _json_size(item) for key, item in value.items())
+    if hasattr(value, 'dtype') and value.dtype.kind == 'M':
+        return len(value) * 22
+    if isinstance(value, (list, tuple)) or hasattr(value, 'dtype'):
+        return sum(_json_size(item) + 1 for item in value) + 2
+    return len(str(value)) + 2
+
+def figure_payload_bytes(figure):
+    """Approximate JSON size of a plotly figure, worked out from its arrays instead of serializing it again."""
+    if not hasattr(figure, 'data'):
+        return 0
+    return sum(_json_size(trace.to_plotly_json()) for trace in figure.data) + _json_size(figure.layout.to_plotly_json())
+
+def plotly_chart(figure, *args, **kwargs):
+    """st.plotly_chart for the project's charts, profiled runs also record the render time and payload size.
+
+    Streamlit serializes the figure inside st.plotly_chart, which the section times;
+    the payload is estimated from the figure so it is not serialized twice.
+    """
+    import streamlit as st
+
+    if active_profile() is None:
+        return st.plotly_chart(figure, *args, **kwargs)
+    with profile_section('st.plotly_chart', payload_bytes=figure_payload_bytes(figure)):
+        return st.plotly_chart(figure, *args, **kwargs)
+
+def write_log(profile, path):
+    entry = {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'label': profile.label,
+        'total_ms': round(profile.total_ms, 3),
+        'sections': profile.records
+    }
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+def _profile_table(profile):
+    import streamlit as st
+
+    st.dataframe(
+        profile.frame(),
+        hide_index=True,
+        column_config={
+            "Wall ms": st.column_config.NumberColumn("Wall ms", format="%.1f"),
+            "Alloc MB": st.column_config.NumberColumn("Alloc MB", format="%.2f"),
+            "Peak MB": st.column_config.NumberColumn("Peak MB", format="%.2f"),
+            "Payload KB": st.column_config.NumberColumn("Payload KB", format="%.1f")
+        }
+    )
+
+def render_profile_panel(profile, container):
+    import streamlit as st
+
+    with container.expander("Profiler", expanded=True):
+        st.metric("Rerun wall time", f"{profile.total_ms:.0f} ms")
+        _profile_table(profile)
+
+        fragment_profile = st.session_state.get('last_fragment_profile')
+        if fragment_profile is not None:
+            st.write(f"Last fragment rerun: {fragment_profile.label} ({fragment_profile.total_ms:.0f} ms)")
+            _profile_table(fragment_profile)
+
+        if profile.memory:
+            st.caption("Alloc/Peak come from tracemalloc, which is process-wide: "
+                       "allocations of other sessions running at the same time are counted too")
+        elif PROFILE_MEMORY:
+            st.caption("No memory columns for this rerun, another session was tracing memory")
+        else:
+            st.caption("Memory columns are off, set US_STOCK_PROFILE_MEMORY=1 to trace allocations (development only)")
+
+        st.caption("Payload KB is estimated from each figure's arrays, the figures are not serialized a second time")
+        if PROFILE_LOG:
+            st.caption(f"Appending to {PROFILE_LOG}")
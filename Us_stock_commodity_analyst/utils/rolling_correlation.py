@@ -0,0 +1,51 @@
+import numpy as np
+
+from utils.profiling import profiled
+
+@profiled
+def rolling_correlation(data, window=None, min_periods=None, step=1):
+    """Correlation matrix at every step-th row of data, updated with running sums.
+
+    With window=None the window is expanding. Returns the row positions and a
+    float32 array shaped (positions, assets, assets); positions before
+    min_periods are NaN.
+    """
+    x = np.asarray(data, dtype=np.float64)
+    n_rows, n_assets = x.shape
+    if min_periods is None:
+        min_periods = window if window is not None else 2
+    min_periods = max(min_periods, 2)
+
+    positions = np.arange(step - 1, n_rows, step)
+    out = np.full((len(positions), n_assets, n_assets), np.nan, dtype=np.float32)
+
+    # shift by the first row so the running sums stay well conditioned
+    x = x - x[0]
+
+    count = 0
+    s = np.zeros(n_assets)
+    sxy = np.zeros((n_assets, n_assets))
+
+    for t in range(n_rows):
+        row = x[t]
+        s += row
+        sxy += np.outer(row, row)
+        count += 1
+
+        if window is not None and count > window:
+            old = x[t - window]
+            s -= old
+            sxy -= np.outer(old, old)
+            count -= 1
+
+        if count < min_periods or (t + 1) % step:
+            continue
+
+        cov = sxy - np.outer(s, s) / count
+        var = np.clip(np.diag(cov), 0, None)
+        denom = np.sqrt(np.outer(var, var))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = np.where(denom > 0, cov / denom, np.nan)
+        out[t // step] = np.clip(corr, -1, 1)
+
+    return positions, out
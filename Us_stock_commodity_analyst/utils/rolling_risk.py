@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from utils.portfolio_stats import TRADING_DAYS
+from utils.profiling import profiled
+
+RISK_WINDOWS = {"1 Month": 21, "3 Months": 63, "6 Months": 126, "1 Year": 252}
+# cap on the number of float64 values one partition chunk materializes (~64 MB)
+CHUNK_VALUES = 8_000_000
+
+def _check_window(n_rows, window):
+    if not 2 <= window <= n_rows:
+        raise ValueError(f"window must be between 2 and the {n_rows} rows of returns, got {window}")
+
+def _missing_in_window(returns, window):
+    """True for every window (ending at each row from window-1 on) that holds a missing return."""
+    missing = np.concatenate([np.zeros((1, returns.shape[1])), np.cumsum(np.isnan(returns), axis=0)])
+    return (missing[window:] - missing[:-window]) > 0
+
+def rolling_volatility(returns, window):
+    """Annualized rolling standard deviation of every column from running sums, O(n) per asset.
+
+    Like every measure here, a window with a missing return is NaN (pandas rolling() does the same).
+    """
+    _check_window(len(returns), window)
+    r = np.nan_to_num(returns, nan=0.0)
+    zeros = np.zeros((1, r.shape[1]))
+    s1 = np.concatenate([zeros, np.cumsum(r, axis=0)])
+    s2 = np.concatenate([zeros, np.cumsum(r * r, axis=0)])
+    sum1 = s1[window:] - s1[:-window]
+    sum2 = s2[window:] - s2[:-window]
+    var = (sum2 - sum1 * sum1 / window) / (window - 1)
+    # running sums can leave a tiny negative instead of zero on flat windows
+    vol = np.sqrt(np.maximum(var, 0.0)) * np.sqrt(TRADING_DAYS)
+    vol[_missing_in_window(returns, window)] = np.nan
+    return vol
+
+def _quantile_positions(window, alpha):
+    # same linear interpolation as np.percentile
+    position = alpha * (window - 1)
+    lo = int(np.floor(position))
+    return lo, min(lo + 1, window - 1), position - lo
+
+def _tail_stats(windows, alpha):
+    """VaR and CVaR along the last axis with one partial sort per window instead of a full sort."""
+    lo, hi, frac = _quantile_positions(windows.shape[-1], alpha)
+    part = np.partition(windows, [lo, hi], axis=-1)
+    var = part[..., lo] + (part[..., hi] - part[..., lo]) * frac
+    # after the partition the first lo+1 values are the returns at or below VaR
+    cvar = part[..., :lo + 1].mean(axis=-1)
+    return var, cvar
+
+def rolling_var(returns, window, alpha=0.05):
+    """Historical VaR and CVaR (returns, negative is a loss) for every window ending at each row, NaN for windows with gaps."""
+    _check_window(len(returns), window)
+    views = sliding_window_view(returns, window, axis=0)   # (n - window + 1, assets, window), no copy
+    chunk = max(1, CHUNK_VALUES // (views.shape[1] * window))
+    var = np.empty(views.shape[:2])
+    cvar = np.empty(views.shape[:2])
+    for start in range(0, len(views), chunk):
+        # np.partition copies, so only a bounded block of windows is materialized at a time
+        var[start:start + chunk], cvar[start:start + chunk] = _tail_stats(views[start:start + chunk], alpha)
+    # np.partition moves NaN to the end, the ranks would then skip it while the window still counts it
+    missing = _missing_in_window(returns, window)
+    var[missing] = np.nan
+    cvar[missing] = np.nan
+    return var, cvar
+
+def running_drawdown(prices):
+    return prices / np.fmax.accumulate(prices, axis=0) - 1
+
+def bootstrap_bands(returns, window, alpha=0.05, n_boot=200, ci=0.9, step=5, seed=0):
+    """Percentile bootstrap bands for rolling VaR and volatility at every step-th window.
+
+    The same B x window resampling indices are applied to every window and asset,
+    so each block of windows is resampled with a single fancy-indexing gather.
+    """
+    _check_window(len(returns), window)
+    views = sliding_window_view(returns, window, axis=0)[::step]
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, window, size=(n_boot, window))
+    tails = ((1 - ci) / 2 * 100, (1 + ci) / 2 * 100)
+
+    n_windows, n_assets = views.shape[:2]
+    var_bands = np.empty((2, n_windows, n_assets))
+    vol_bands = np.empty((2, n_windows, n_assets))
+    chunk = max(1, CHUNK_VALUES // (n_assets * n_boot * window))
+    for start in range(0, n_windows, chunk):
+        samples = views[start:start + chunk][:, :, idx]   # (chunk, assets, n_boot, window)
+        var, _ = _tail_stats(samples, alpha)
+        vol = samples.std(axis=-1, ddof=1) * np.sqrt(TRADING_DAYS)
+        var_bands[:, start:start + chunk] = np.percentile(var, tails, axis=-1)
+        vol_bands[:, start:start + chunk] = np.percentile(vol, tails, axis=-1)
+
+    positions = np.arange(0, len(returns) - window + 1, step) + window - 1
+    missing = _missing_in_window(returns, window)[::step]
+    var_bands[:, missing] = np.nan
+    vol_bands[:, missing] = np.nan
+    return positions, var_bands, vol_bands
+
+@profiled
+def rolling_risk(prices, window=63, alpha=0.05, n_boot=0, ci=0.9, step=5, seed=0):
+    """Rolling volatility, VaR, CVaR and running drawdown for every asset in one pass.
+
+    Returns a dict of frames indexed by date with one column per asset; VaR/CVaR are
+    daily returns in percent and volatility is annualized percent. With n_boot > 0 the
+    dict also holds lower/upper bootstrap bands for VaR and volatility every step rows.
+    A window with a missing return is NaN in every measure. Raises ValueError when
+    window is longer than the returns.
+    """
+    returns = prices.pct_change().iloc[1:]
+    r = returns.to_numpy(dtype=np.float64)
+    dates = returns.index[window - 1:]
+    columns = prices.columns
+
+    var, cvar = rolling_var(r, window, alpha)
+    risk = {
+        'volatility': pd.DataFrame(rolling_volatility(r, window) * 100, index=dates, columns=columns),
+        'var': pd.DataFrame(var * 100, index=dates, columns=columns),
+        'cvar': pd.DataFrame(cvar * 100, index=dates, columns=columns),
+        'drawdown': pd.DataFrame(running_drawdown(prices.to_numpy(dtype=np.float64)) * 100, index=prices.index, columns=columns)
+    }
+
+    if n_boot > 0:
+        positions, var_bands, vol_bands = bootstrap_bands(r, window, alpha, n_boot, ci, step, seed)
+        band_dates = returns.index[positions]
+        for name, bands in (('var', var_bands * 100), ('volatility', vol_bands * 100)):
+            risk[f'{name}_low'] = pd.DataFrame(bands[0], index=band_dates, columns=columns)
+            risk[f'{name}_high'] = pd.DataFrame(bands[1], index=band_dates, columns=columns)
+    return risk
@@ -0,0 +1,83 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+STAT_COLUMNS = ['start', 'end', 'high', 'low', 'mean', 'count', 'std', 'change']
+
+def _aggregate(norm_df, keys, names):
+    grouped = norm_df.groupby(keys)
+    stats = {
+        'start': grouped.first(),
+        'end': grouped.last(),
+        'high': grouped.max(),
+        'low': grouped.min(),
+        'mean': grouped.mean(),
+        'count': grouped.count(),
+        'std': grouped.std(),
+        'high_date': grouped.idxmax(),
+        'low_date': grouped.idxmin()
+    }
+    groups = stats['start'].index
+    assets = norm_df.columns
+
+    # lay every (group x asset) block out as asset-major rows: (asset, *group)
+    levels = [np.repeat(assets.to_numpy(), len(groups))]
+    if isinstance(groups, pd.MultiIndex):
+        levels += [np.tile(groups.get_level_values(i).to_numpy(), len(assets)) for i in range(groups.nlevels)]
+    else:
+        levels.append(np.tile(groups.to_numpy(), len(assets)))
+    index = pd.MultiIndex.from_arrays(levels, names=['asset'] + names)
+
+    cube = pd.DataFrame({name: frame.to_numpy().T.ravel() for name, frame in stats.items()}, index=index)
+    cube['count'] = cube['count'].astype(int)
+    cube['change'] = (cube['end'] - cube['start']) / cube['start'] * 100
+
+    # first/last trading day of each group, shared by every asset
+    dates = pd.Series(norm_df.index, index=norm_df.index).groupby(keys).agg(['first', 'last'])
+    cube['start_date'] = np.tile(dates['first'].to_numpy(), len(assets))
+    cube['end_date'] = np.tile(dates['last'].to_numpy(), len(assets))
+
+    # lexsorted index keeps (asset, year) lookups on the fast path
+    return cube.sort_index()
+
+@profiled
+def build_seasonal_cube(norm_df):
+    """Per (asset, year, month) start, end, high, low, mean, count, std and percent change."""
+    keys = [norm_df.index.year, norm_df.index.month]
+    return _aggregate(norm_df, keys, ['year', 'month'])
+
+@profiled
+def build_yearly_stats(norm_df):
+    """Same statistics as build_seasonal_cube, aggregated per (asset, year)."""
+    return _aggregate(norm_df, [norm_df.index.year], ['year'])
+
+def year_summary(month_stats, year_stats):
+    """Best/worst month, average of the monthly means and volatility for one (asset, year), None without data."""
+    monthly_stats = month_stats[month_stats['count'] > 0]
+    if len(monthly_stats) == 0:
+        return None
+
+    best_month = monthly_stats['change'].idxmax()
+    worst_month = monthly_stats['change'].idxmin()
+    return {
+        'best_month': calendar.month_name[best_month],
+        'best_change': monthly_stats.loc[best_month, 'change'],
+        'worst_month': calendar.month_name[worst_month],
+        'worst_change': monthly_stats.loc[worst_month, 'change'],
+        'avg_price': monthly_stats['mean'].mean(),
+        'volatility': year_stats['std']
+    }
+
+def slice_period(data, start, end):
+    # binary search on the sorted DatetimeIndex instead of a boolean mask over the full series
+    return data.loc[pd.Timestamp(start):pd.Timestamp(end) - pd.Timedelta(1, 'ns')]
+
+def year_slice(data, year):
+    return slice_period(data, f"{year}-01-01", f"{year + 1}-01-01")
+
+def month_slice(data, year, month):
+    start = pd.Timestamp(year=year, month=month, day=1)
+    return slice_period(data, start, start + pd.offsets.MonthBegin(1))
@@ -0,0 +1,124 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils.profiling import profiled
+
+DAYS = 366
+TREND_WINDOW = 252
+PROFILE_SMOOTHING = 15
+
+def calendar_day(index):
+    """0-based position of every date on a leap-year calendar, so 1 March is day 60 in every year."""
+    # non-leap years skip the 29 February slot instead of shifting everything after it
+    after_february = (index.month > 2) & ~index.is_leap_year
+    return index.dayofyear.to_numpy() - 1 + np.asarray(after_february, dtype=np.int64)
+
+def pivot_day_of_year(values, index):
+    """Scatter a (dates x assets) array into an (assets x years x calendar day) cube, NaN where nothing traded."""
+    years = index.year.to_numpy()
+    first_year = years.min()
+    cube = np.full((values.shape[1], years.max() - first_year + 1, DAYS), np.nan, dtype=np.float32)
+    cube[:, years - first_year, calendar_day(index)] = values.T
+    return cube, np.arange(first_year, years.max() + 1)
+
+def _window_mean(x, half_width, axis=0, wrap=False):
+    """NaN-aware centered moving average along one axis from running sums, partial windows at the edges."""
+    x = np.moveaxis(x, axis, 0)
+    valid = ~np.isnan(x)
+    if wrap:
+        # the day-of-year profile is circular, December flows into January
+        x = np.concatenate([x[-half_width:], x, x[:half_width]])
+        valid = np.concatenate([valid[-half_width:], valid, valid[:half_width]])
+    zeros = np.zeros((1,) + x.shape[1:])
+    sums = np.concatenate([zeros, np.cumsum(np.where(valid, x, 0.0), axis=0)])
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+
+    n = len(x) - 2 * half_width if wrap else len(x)
+    centers = np.arange(n) + (half_width if wrap else 0)
+    lo = np.clip(centers - half_width, 0, len(x))
+    hi = np.clip(centers + half_width + 1, 0, len(x))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (sums[hi] - sums[lo]) / (counts[hi] - counts[lo])
+    return np.moveaxis(mean, 0, axis)
+
+def _log_prices(prices):
+    # non-positive prints (e.g. crude oil in April 2020) have no log and are left out
+    values = prices.to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.log(np.where(values > 0, values, np.nan))
+
+def _nanmean(x, axis):
+    # all-NaN slices (days that never traded) are expected and simply stay NaN
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanmean(x, axis=axis)
+
+def _forward_fill(cube, stop=None):
+    # carry the last traded value over weekends and holidays along the day-of-year axis;
+    # only the final year, when it is still running, ends at its last day (stop) instead of 31 December
+    valid = ~np.isnan(cube)
+    idx = np.where(valid, np.arange(cube.shape[-1]), 0)
+    np.maximum.accumulate(idx, axis=-1, out=idx)
+    filled = np.take_along_axis(cube, idx, axis=-1)
+    if stop is not None:
+        filled[:, -1, stop + 1:] = np.nan
+    return filled
+
+@profiled
+def decompose(prices, trend_window=TREND_WINDOW, smoothing=PROFILE_SMOOTHING):
+    """Additive decomposition of log prices into trend, seasonal and residual for every asset at once.
+
+    The trend is a centered trend_window moving average. The seasonal profile is the
+    detrended value averaged per day-of-year over all years, smoothed and centered on
+    zero. Components are returned in percent, e.g. seasonal 2.0 means 2% above trend.
+    """
+    log_prices = _log_prices(prices)
+    trend = _window_mean(log_prices, trend_window // 2)
+    detrended = log_prices - trend
+
+    cube, years = pivot_day_of_year(detrended, prices.index)
+    profile = _nanmean(cube, axis=1)   # (assets, DAYS)
+    profile = _window_mean(profile, smoothing // 2, axis=1, wrap=True)
+    profile -= _nanmean(profile, axis=1)[:, None]
+
+    seasonal = profile[:, calendar_day(prices.index)].T
+    residual = detrended - seasonal
+
+    def as_percent(component):
+        return pd.DataFrame((np.exp(component) - 1) * 100, index=prices.index, columns=prices.columns)
+
+    month_of_day = pd.date_range('2020-01-01', periods=DAYS).month.to_numpy()   # 2020 is a leap year
+    month_profile = np.stack([_nanmean(profile[:, month_of_day == m], axis=1) for m in range(1, 13)], axis=1)
+    return {
+        'trend': pd.DataFrame(np.exp(trend), index=prices.index, columns=prices.columns),
+        'seasonal': as_percent(seasonal),
+        'residual': as_percent(residual),
+        'profile': pd.DataFrame(((np.exp(profile) - 1) * 100).T, index=pd.RangeIndex(1, DAYS + 1, name='day_of_year'), columns=prices.columns),
+        'month_profile': pd.DataFrame(((np.exp(month_profile) - 1) * 100).T, index=pd.RangeIndex(1, 13, name='month'), columns=prices.columns)
+    }
+
+@profiled
+def typical_year(prices):
+    """Every year of every asset rebased to 100 on its first trading day, on a shared day-of-year axis.
+
+    Returns the (assets x years x DAYS) path cube, the year labels and the average
+    path over all years; weekends and holidays carry the last close forward.
+    """
+    cube, years = pivot_day_of_year(_log_prices(prices), prices.index)
+    last_date = prices.index[-1]
+    # the final year is still running unless the data reaches its last business day
+    running = last_date < last_date + pd.offsets.BYearEnd(0)
+    filled = _forward_fill(cube, stop=calendar_day(prices.index[-1:])[0] if running else None)
+    first_valid = np.argmax(~np.isnan(cube), axis=-1)
+    base = np.take_along_axis(cube, first_valid[..., None], axis=-1)
+    paths = 100 * np.exp(filled - base)
+    return paths, years, _nanmean(paths, axis=1)
+
+def year_overlay(paths, years, average, asset_position):
+    """One asset's typical-year paths as a (day-of-year x year) frame plus an Average column."""
+    overlay = pd.DataFrame(paths[asset_position].T, index=pd.RangeIndex(1, DAYS + 1, name='day_of_year'),
+                           columns=[str(year) for year in years])
+    overlay['Average'] = average[asset_position]
+    return overlay
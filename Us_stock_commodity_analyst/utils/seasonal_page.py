@@ -0,0 +1,104 @@
+import streamlit as st
+
+from utils.data_store import get_asset_year, get_rebased_prices, get_seasonal_decomposition, list_assets, list_years, load_prices
+from utils.date_range import get_date_range
+from utils.downsampling import decimated_line
+from utils.function_seasonal_page import decomposition_plot, seasonal_profile_plot, tap_year_seasonal, typical_year_plot
+from utils.profiling import plotly_chart, profiled_section
+from utils.seasonal_decomposition import year_overlay
+
+@profiled_section
+def render_seasonal_page():
+    assets = list_assets()
+
+    if "selected_asset" not in st.session_state:
+        st.session_state.selected_asset = assets[0]
+
+    if "selected_year" not in st.session_state:
+        st.session_state.selected_year = list_years()[0]
+
+    st.title("Seasonal Analysis of US Market")
+
+    asset = st.selectbox(
+        "Select Asset", 
+        assets,
+        index=assets.index(st.session_state.selected_asset)
+    )
+
+    st.session_state.selected_asset = asset
+
+    # only this asset's column is read, rebased to the start of the sidebar date range
+    start, end = get_date_range()
+    data = get_rebased_prices([asset], start, end)[asset]
+    if data.empty:
+        st.warning("No data in the selected date range")
+        return
+    fig = decimated_line(data)
+    fig.update_layout(xaxis_title="Date", yaxis_title=asset, showlegend=False)
+    
+    with st.container():
+        st.subheader(f"{asset.replace('_',' ')} Price Over Time {data.index[0].year}-{data.index[-1].year}")
+        plotly_chart(fig, use_container_width=True)
+
+        col1, col2, col3, col4, col5 = st.columns(5, border=True)
+
+        with col1:
+            st.metric("Open Price", f"{data.iloc[0]:.2f}", delta=None)
+            st.write(data.index[0].strftime("%Y-%m-%d"))
+        with col2:
+            st.metric("Close Price", f"{data.iloc[-1]:.2f}", delta=None)
+            st.write(data.index[-1].strftime("%Y-%m-%d"))
+        with col3:
+            st.metric("Max Price", f"{data.max():.2f}", delta=None)
+            st.write(data.idxmax().strftime("%Y-%m-%d"))
+        with col4:
+            st.metric("Min Price", f"{data.min():.2f}", delta=None)
+            st.write(data.idxmin().strftime("%Y-%m-%d"))
+        with col5:
+            st.metric("Average Price", f"{data.mean():.2f}", delta=None)
+
+    st.markdown("---")
+    year_section(data)
+
+    st.markdown("---")
+    decomposition_section(asset)
+
+# Changing the year only reruns this section, not the overview chart above
+@st.fragment
+@profiled_section
+def year_section(data):
+    asset = data.name
+    with st.container():
+        st.subheader(f"{asset.replace('_',' ')} Price per Year Seasonal Analysis")
+        tahun = data.index.year.unique()
+
+        selected_year = st.radio(
+            "Select Year", 
+            options=tahun, 
+            horizontal=True,
+            index=list(tahun).index(st.session_state.selected_year) if st.session_state.selected_year in tahun else 0
+        )
+        st.session_state.selected_year = selected_year
+        # same date range and rebasing as the overview above
+        start, end = get_date_range()
+        if start is not None or end is not None:
+            st.caption("Clipped to the date range and rebased like the chart above, months outside the range are empty")
+        data_tahun, seasonal_cube, yearly_stats = get_asset_year(asset, selected_year, start=start, end=end)
+        tap_year_seasonal(data_tahun, selected_year, seasonal_cube, yearly_stats)
+
+@st.fragment
+@profiled_section
+def decomposition_section(asset):
+    st.subheader(f"{asset.replace('_',' ')} Seasonal Decomposition")
+    st.caption("Computed on the full history, a seasonal profile needs several years")
+
+    decomposition, (paths, years, average) = get_seasonal_decomposition()
+    position = decomposition['trend'].columns.get_loc(asset)
+
+    tab_typical, tab_components, tab_profile = st.tabs(["Typical Year", "Trend / Seasonal / Residual", "Seasonal Profile"])
+    with tab_typical:
+        typical_year_plot(year_overlay(paths, years, average, position), asset)
+    with tab_components:
+        decomposition_plot(load_prices()[asset], decomposition['trend'][asset], decomposition['seasonal'][asset], decomposition['residual'][asset], asset)
+    with tab_profile:
+        seasonal_profile_plot(decomposition['month_profile'][asset], asset)
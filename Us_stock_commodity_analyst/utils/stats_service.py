@@ -0,0 +1,270 @@
+import argparse
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import streamlit as st
+
+from utils import data_store
+from utils.asset_categories import ASSET_CATEGORIES
+from utils.correlation_engine import top_correlated_pairs
+from utils.seasonal_cube import year_summary
+
+# set US_STOCK_API_PORT to also serve the JSON endpoints from the Streamlit process
+API_PORT = os.environ.get('US_STOCK_API_PORT')
+MAX_CACHED_BODIES = 256
+# bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+logger = logging.getLogger(__name__)
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _frame_json(df, orient='split'):
+    # to_json writes NaN as null and timestamps as ISO strings, which json.dumps cannot do
+    return json.loads(df.to_json(orient=orient, date_format='iso'))
+
+def _json_default(value):
+    # numpy scalars that slipped through outside of to_json
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _asset_name(asset):
+    if not asset:
+        raise ServiceError(400, "missing 'asset' parameter")
+    asset = asset if asset.endswith('_Price') else f"{asset}_Price"
+    if asset not in data_store.list_assets():
+        raise ServiceError(404, f"unknown asset {asset!r}")
+    return asset
+
+def _int_param(params, name, default=None):
+    value = params.get(name, default)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(400, f"'{name}' must be an integer") from None
+
+def _correlation(basis):
+    if basis == 'returns':
+        return data_store.get_return_correlation()
+    if basis == 'prices':
+        return data_store.get_correlation_matrix()
+    raise ServiceError(400, "'basis' must be 'prices' or 'returns'")
+
+def assets_endpoint(params):
+    assets = data_store.list_assets()
+    return {
+        'assets': assets,
+        'years': [int(year) for year in data_store.list_years()],
+        'categories': {name: [asset for asset in members if asset in assets] for name, members in ASSET_CATEGORIES.items()}
+    }
+
+def stats_endpoint(params):
+    stats = data_store.get_asset_stats(params.get('benchmark', 'S&P_500_Price'))
+    return _frame_json(stats)
+
+def correlation_endpoint(params):
+    corr = _correlation(params.get('basis', 'prices'))
+    category = params.get('category')
+    if category is not None:
+        if category not in ASSET_CATEGORIES:
+            raise ServiceError(404, f"unknown category {category!r}")
+        members = [asset for asset in ASSET_CATEGORIES[category] if asset in corr.columns]
+        corr = corr.loc[members, members]
+    return _frame_json(corr)
+
+def top_pairs_endpoint(params):
+    corr = _correlation(params.get('basis', 'prices'))
+    largest = params.get('largest', 'true').lower() not in ('0', 'false', 'no')
+    k = _int_param(params, 'k', 10)
+    if k < 1:
+        raise ServiceError(400, "'k' must be at least 1")
+    n_assets = len(corr)
+    pairs = top_correlated_pairs(corr, k=min(k, n_assets * (n_assets - 1) // 2), largest=largest)
+    return _frame_json(pairs, orient='records')
+
+def seasonal_endpoint(params):
+    asset = _asset_name(params.get('asset'))
+    year = _int_param(params, 'year')
+    if year not in data_store.list_years():
+        raise ServiceError(404, f"no data for {year}")
+    _, seasonal_cube, yearly_stats = data_store.get_asset_year(asset, year)
+    month_stats = seasonal_cube.loc[(asset, year)]
+    year_stats = yearly_stats.loc[(asset, year)]
+    summary = year_summary(month_stats, year_stats)
+    return {
+        'asset': asset,
+        'year': year,
+        'months': _frame_json(month_stats.reset_index(), orient='records'),
+        'year_stats': _frame_json(year_stats),
+        'summary': summary
+    }
+
+ENDPOINTS = {
+    '/assets': assets_endpoint,
+    '/stats': stats_endpoint,
+    '/correlation': correlation_endpoint,
+    '/correlation/top': top_pairs_endpoint,
+    '/seasonal': seasonal_endpoint
+}
+
+def accepts_gzip(accept_encoding):
+    """True when an Accept-Encoding header allows gzip, honouring q-values (gzip;q=0 refuses it)."""
+    qualities = {}
+    for part in accept_encoding.split(','):
+        name, *options = [token.strip() for token in part.split(';')]
+        if not name:
+            continue
+        quality = 1.0
+        for option in options:
+            key, _, value = option.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.lower()] = quality
+    # an explicit gzip entry wins over the * wildcard
+    quality = qualities.get('gzip', qualities.get('x-gzip', qualities.get('*', 0.0)))
+    return quality > 0
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match comparison per RFC 9110: weak (W/) and strong tags compare equal, * matches any."""
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    if '*' in tags:
+        return True
+    # If-None-Match uses the weak comparison, only the opaque part has to match
+    return etag.removeprefix('W/') in {tag.removeprefix('W/') for tag in tags if tag}
+
+def data_etag(path, params):
+    """Strong ETag from the data version and the request, known before anything is computed."""
+    version = data_store.data_version()
+    root = data_store.resolve_dataset_root()
+    if root is not None:
+        version += '/' + data_store.partitioned_store.dataset_version(root)
+    request = path + '?' + '&'.join(f"{key}={value}" for key, value in sorted(params.items()))
+    return '"' + hashlib.blake2b(f"{version}|{request}".encode(), digest_size=16).hexdigest() + '"'
+
+class ResponseCache:
+    """LRU of encoded bodies by ETag, so a repeated 200 skips both the JSON encoding and gzip."""
+
+    def __init__(self, max_entries=MAX_CACHED_BODIES):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag):
+        with self._lock:
+            entry = self._items.get(etag)
+            if entry is not None:
+                self._items.move_to_end(etag)
+            return entry
+
+    def put(self, etag, body):
+        # small bodies are sent as they are, gzip would not save anything
+        entry = (body, gzip.compress(body, compresslevel=6) if len(body) >= GZIP_MIN_BYTES else None)
+        with self._lock:
+            self._items[etag] = entry
+            self._items.move_to_end(etag)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return entry
+
+class StatsHandler(BaseHTTPRequestHandler):
+    server_version = 'USStockStats/1.0'
+    response_cache = ResponseCache()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        path = url.path.rstrip('/') or '/'
+        if path == '/health':
+            return self._send(200, b'{"status": "ok"}')
+
+        endpoint = ENDPOINTS.get(path)
+        if endpoint is None:
+            return self._send_error(404, f"unknown endpoint {path!r}, try one of {sorted(ENDPOINTS)}")
+
+        etag = data_etag(path, params)
+        if etag_matches(self.headers.get('If-None-Match', ''), etag):
+            return self._send(304, b'', etag=etag)
+
+        entry = self.response_cache.get(etag)
+        if entry is None:
+            try:
+                payload = endpoint(params)
+            except ServiceError as exc:
+                return self._send_error(exc.status, str(exc))
+            except Exception:
+                # anything else is a bug, the client still gets an answer instead of a dropped connection
+                logger.exception("Stats service request %s failed", self.path)
+                return self._send_error(500, "internal server error")
+            entry = self.response_cache.put(etag, json.dumps(payload, separators=(',', ':'), default=_json_default).encode())
+
+        body, gzipped_body = entry
+        if gzipped_body is not None and accepts_gzip(self.headers.get('Accept-Encoding', '')):
+            return self._send(200, gzipped_body, etag=etag, gzipped=True)
+        self._send(200, body, etag=etag)
+
+    def _send_error(self, status, message):
+        self._send(status, json.dumps({'error': message}).encode())
+
+    def _send(self, status, body, etag=None, gzipped=False):
+        self.send_response(status)
+        if etag is not None:
+            self.send_header('ETag', etag)
+            # clients may keep the body but must revalidate, which is a cheap 304
+            self.send_header('Cache-Control', 'no-cache')
+            self.send_header('Vary', 'Accept-Encoding')
+        if status != 304:
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if gzipped:
+                self.send_header('Content-Encoding', 'gzip')
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # keep polling clients out of the Streamlit log
+        pass
+
+def serve(port, host='127.0.0.1'):
+    server = ThreadingHTTPServer((host, port), StatsHandler)
+    server.daemon_threads = True
+    return server
+
+# started once per Streamlit process so the endpoints read the same caches as the pages
+@st.cache_resource(show_spinner=False)
+def get_stats_server(port):
+    server = serve(port)
+    threading.Thread(target=server.serve_forever, name='stats-service', daemon=True).start()
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve asset stats, correlations and seasonal metrics as JSON.")
+    parser.add_argument('--port', type=int, default=int(API_PORT or 8600), help="port to listen on")
+    parser.add_argument('--host', default='127.0.0.1', help="interface to bind (default: localhost only)")
+    args = parser.parse_args(argv)
+
+    server = serve(args.port, args.host)
+    print(f"Serving {', '.join(sorted(ENDPOINTS))} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import logging
+import os
+import threading
+import time
+
+import streamlit as st
+
+from utils.asset_categories import ASSET_CATEGORIES
+from utils.rolling_risk import RISK_WINDOWS
+
+logger = logging.getLogger(__name__)
+
+# set US_STOCK_WARMUP=0 to skip the background warm-up (e.g. while developing)
+WARMUP_ENABLED = os.environ.get('US_STOCK_WARMUP', '1').lower() not in ('0', 'false', 'no')
+
+# the windows offered by the rolling correlation section
+ROLLING_WINDOWS = (30, 90, 180, None)
+
+# the defaults of the Portfolio page's rolling risk section: 3 month window, both VaR confidences
+RISK_WINDOW = RISK_WINDOWS["3 Months"]
+VAR_CONFIDENCES = (95, 99)
+
+class WarmupJob:
+    """Fills the shared caches step by step on a daemon thread, sessions only ever read its progress.
+
+    run() does the same work on the calling thread, stop() ends it after the current step.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.total = 0
+        self.done = 0
+        self.current = None
+        self.errors = []
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self.run, name='cache-warmup', daemon=True)
+
+    def start(self):
+        self.started_at = time.time()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def progress(self):
+        with self._lock:
+            fraction = self.done / self.total if self.total else 0.0
+            return {
+                'done': self.done,
+                'total': self.total,
+                'fraction': fraction,
+                'current': self.current,
+                'errors': list(self.errors),
+                'running': self.running,
+                'elapsed': (self.finished_at or time.time()) - self.started_at if self.started_at else 0.0
+            }
+
+    def run(self):
+        self.started_at = self.started_at or time.time()
+        for stage, steps in _stages(self.path):
+            with self._lock:
+                self.total += len(steps)
+            for label, step in steps:
+                if self._stopped.is_set():
+                    logger.info("Cache warm-up stopped, the data changed")
+                    return
+                with self._lock:
+                    self.current = f"{stage}: {label}"
+                try:
+                    step()
+                except Exception as exc:
+                    # a failed step only means that view is computed on first visit instead
+                    logger.warning("Cache warm-up step %s failed: %s", label, exc)
+                    with self._lock:
+                        self.errors.append(f"{stage}: {label}: {exc}")
+                with self._lock:
+                    self.done += 1
+            logger.info("Cache warm-up: %s done (%d/%d)", stage, self.done, self.total)
+
+        with self._lock:
+            self.current = None
+            self.finished_at = time.time()
+        logger.info("Cache warm-up finished in %.1fs", self.finished_at - self.started_at)
+
+def _stages(path):
+    """Yield (stage, steps) in the order a first visitor is most likely to need them.
+
+    Later stages are built once the earlier caches exist, so the asset and year
+    lists can come from the data itself.
+    """
+    from utils import data_store
+    from utils.fungction_correlation_page import categori_correlation_figure, main_correlation_figure, price_line_figure
+
+    yield 'core', [
+        ('prices', lambda: data_store.load_prices(path)),
+        ('normalized prices', lambda: data_store.get_normalized_prices(path)),
+        ('correlation matrix', lambda: data_store.get_correlation_matrix(path)),
+        ('asset stats', lambda: data_store.get_asset_stats(path=path)),
+        ('seasonal cube', lambda: data_store.get_seasonal_cube(path)),
+        ('correlation heatmap', lambda: main_correlation_figure(data_store.get_correlation_matrix(path)))
+    ]
+
+    assets = data_store.list_assets(path)
+    years = data_store.list_years(path)
+    yield 'assets', [(asset, lambda asset=asset: data_store.get_normalized_slice([asset], path=path)) for asset in assets]
+    yield 'asset years', [
+        (f"{asset} {year}", lambda asset=asset, year=year: data_store.get_asset_year(asset, year, path=path))
+        for asset in assets for year in years
+    ]
+
+    def warm_category(category):
+        available = [asset for asset in ASSET_CATEGORIES[category] if asset in assets]
+        if not available:
+            return
+        corr_df = data_store.get_correlation_matrix(path)
+        categori_correlation_figure(category, corr_df.loc[available, available], available)
+        price_line_figure(data_store.get_normalized_slice(available, path=path), available, category)
+
+    yield 'categories', [(category, lambda category=category: warm_category(category)) for category in ASSET_CATEGORIES]
+
+    yield 'portfolio', [
+        # the optimizer and backtest slice these for any asset selection
+        ('returns', lambda: data_store.get_returns(path)),
+    ] + [
+        # same alpha expression as risk_section, so the cache keys match
+        (f"rolling risk {confidence}%", lambda confidence=confidence: data_store.get_rolling_risk(
+            window=RISK_WINDOW, alpha=1 - confidence / 100, path=path))
+        for confidence in VAR_CONFIDENCES
+    ]
+
+    yield 'correlation views', [
+        ('return correlation', lambda: data_store.get_return_correlation(path)),
+        ('clustered prices', lambda: data_store.get_clustered_correlation('prices', path=path)),
+        ('clustered returns', lambda: data_store.get_clustered_correlation('returns', path=path)),
+        ('correlation significance', lambda: data_store.get_correlation_significance('prices', path=path))
+    ] + [
+        (f"rolling {window or 'expanding'}", lambda window=window: data_store.get_rolling_correlation(window=window, path=path))
+        for window in ROLLING_WINDOWS
+    ]
+
+def start_warmup(path=None):
+    return WarmupJob(path).start()
+
+# one job per server process and data version, started by the first script run and shared by every session;
+# a new ingest or append changes the version, the old job is stopped and a new one warms the new data
+@st.cache_resource(show_spinner=False, max_entries=1, on_release=lambda job: job.stop())
+def _warmup_job(version):
+    return start_warmup()
+
+def get_warmup_job():
+    from utils import data_store
+    return _warmup_job(data_store.data_version())